@@ -0,0 +1,96 @@
+"""
+Bounded-memory per-user completion counting.
+
+``CompletionAggregator`` keeps one packed integer per user (total in the high
+bits, completed in the low bits) in a dict. Once the dict holds more than
+``max_entries`` users it is written to a temporary file as sorted fixed-width
+records and cleared, so memory stays bounded however many users the todo
+stream contains. ``results()`` k-way merges the spilled runs with what is
+still in memory and yields ``(user_id, completed, total)`` in user id order.
+"""
+
+import heapq
+import logging
+import os
+import struct
+import tempfile
+from typing import Dict, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_SHIFT = 32
+_ONE_TOTAL = 1 << _SHIFT
+_LOW = _ONE_TOTAL - 1
+_RECORD = struct.Struct('<qII')  # user_id, completed, total
+_READ_RECORDS = 4096
+
+
+class CompletionAggregator:
+    """Streaming (completed, total) counter per user that spills sorted runs to disk"""
+
+    def __init__(self, max_entries: int = 1_000_000, spill_dir: Optional[str] = None):
+        """
+        max_entries: users held in memory before spilling
+        spill_dir: directory for spill files (default: the system temp dir)
+        """
+        if max_entries < 1:
+            raise ValueError("max_entries must be at least 1")
+        self.max_entries = max_entries
+        self.spill_dir = spill_dir
+        self._counts: Dict[int, int] = {}
+        self.spills: List[str] = []
+
+    def add(self, user_id: int, completed: bool):
+        counts = self._counts
+        counts[user_id] = counts.get(user_id, 0) + (_ONE_TOTAL | bool(completed))
+        if len(counts) > self.max_entries:
+            self._spill()
+
+    def _spill(self):
+        fd, path = tempfile.mkstemp(prefix="completion-", suffix=".spill", dir=self.spill_dir)
+        pack = _RECORD.pack
+        with os.fdopen(fd, 'wb') as f:
+            f.writelines(pack(user_id, packed & _LOW, packed >> _SHIFT)
+                         for user_id, packed in sorted(self._counts.items()))
+        logger.debug(f"Spilled {len(self._counts)} user counts to {path}")
+        self.spills.append(path)
+        self._counts = {}
+
+    @staticmethod
+    def _read_run(path: str) -> Iterator[Tuple[int, int, int]]:
+        with open(path, 'rb') as f:
+            while True:
+                block = f.read(_RECORD.size * _READ_RECORDS)
+                if not block:
+                    return
+                yield from _RECORD.iter_unpack(block)
+
+    def results(self) -> Iterator[Tuple[int, int, int]]:
+        """(user_id, completed, total) for every user seen, in user id order; removes spill files"""
+        in_memory = ((user_id, packed & _LOW, packed >> _SHIFT)
+                     for user_id, packed in sorted(self._counts.items()))
+        self._counts = {}
+        try:
+            current_id, completed, total = None, 0, 0
+            for user_id, run_completed, run_total in heapq.merge(
+                    *(self._read_run(path) for path in self.spills), in_memory):
+                if user_id != current_id:
+                    if current_id is not None:
+                        yield current_id, completed, total
+                    current_id, completed, total = user_id, 0, 0
+                completed += run_completed
+                total += run_total
+            if current_id is not None:
+                yield current_id, completed, total
+        finally:
+            self.discard()
+
+    def discard(self):
+        """Drop all counts and delete spill files"""
+        self._counts = {}
+        for path in self.spills:
+            try:
+                os.remove(path)
+            except OSError as e:
+                logger.warning(f"Could not remove spill file {path}: {e}")
+        self.spills = []
@@ -0,0 +1,75 @@
+"""
+Completion-rate analytics over per-user validation results.
+
+``CompletionDistribution`` sorts the users' completion percentages once and
+keeps prefix sums over them, so "how many users pass at 60%?", percentiles,
+histograms and "who is within N points of the threshold?" are answered by
+binary search instead of re-running validation. A full threshold sweep costs
+O(log n) per threshold.
+"""
+
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from typing import Dict, Iterable, List, Optional, Sequence
+
+
+class CompletionDistribution:
+    """Sorted completion percentages with aligned user ids and prefix sums"""
+
+    def __init__(self, user_results: Iterable[Dict]):
+        ordered = sorted((result['completion_percentage'], result['user_id']) for result in user_results)
+        self.rates: List[float] = [rate for rate, _ in ordered]
+        self.user_ids: List[int] = [user_id for _, user_id in ordered]
+        self._prefix: List[float] = [0.0, *accumulate(self.rates)]
+
+    @classmethod
+    def from_summary(cls, summary: Dict) -> 'CompletionDistribution':
+        """Distribution of a validate_all_fancode_users() summary"""
+        return cls(summary['user_results'])
+
+    def __len__(self) -> int:
+        return len(self.rates)
+
+    def pass_count(self, threshold: float) -> int:
+        """Users whose completion is strictly above ``threshold`` (the validator's rule)"""
+        return len(self.rates) - bisect_right(self.rates, threshold)
+
+    def fail_count(self, threshold: float) -> int:
+        return bisect_right(self.rates, threshold)
+
+    def sweep(self, thresholds: Iterable[float]) -> Dict[float, int]:
+        """Pass count at each threshold"""
+        return {threshold: self.pass_count(threshold) for threshold in thresholds}
+
+    def passing_user_ids(self, threshold: float) -> List[int]:
+        return self.user_ids[bisect_right(self.rates, threshold):]
+
+    def near_threshold(self, threshold: float, points: float) -> List[int]:
+        """Users within ``points`` percentage points of ``threshold``, lowest rate first"""
+        return self.user_ids[bisect_left(self.rates, threshold - points):bisect_right(self.rates, threshold + points)]
+
+    def percentile(self, p: float) -> Optional[float]:
+        """Linearly interpolated ``p``-th percentile (0-100) of completion rates"""
+        if not self.rates:
+            return None
+        if not 0 <= p <= 100:
+            raise ValueError("percentile must be between 0 and 100")
+        position = (len(self.rates) - 1) * p / 100
+        lower = int(position)
+        upper = min(lower + 1, len(self.rates) - 1)
+        return self.rates[lower] + (self.rates[upper] - self.rates[lower]) * (position - lower)
+
+    def histogram(self, edges: Sequence[float]) -> List[int]:
+        """
+        Counts per bin [edges[i], edges[i+1]); the last bin also includes its
+        upper edge, so edges (0, 50, 100) splits 0-100% into two bins
+        """
+        bounds = [bisect_left(self.rates, edge) for edge in edges[:-1]] + [bisect_right(self.rates, edges[-1])]
+        return [bounds[i + 1] - bounds[i] for i in range(len(bounds) - 1)]
+
+    def mean(self, low: float = float('-inf'), high: float = float('inf')) -> Optional[float]:
+        """Mean completion of users with a rate in [low, high]"""
+        start, end = bisect_left(self.rates, low), bisect_right(self.rates, high)
+        if start >= end:
+            return None
+        return (self._prefix[end] - self._prefix[start]) / (end - start)
@@ -1,52 +1,301 @@
 import requests
+import hashlib
+import json
 import logging
-from typing import List
+import threading
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from typing import Dict, Iterator, List, Optional
+from requests.adapters import HTTPAdapter
 from user import User
 from todo import Todo
+from decoders import DecodeError, DecodeResult, iter_json_array
+from hedging import Hedger
+from config import CONCURRENT_FETCH_STRATEGIES, Settings, get_settings
+from cassette import adapter_for
 
 logger = logging.getLogger(__name__)
 
 class APIClient:
     """API client for JSONPlaceholder endpoints"""
 
-    BASE_URL = "http://jsonplaceholder.typicode.com"
+    BASE_URL = "http://jsonplaceholder.typicode.com"  # default; instances use self.base_url
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
+    def __init__(self, thread_safe: Optional[bool] = None, pool_connections: Optional[int] = None,
+                 pool_maxsize: Optional[int] = None, pool_block: bool = False,
+                 warm_connections: int = 0, hedger: Optional[Hedger] = None,
+                 timeout: Optional[float] = None, base_url: Optional[str] = None,
+                 settings: Optional[Settings] = None, memo_size: int = 64,
+                 adapter: Optional[HTTPAdapter] = None):
+        """
+        Arguments left as None take their value from ``settings``
+        (default: config.get_settings()).
+
+        thread_safe: give every thread its own Session (cookies, headers, hooks)
+            while all of them share one connection pool; defaults to on when
+            settings.fetch_strategy is a concurrent one ('adaptive', 'pipeline')
+        pool_connections / pool_maxsize: urllib3 pool sizing; raise pool_maxsize
+            to at least the number of concurrent workers (with a concurrent
+            fetch_strategy, the default pool_maxsize covers max_workers)
+        pool_block: wait for a free connection instead of opening throwaway ones
+        warm_connections: keep-alive sockets to pre-open at construction
+        hedger: send a duplicate GET when one is slower than recent latency;
+            combine with thread_safe so hedged calls do not share a Session
+        timeout: default per-request timeout in seconds, used when a call
+            does not pass its own (e.g. the remaining deadline budget)
+        base_url: API root, e.g. http://jsonplaceholder.typicode.com
+        memo_size: how many distinct response bodies to keep decoded models
+            for; an identical body is served from memory without decoding
+            (0 disables). Memoized models are shared between callers, which is
+            safe because User and Todo are frozen; leave user.address unmodified
+        adapter: transport adapter to mount instead of a plain HTTPAdapter,
+            e.g. httpcache.CachingAdapter; its own pool settings apply. Without
+            one, settings.cassette_mode 'record'/'replay' mounts a
+            cassette.CassetteAdapter
+        """
+        settings = settings or get_settings()
+        self.settings = settings
+        self.base_url = (base_url or settings.api_base_url).rstrip('/')
+        concurrent = settings.fetch_strategy in CONCURRENT_FETCH_STRATEGIES
+        self.thread_safe = concurrent if thread_safe is None else thread_safe
+        self.pool_connections = pool_connections = pool_connections or settings.pool_connections
+        if not pool_maxsize:
+            pool_maxsize = max(settings.pool_maxsize, settings.max_workers) if concurrent else settings.pool_maxsize
+        self.pool_maxsize = pool_maxsize
+        self.hedger = hedger
+        self.timeout = timeout if timeout is not None else settings.request_timeout
+        # One adapter (and so one urllib3 PoolManager, which is thread-safe) is
+        # mounted on every session this client creates
+        pool_kwargs = {'pool_connections': pool_connections, 'pool_maxsize': pool_maxsize,
+                       'pool_block': pool_block}
+        self._adapter = adapter or adapter_for(settings, **pool_kwargs) or HTTPAdapter(**pool_kwargs)
+        self._local = threading.local()
+        # Weak, so a worker thread's session goes away with the thread's locals
+        self._sessions: 'weakref.WeakSet[requests.Session]' = weakref.WeakSet()
+        self._sessions_lock = threading.Lock()
+        self._session = self._new_session()
+        # Content-hash memo: body digest -> decoded models, plus last digest per resource
+        self.memo_size = memo_size
+        self._memo: 'OrderedDict[tuple, tuple]' = OrderedDict()
+        self._memo_lock = threading.Lock()
+        self.memo_hits = 0
+        self.fingerprints: Dict[str, str] = {}
+        # Per polled resource: (ETag, Last-Modified, content digest) from the last poll
+        self._validators: Dict[str, tuple] = {}
+
+        if warm_connections:
+            self.warm_up(warm_connections)
+
+    def _new_session(self, track: bool = True) -> requests.Session:
+        """Create a session that uses the client's shared connection pool"""
+        session = requests.Session()
+        session.headers.update({
             'Content-Type': 'application/json',
             'Accept': 'application/json'
         })
+        session.mount('http://', self._adapter)
+        session.mount('https://', self._adapter)
+        if track:
+            with self._sessions_lock:
+                self._sessions.add(session)
+        return session
+
+    @property
+    def session(self) -> requests.Session:
+        """Session for the calling thread (shared unless thread_safe is set)"""
+        if not self.thread_safe:
+            return self._session
+        session = getattr(self._local, 'session', None)
+        if session is None:
+            session = self._local.session = self._new_session()
+        return session
+
+    @session.setter
+    def session(self, session: requests.Session):
+        self._session = session
+        self._local.session = session
+
+    def warm_up(self, connections: int) -> int:
+        """Pre-open up to ``connections`` keep-alive sockets; returns how many succeeded"""
+        connections = min(connections, self.pool_maxsize)
+
+        def open_connection(_):
+            try:
+                # Throwaway sessions: the sockets land in the shared pool
+                self._new_session(track=False).head(self.base_url, timeout=self.timeout)
+                return True
+            except requests.RequestException as e:
+                logger.warning(f"Connection warm-up failed: {e}")
+                return False
+
+        with ThreadPoolExecutor(max_workers=connections) as executor:
+            opened = sum(executor.map(open_connection, range(connections)))
+        logger.info(f"Warmed up {opened}/{connections} connections to {self.base_url}")
+        return opened
+
+    def close(self):
+        """Close every session and the shared connection pool"""
+        with self._sessions_lock:
+            sessions, self._sessions = list(self._sessions), weakref.WeakSet()
+        for session in sessions:
+            session.close()
+        self._adapter.close()
+
+    def __enter__(self) -> 'APIClient':
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _get(self, url: str, timeout: Optional[float] = None,
+             headers: Optional[Dict[str, str]] = None, stream: bool = False) -> requests.Response:
+        """GET through the current thread's session, hedged if configured"""
+        if timeout is None:
+            timeout = self.timeout
+        kwargs = {'timeout': timeout}
+        if headers:
+            kwargs['headers'] = headers
+        if stream:
+            kwargs['stream'] = True
+        if self.hedger is None:
+            return self.session.get(url, **kwargs)
+        return self.hedger.call(lambda: self.session.get(url, **kwargs),
+                                discard=lambda response: response.close())
+
+    @staticmethod
+    def _checked(result: DecodeResult, what: str) -> List:
+        """Return decoded items, raising one DecodeError listing every malformed row"""
+        if result.errors:
+            for error in result.errors:
+                logger.error(f"Malformed {what} payload: {error}")
+            raise DecodeError(result.errors)
+        return result.items
+
+    @staticmethod
+    def content_digest(content: bytes) -> str:
+        """Fast 128-bit digest of a response body"""
+        return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+    def fingerprint(self, resource: str) -> Optional[str]:
+        """Digest of the last body received for a resource ('users', 'todos', 'todos?userId=1')"""
+        return self.fingerprints.get(resource)
+
+    def _decode(self, response: requests.Response, model, resource: str, what: str) -> List:
+        """Decode a response into models, reusing earlier results for byte-identical bodies"""
+        content = getattr(response, 'content', None)
+        if not self.memo_size or not isinstance(content, (bytes, bytearray)):
+            return self._checked(model.from_records(response.json()), what)
+
+        digest = self.content_digest(content)
+        self.fingerprints[resource] = digest
+        key = (model.__name__, digest)
+        with self._memo_lock:
+            models = self._memo.get(key)
+            if models is not None:
+                self._memo.move_to_end(key)
+                self.memo_hits += 1
+                return list(models)
+
+        models = tuple(self._checked(model.from_records(json.loads(content)), what))
+        with self._memo_lock:
+            self._memo[key] = models
+            while len(self._memo) > self.memo_size:
+                self._memo.popitem(last=False)
+        return list(models)
+
+    def _get_if_changed(self, resource: str, model, timeout: Optional[float]) -> Optional[List]:
+        """
+        Conditional GET of a collection: None when the server answers 304 or
+        the body hashes the same as last time, otherwise the decoded models
+        """
+        headers = {}
+        etag, last_modified, previous = self._validators.get(resource, (None, None, None))
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        try:
+            response = self._get(f"{self.base_url}/{resource}", timeout, headers)
+            if response.status_code == 304:
+                return None
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Failed to poll {resource}: {e}")
+            raise
+        # Hash the body here rather than relying on the memo, which may be disabled (memo_size=0)
+        digest = self.content_digest(response.content)
+        self.fingerprints[resource] = digest
+        if previous is not None and digest == previous:
+            self._validators[resource] = (response.headers.get('ETag'), response.headers.get('Last-Modified'), digest)
+            return None
+        models = self._decode(response, model, resource, resource)
+        # Only remembered once decoding succeeded, so a failed poll is retried in full
+        self._validators[resource] = (response.headers.get('ETag'), response.headers.get('Last-Modified'), digest)
+        return models
+
+    def get_users_if_changed(self, timeout: Optional[float] = None) -> Optional[List[User]]:
+        """All users if they changed since the last poll, else None"""
+        return self._get_if_changed("users", User, timeout)
 
-    def get_users(self) -> List[User]:
+    def get_todos_if_changed(self, timeout: Optional[float] = None) -> Optional[List[Todo]]:
+        """All todos if they changed since the last poll, else None"""
+        return self._get_if_changed("todos", Todo, timeout)
+
+    def get_users(self, timeout: Optional[float] = None) -> List[User]:
         """Fetch all users from the API"""
         try:
-            response = self.session.get(f"{self.BASE_URL}/users")
+            response = self._get(f"{self.base_url}/users", timeout)
             response.raise_for_status()
-            users_data = response.json()
-            return [User.from_dict(user_data) for user_data in users_data]
+            return self._decode(response, User, "users", "users")
         except requests.RequestException as e:
             logger.error(f"Failed to fetch users: {e}")
             raise
 
-    def get_todos(self) -> List[Todo]:
+    def get_todos(self, timeout: Optional[float] = None) -> List[Todo]:
         """Fetch all todos from the API"""
         try:
-            response = self.session.get(f"{self.BASE_URL}/todos")
+            response = self._get(f"{self.base_url}/todos", timeout)
             response.raise_for_status()
-            todos_data = response.json()
-            return [Todo.from_dict(todo_data) for todo_data in todos_data]
+            return self._decode(response, Todo, "todos", "todos")
         except requests.RequestException as e:
             logger.error(f"Failed to fetch todos: {e}")
             raise
 
-    def get_user_todos(self, user_id: int) -> List[Todo]:
+    def iter_todos(self, timeout: Optional[float] = None, chunk_size: int = 65536) -> Iterator[Todo]:
+        """Stream all todos, decoding the response array incrementally instead of loading it whole"""
+        try:
+            response = self._get(f"{self.base_url}/todos", timeout, stream=True)
+            response.raise_for_status()
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch todos: {e}")
+            raise
+        with closing(response):
+            for record in iter_json_array(response.iter_content(chunk_size=chunk_size)):
+                yield Todo.from_dict(record)
+
+    def get_user_todos(self, user_id: int, timeout: Optional[float] = None) -> List[Todo]:
         """Fetch todos for a specific user"""
         try:
-            response = self.session.get(f"{self.BASE_URL}/todos?userId={user_id}")
+            response = self._get(f"{self.base_url}/todos?userId={user_id}", timeout)
             response.raise_for_status()
-            todos_data = response.json()
-            return [Todo.from_dict(todo_data) for todo_data in todos_data]
+            return self._decode(response, Todo, f"todos?userId={user_id}", f"todos for user {user_id}")
         except requests.RequestException as e:
             logger.error(f"Failed to fetch todos for user {user_id}: {e}")
             raise
+
+    def fetch_user_todos_payload(self, user_id: int, timeout: Optional[float] = None) -> bytes:
+        """Fetch the raw JSON body of a user's todos; decode it with parse_todos"""
+        try:
+            response = self._get(f"{self.base_url}/todos?userId={user_id}", timeout)
+            response.raise_for_status()
+            return response.content
+        except requests.RequestException as e:
+            logger.error(f"Failed to fetch todos for user {user_id}: {e}")
+            raise
+
+    @staticmethod
+    def parse_todos(payload: bytes, what: str = "todos") -> List[Todo]:
+        """Decode a raw todos body into Todo objects"""
+        return APIClient._checked(Todo.from_records(json.loads(payload)), what)
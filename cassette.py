@@ -0,0 +1,195 @@
+"""
+Record/replay of API traffic at the transport level.
+
+A ``Cassette`` holds one response per request (method + URL) and is saved as
+gzip-compressed JSON, keeping only the headers the client looks at.
+``CassetteAdapter`` is a requests transport adapter. In ``record`` mode it
+sends requests upstream and stores the answers, except conditional polls
+(whose 304s carry no body) and errors over a recorded success. In
+``replay`` mode it serves them from memory, optionally sleeping ``latency``
+seconds per request, and a request missing from the cassette fails like a
+connection error.
+
+``APIClient`` mounts the adapter itself whenever ``FANCODE_CASSETTE_MODE`` is
+``record`` or ``replay``, so every client in the process shares one cassette,
+clients built directly in tests included. ``pytest --cassette-mode=...``
+sets the same thing for a test run.
+"""
+
+import atexit
+import base64
+import gzip
+import json
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from config import Settings
+from httpcache import CONDITIONAL_HEADERS, CachedResponse, build_response, capture, file_lock
+
+logger = logging.getLogger(__name__)
+
+# Response headers worth keeping; the rest only bloat the cassette
+_KEPT_HEADERS = ('content-type', 'etag', 'last-modified', 'cache-control')
+
+
+def _ok(status: int) -> bool:
+    return 200 <= status < 300
+
+
+class CassetteMiss(requests.ConnectionError):
+    """A replayed request that the cassette has no recording for"""
+
+
+class Cassette:
+    """Recorded responses keyed by 'METHOD url'"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._interactions: Dict[str, CachedResponse] = {}
+        self._lock = threading.Lock()
+        self.dirty = False
+
+    @staticmethod
+    def key(method: str, url: str) -> str:
+        return f"{method} {url}"
+
+    def _read(self) -> Dict[str, CachedResponse]:
+        if not os.path.exists(self.path):
+            return {}
+        with gzip.open(self.path, 'rt', encoding='utf-8') as f:
+            data = json.load(f)
+        return {key: self._decode(entry) for key, entry in data['interactions'].items()}
+
+    def load(self) -> 'Cassette':
+        """Read the file (if any) into memory; returns self"""
+        interactions = self._read()
+        with self._lock:
+            self._interactions.update(interactions)
+        if interactions:
+            logger.info(f"Loaded {len(interactions)} recorded responses from {self.path}")
+        return self
+
+    def get(self, method: str, url: str) -> Optional[CachedResponse]:
+        return self._interactions.get(self.key(method, url))
+
+    def add(self, method: str, response: CachedResponse):
+        """Record a response; an error never replaces a recorded success for the same request"""
+        headers = {name: value for name, value in response.headers.items() if name.lower() in _KEPT_HEADERS}
+        key = self.key(method, response.url)
+        with self._lock:
+            existing = self._interactions.get(key)
+            if existing is not None and _ok(existing.status) and not _ok(response.status):
+                return
+            self._interactions[key] = response._replace(headers=headers)
+            self.dirty = True
+
+    def __len__(self) -> int:
+        return len(self._interactions)
+
+    @staticmethod
+    def _encode(response: CachedResponse) -> Dict:
+        entry = {'url': response.url, 'status': response.status, 'reason': response.reason,
+                 'headers': response.headers}
+        try:
+            entry['body'] = response.body.decode('utf-8')
+        except UnicodeDecodeError:
+            entry['body_b64'] = base64.b64encode(response.body).decode('ascii')
+        return entry
+
+    @staticmethod
+    def _decode(entry: Dict) -> CachedResponse:
+        body = entry['body'].encode('utf-8') if 'body' in entry else base64.b64decode(entry['body_b64'])
+        return CachedResponse(entry['url'], entry['status'], entry['reason'], entry['headers'], body)
+
+    def save(self):
+        """Merge new recordings into the file; safe with several recording processes"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with file_lock(self.path + '.lock'):
+            saved = self._read()  # keep what other processes recorded meanwhile
+            with self._lock:
+                saved.update(self._interactions)
+                self._interactions = saved
+                self.dirty = False
+            interactions = {key: self._encode(response) for key, response in sorted(saved.items())}
+            temp_path = f"{self.path}.{os.getpid()}.tmp"
+            with gzip.open(temp_path, 'wt', encoding='utf-8') as f:
+                json.dump({'version': 1, 'interactions': interactions}, f, separators=(',', ':'))
+            os.replace(temp_path, self.path)
+        logger.info(f"Saved {len(interactions)} recorded responses to {self.path}")
+
+
+class CassetteAdapter(HTTPAdapter):
+    """HTTPAdapter that records to, or replays from, a Cassette"""
+
+    def __init__(self, cassette: Cassette, mode: str, latency: float = 0.0, **kwargs):
+        if mode not in ('record', 'replay'):
+            raise ValueError(f"mode must be 'record' or 'replay', got {mode!r}")
+        super().__init__(**kwargs)
+        self.cassette = cassette
+        self.mode = mode
+        self.latency = latency
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if self.mode == 'record':
+            response = super().send(request, **kwargs)
+            if any(header in request.headers for header in CONDITIONAL_HEADERS):
+                # A 304 has no body to replay; replaying the full 200 answers these polls too
+                return response
+            recorded = capture(response)
+            self.cassette.add(request.method, recorded)
+            return build_response(request, recorded, self)
+        recorded = self.cassette.get(request.method, request.url)
+        if recorded is None:
+            raise CassetteMiss(f"{request.method} {request.url} is not in cassette {self.cassette.path}; "
+                               f"record it with FANCODE_CASSETTE_MODE=record", request=request)
+        if self.latency:
+            time.sleep(self.latency)
+        return build_response(request, recorded, self)
+
+
+_cassettes: Dict[str, Cassette] = {}
+_cassettes_lock = threading.Lock()
+_save_at_exit = False
+
+
+def get_cassette(path: str) -> Cassette:
+    """The process-wide Cassette for ``path``, loaded on first use"""
+    with _cassettes_lock:
+        cassette = _cassettes.get(path)
+        if cassette is None:
+            cassette = _cassettes[path] = Cassette(path).load()
+        return cassette
+
+
+def save_cassettes():
+    """Write every cassette recorded in this process"""
+    with _cassettes_lock:
+        cassettes = list(_cassettes.values())
+    for cassette in cassettes:
+        cassette.save()
+
+
+def adapter_for(settings: Settings, **kwargs) -> Optional[CassetteAdapter]:
+    """The CassetteAdapter ``settings`` ask for, or None when cassettes are off"""
+    global _save_at_exit
+    if settings.cassette_mode == 'off':
+        return None
+    cassette = get_cassette(settings.cassette_path)
+    if settings.cassette_mode == 'record':
+        with _cassettes_lock:
+            if not _save_at_exit:
+                atexit.register(save_cassettes)
+                _save_at_exit = True
+    if settings.cassette_mode == 'replay' and not len(cassette) and not os.path.exists(cassette.path):
+        raise FileNotFoundError(f"No cassette at {cassette.path}; record one with FANCODE_CASSETTE_MODE=record")
+    return CassetteAdapter(cassette, settings.cassette_mode, settings.cassette_latency, **kwargs)
@@ -0,0 +1,255 @@
+"""
+Adaptive concurrency control and client-side rate limiting for upstream fetches.
+
+``AIMDLimiter`` tunes how many requests may be in flight: it grows the limit
+additively while latency stays near the best observed latency, and cuts it
+multiplicatively on 429/5xx responses or when latency inflates. A
+``TokenBucket`` caps the request rate independently of concurrency.
+``AdaptiveFetcher`` combines the two to run a fetch function over many items,
+and waits before retrying an overloaded call: the response's Retry-After
+when it has one, otherwise an exponential backoff with jitter.
+"""
+
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, Iterable, List, Mapping, NamedTuple, Optional
+
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+def status_code_of(error: BaseException) -> Optional[int]:
+    """HTTP status carried by a requests exception, if any"""
+    response = getattr(error, 'response', None)
+    return getattr(response, 'status_code', None)
+
+
+def is_overload(error: BaseException) -> bool:
+    """True for responses that mean the upstream wants us to back off"""
+    status = status_code_of(error)
+    return status is not None and (status == 429 or status >= 500)
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """Seconds from the response's Retry-After header (delta-seconds or HTTP date), if any"""
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None)
+    value = headers.get('Retry-After') if isinstance(headers, Mapping) else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class TokenBucket:
+    """Thread-safe token bucket: ``rate`` tokens per second, bursts up to ``capacity``"""
+
+    def __init__(self, rate: float, capacity: Optional[float] = None,
+                 clock: Callable[[], float] = time.monotonic):
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float):
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def try_acquire(self, tokens: float = 1.0) -> bool:
+        """Take tokens if available right now"""
+        with self._lock:
+            self._refill(self._clock())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return True
+            return False
+
+    def acquire(self, tokens: float = 1.0, timeout: Optional[float] = None) -> bool:
+        """Block until tokens are available; False if ``timeout`` expires first"""
+        deadline = None if timeout is None else self._clock() + timeout
+        while True:
+            with self._lock:
+                now = self._clock()
+                self._refill(now)
+                if self._tokens >= tokens:
+                    self._tokens -= tokens
+                    return True
+                wait = (tokens - self._tokens) / self.rate
+            if deadline is not None:
+                remaining = deadline - now
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class LimitChange(NamedTuple):
+    """One adjustment of the concurrency limit"""
+    timestamp: float
+    old_limit: int
+    new_limit: int
+    reason: str
+
+
+class AIMDLimiter:
+    """Additive-increase / multiplicative-decrease concurrency limit"""
+
+    def __init__(self, initial_limit: int = 4, min_limit: int = 1, max_limit: int = 64,
+                 decrease_factor: float = 0.5, latency_tolerance: float = 2.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.decrease_factor = decrease_factor
+        self.latency_tolerance = latency_tolerance
+        self._clock = clock
+        self._limit = float(max(min_limit, min(initial_limit, max_limit)))
+        self._in_flight = 0
+        self._min_latency: Optional[float] = None
+        self._last_decrease = float('-inf')
+        self._cond = threading.Condition()
+        self.history: List[LimitChange] = []
+
+    @property
+    def limit(self) -> int:
+        return int(self._limit)
+
+    @property
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def acquire(self):
+        """Wait for a free slot under the current limit"""
+        with self._cond:
+            while self._in_flight >= int(self._limit):
+                self._cond.wait()
+            self._in_flight += 1
+
+    def release(self):
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _set_limit(self, value: float, reason: str):
+        old = int(self._limit)
+        self._limit = max(float(self.min_limit), min(float(self.max_limit), value))
+        if int(self._limit) != old:
+            self.history.append(LimitChange(self._clock(), old, int(self._limit), reason))
+            logger.debug(f"Concurrency limit {old} -> {int(self._limit)} ({reason})")
+            self._cond.notify_all()
+
+    def _decrease(self, reason: str):
+        # At most one cut per best-case round trip, so one burst of failures
+        # from the same window does not collapse the limit to the floor
+        now = self._clock()
+        if now - self._last_decrease < (self._min_latency or 0.0):
+            return
+        self._last_decrease = now
+        self._set_limit(self._limit * self.decrease_factor, reason)
+
+    def on_success(self, latency: float):
+        """Record a successful call and its latency"""
+        with self._cond:
+            if self._min_latency is None or latency < self._min_latency:
+                self._min_latency = latency
+            if latency > self._min_latency * self.latency_tolerance:
+                self._decrease("latency")
+            else:
+                # +1 per full window of successes at the current limit
+                self._set_limit(self._limit + 1.0 / int(self._limit), "increase")
+
+    def on_overload(self):
+        """Record a 429/5xx response"""
+        with self._cond:
+            self._decrease("overload")
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                'limit': int(self._limit),
+                'in_flight': self._in_flight,
+                'min_latency': self._min_latency,
+                'limit_changes': list(self.history),
+            }
+
+
+class AdaptiveFetcher:
+    """Run a fetch function over many items under adaptive concurrency and a rate limit"""
+
+    def __init__(self, limiter: Optional[AIMDLimiter] = None,
+                 rate_limiter: Optional[TokenBucket] = None, max_retries: int = 3,
+                 backoff: float = 0.1, max_backoff: float = 10.0,
+                 sleep: Callable[[float], None] = time.sleep):
+        """
+        backoff / max_backoff: retry n waits about backoff * 2 ** (n - 1)
+        seconds (jittered, capped), unless the upstream sent Retry-After
+        """
+        self.limiter = limiter or AIMDLimiter()
+        self.rate_limiter = rate_limiter
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+
+    def retry_delay(self, error: BaseException, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (1-based)"""
+        delay = retry_after(error)
+        if delay is None:
+            delay = self.backoff * 2 ** (attempt - 1)
+            delay = delay / 2 + random.uniform(0, delay / 2)  # spread out workers that failed together
+        return min(delay, self.max_backoff)
+
+    def _call(self, fn: Callable[[Any], Any], item: Any) -> Any:
+        attempt = 0
+        while True:
+            if self.rate_limiter is not None:
+                self.rate_limiter.acquire()
+            self.limiter.acquire()
+            started = time.monotonic()
+            try:
+                result = fn(item)
+            except requests.RequestException as e:
+                if not is_overload(e):
+                    raise
+                self.limiter.on_overload()
+                attempt += 1
+                if attempt > self.max_retries:
+                    raise
+                error = e
+            else:
+                self.limiter.on_success(time.monotonic() - started)
+                return result
+            finally:
+                self.limiter.release()
+            # Back off outside the limiter, so waiting does not hold a concurrency slot
+            delay = self.retry_delay(error, attempt)
+            logger.warning(f"Upstream overloaded (HTTP {status_code_of(error)}), retrying {item!r} "
+                           f"in {delay:.2f}s at limit {self.limiter.limit}")
+            self._sleep(delay)
+
+    def map(self, fn: Callable[[Any], Any], items: Iterable[Any]) -> List[Any]:
+        """Apply ``fn`` to every item, returning results in input order"""
+        items = list(items)
+        if not items:
+            return []
+        workers = min(self.limiter.max_limit, len(items))
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(lambda item: self._call(fn, item), items))
+
+    def metrics(self) -> Dict[str, Any]:
+        """Current limit and the history of limit changes"""
+        return self.limiter.metrics()
@@ -1,2 +1,116 @@
 # Configuration for FanCode SDET Assignment
-from config_py import *
+"""
+Typed settings, read from environment variables once and cached.
+
+``get_settings()`` parses the environment on first use and returns the same
+frozen ``Settings`` instance afterwards; ``APIClient`` and
+``FanCodeCityValidator`` take their defaults from it. Call
+``reload_settings()`` after changing the environment (e.g. in tests).
+"""
+
+import os
+from dataclasses import dataclass, field, fields
+from functools import lru_cache
+from typing import Any, Mapping, Optional
+
+FETCH_STRATEGIES = ('sequential', 'adaptive', 'pipeline', 'streaming')
+CASSETTE_MODES = ('off', 'record', 'replay')
+# Strategies whose fetches run on worker threads and so need a thread-safe APIClient
+CONCURRENT_FETCH_STRATEGIES = ('adaptive', 'pipeline')
+
+
+def _env(name: str, default: Any) -> Any:
+    return field(default=default, metadata={'env': name})
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Runtime settings; each field is overridable through the named env var"""
+
+    # Upstream API and business rules
+    api_base_url: str = _env('API_BASE_URL', "http://jsonplaceholder.typicode.com")
+    lat_min: float = _env('FANCODE_LAT_MIN', -40.0)
+    lat_max: float = _env('FANCODE_LAT_MAX', 5.0)
+    lng_min: float = _env('FANCODE_LNG_MIN', 5.0)
+    lng_max: float = _env('FANCODE_LNG_MAX', 100.0)
+    completion_threshold: float = _env('COMPLETION_THRESHOLD', 50.0)
+    log_level: str = _env('LOG_LEVEL', "INFO")
+
+    # Performance knobs
+    max_workers: int = _env('FANCODE_MAX_WORKERS', 8)
+    rate_limit: Optional[float] = _env('FANCODE_RATE_LIMIT', None)
+    pool_connections: int = _env('FANCODE_POOL_CONNECTIONS', 10)
+    pool_maxsize: int = _env('FANCODE_POOL_MAXSIZE', 10)
+    request_timeout: float = _env('FANCODE_REQUEST_TIMEOUT', 10.0)
+    run_timeout: Optional[float] = _env('FANCODE_RUN_TIMEOUT', None)
+    cache_dir: str = _env('FANCODE_CACHE_DIR', ".cache")
+    cache_ttl: float = _env('FANCODE_CACHE_TTL', 300.0)
+    batch_size: int = _env('FANCODE_BATCH_SIZE', 100)
+    queue_size: int = _env('FANCODE_QUEUE_SIZE', 64)
+    fetch_strategy: str = _env('FANCODE_FETCH_STRATEGY', "sequential")
+    spill_threshold: int = _env('FANCODE_SPILL_THRESHOLD', 1_000_000)
+    shared_dataset: str = _env('FANCODE_SHARED_DATASET', "")
+
+    # Recorded API traffic (cassette.py)
+    cassette_mode: str = _env('FANCODE_CASSETTE_MODE', "off")
+    cassette_path: str = _env('FANCODE_CASSETTE_PATH', os.path.join("tests", "cassettes", "api.json.gz"))
+    cassette_latency: float = _env('FANCODE_CASSETTE_LATENCY', 0.0)
+
+    # Validation service (service.py)
+    service_host: str = _env('FANCODE_SERVICE_HOST', "127.0.0.1")
+    service_port: int = _env('FANCODE_SERVICE_PORT', 8080)
+    refresh_interval: float = _env('FANCODE_REFRESH_INTERVAL', 60.0)
+
+    def __post_init__(self):
+        if self.fetch_strategy not in FETCH_STRATEGIES:
+            raise ValueError(f"FANCODE_FETCH_STRATEGY must be one of {FETCH_STRATEGIES}, "
+                             f"got {self.fetch_strategy!r}")
+        if self.cassette_mode not in CASSETTE_MODES:
+            raise ValueError(f"FANCODE_CASSETTE_MODE must be one of {CASSETTE_MODES}, "
+                             f"got {self.cassette_mode!r}")
+        if self.rate_limit is not None and self.rate_limit <= 0:
+            raise ValueError("rate_limit must be positive")
+        if self.lat_min > self.lat_max or self.lng_min > self.lng_max:
+            raise ValueError("FanCode city bounds are inverted")
+        for name in ('max_workers', 'pool_connections', 'pool_maxsize', 'batch_size', 'queue_size',
+                     'spill_threshold'):
+            if getattr(self, name) < 1:
+                raise ValueError(f"{name} must be at least 1")
+
+    @classmethod
+    def from_env(cls, environ: Optional[Mapping[str, str]] = None) -> 'Settings':
+        """Build settings from ``environ`` (default: os.environ)"""
+        environ = os.environ if environ is None else environ
+        values = {}
+        for f in fields(cls):
+            raw = environ.get(f.metadata['env'])
+            if raw is None or raw.strip() == "":
+                continue
+            values[f.name] = _parse(f.metadata['env'], raw.strip(), f.default)
+        return cls(**values)
+
+
+def _parse(name: str, raw: str, default: Any) -> Any:
+    """Convert an env string to the type of the field's default"""
+    try:
+        if isinstance(default, bool):
+            return raw.lower() in ('1', 'true', 'yes', 'on')
+        if isinstance(default, int):
+            return int(raw)
+        if isinstance(default, float) or default is None:
+            return float(raw)
+        return raw
+    except ValueError:
+        raise ValueError(f"Invalid value for {name}: {raw!r}") from None
+
+
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Settings parsed from the environment on first call, then cached"""
+    return Settings.from_env()
+
+
+def reload_settings() -> Settings:
+    """Drop the cached settings and parse the environment again"""
+    get_settings.cache_clear()
+    return get_settings()
@@ -2,4 +2,65 @@
 Pytest configuration and shared fixtures for FanCode SDET Assignment
 """
 
-# Place any custom fixtures or hooks here as needed.
+import os
+import pytest
+from api_client import APIClient
+from cassette import save_cassettes
+from config import CASSETTE_MODES, get_settings, reload_settings
+from httpcache import SharedHTTPCache
+from shared import SharedDataset
+
+
+def pytest_addoption(parser):
+    parser.addoption("--no-http-cache", action="store_true", default=False,
+                     help="fetch from the live API in every fixture instead of sharing cached responses")
+    parser.addoption("--cassette-mode", choices=CASSETTE_MODES, default=None,
+                     help="record API responses to, or replay them from, the cassette "
+                          "(default: FANCODE_CASSETTE_MODE, else off)")
+    parser.addoption("--cassette-latency", type=float, default=None,
+                     help="seconds of simulated latency per replayed request")
+
+
+def pytest_configure(config):
+    # Options win over the environment; every APIClient reads them through settings
+    for option, env in (("--cassette-mode", "FANCODE_CASSETTE_MODE"),
+                        ("--cassette-latency", "FANCODE_CASSETTE_LATENCY")):
+        value = config.getoption(option)
+        if value is not None:
+            os.environ[env] = str(value)
+    reload_settings()
+
+
+def pytest_sessionfinish(session, exitstatus):
+    save_cassettes()
+
+
+@pytest.fixture(scope="session")
+def http_cache(request, tmp_path_factory):
+    """
+    Response cache shared by every xdist worker of this run: the first
+    worker to need a URL fetches it, the rest read its copy. None with
+    --no-http-cache, or when a cassette is recording or replaying instead
+    """
+    if request.config.getoption("--no-http-cache") or get_settings().cassette_mode != 'off':
+        return None
+    base = tmp_path_factory.getbasetemp()
+    if os.environ.get("PYTEST_XDIST_WORKER"):
+        base = base.parent  # workers' base temp dirs share one parent per run
+    return SharedHTTPCache(str(base / "http-cache"))
+
+
+@pytest.fixture(scope="session")
+def shared_dataset(http_cache):
+    """
+    The dataset as shared-memory columns: attached zero-copy when
+    FANCODE_SHARED_DATASET names a published segment (run_tests.sh
+    --parallel publishes one for all workers), otherwise loaded once here
+    """
+    name = get_settings().shared_dataset
+    if name:
+        dataset = SharedDataset.attach(name)
+    else:
+        dataset = SharedDataset.load(APIClient(adapter=http_cache.adapter() if http_cache else None))
+    yield dataset
+    dataset.close()
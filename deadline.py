@@ -0,0 +1,72 @@
+"""
+End-to-end deadline budgets.
+
+A ``Deadline`` is created once for a whole run and handed down to every
+fetch; each request gets ``deadline.timeout()``, i.e. whatever budget is
+left. ``deadline.stage(name, seconds)`` derives a per-stage deadline that
+never outlives its parent.
+
+requests applies a timeout to the connect and to each socket read, not to
+the whole response: a server that keeps trickling bytes can hold one call
+past the budget. The overrun is caught at the next check (the next
+request's ``timeout()`` or the aggregate stage), not inside that call.
+"""
+
+import time
+from typing import Callable, Optional, Union
+
+
+class DeadlineExceeded(TimeoutError):
+    """Raised when a deadline has no budget left"""
+
+
+class Deadline:
+    """Absolute expiry on the monotonic clock; ``seconds=None`` means unbounded"""
+
+    def __init__(self, seconds: Optional[float], name: str = "run",
+                 clock: Callable[[], float] = time.monotonic, _expires_at: Optional[float] = None):
+        self.name = name
+        self._clock = clock
+        if _expires_at is not None:
+            self.expires_at: Optional[float] = _expires_at
+        else:
+            self.expires_at = None if seconds is None else clock() + seconds
+
+    @classmethod
+    def coerce(cls, deadline: Union['Deadline', float, None]) -> 'Deadline':
+        """Accept a Deadline, a number of seconds, or None (unbounded)"""
+        if isinstance(deadline, Deadline):
+            return deadline
+        return cls(deadline)
+
+    def remaining(self) -> Optional[float]:
+        """Seconds left, or None when unbounded"""
+        if self.expires_at is None:
+            return None
+        return max(0.0, self.expires_at - self._clock())
+
+    @property
+    def expired(self) -> bool:
+        return self.expires_at is not None and self._clock() >= self.expires_at
+
+    def timeout(self, cap: Optional[float] = None) -> Optional[float]:
+        """Timeout for the next request: remaining budget, optionally capped"""
+        remaining = self.remaining()
+        if remaining is not None and remaining <= 0:
+            raise DeadlineExceeded(f"deadline '{self.name}' expired")
+        if remaining is None:
+            return cap
+        return remaining if cap is None else min(remaining, cap)
+
+    def stage(self, name: str, seconds: Optional[float] = None) -> 'Deadline':
+        """Child deadline for one stage, bounded by both ``seconds`` and this deadline"""
+        expires_at = self.expires_at
+        if seconds is not None:
+            stage_end = self._clock() + seconds
+            expires_at = stage_end if expires_at is None else min(expires_at, stage_end)
+        if expires_at is None:
+            return Deadline(None, name=name, clock=self._clock)
+        return Deadline(None, name=name, clock=self._clock, _expires_at=expires_at)
+
+    def __repr__(self) -> str:
+        return f"Deadline({self.name!r}, remaining={self.remaining()})"
@@ -0,0 +1,228 @@
+"""
+Schema-driven decoders for JSONPlaceholder payloads.
+
+Each model declares its fields once as a tuple of ``Field`` entries and
+``compile_decoder`` turns that schema into a specialised, loop-free parse
+function at import time. The generated function does plain subscripts and a
+single combined type check, and builds instances without going through the
+dataclass ``__init__``. Malformed rows fall back to a slower checker that
+reports structured ``RowError`` entries instead of bare ``KeyError``s.
+"""
+
+import codecs
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence
+from accessors import path_source, split_path
+
+logger = logging.getLogger(__name__)
+
+_DECODE_ERRORS = (KeyError, IndexError, TypeError, ValueError)
+
+
+@dataclass(frozen=True)
+class Field:
+    """Schema entry mapping a payload path to a model attribute"""
+    name: str
+    path: str
+    type: type
+    coerce: bool = False  # convert with ``type(value)`` instead of requiring the exact type
+
+
+class RowError(NamedTuple):
+    """A single problem found while decoding one payload row"""
+    row: Optional[int]
+    field: str
+    message: str
+
+    def __str__(self) -> str:
+        where = f"row {self.row}: " if self.row is not None else ""
+        return f"{where}{self.field}: {self.message}"
+
+
+class DecodeError(ValueError):
+    """Raised when one or more payload rows do not match the model schema"""
+
+    def __init__(self, errors: List[RowError]):
+        self.errors = list(errors)
+        shown = "; ".join(str(error) for error in self.errors[:5])
+        more = f" (+{len(self.errors) - 5} more)" if len(self.errors) > 5 else ""
+        super().__init__(f"{len(self.errors)} malformed field(s): {shown}{more}")
+
+
+class DecodeResult(NamedTuple):
+    """Outcome of a bulk decode: successfully built items plus per-row errors"""
+    items: List[Any]
+    errors: List[RowError]
+
+
+def _type_test(var: str, field: Field) -> Optional[str]:
+    """Return the exact-type check for a field, or None when it is coerced"""
+    if field.coerce:
+        return None
+    return f"type({var}) is _t_{field.name}"
+
+
+class Decoder:
+    """Compiled decoder for one model class"""
+
+    def __init__(self, cls: type, fields: Sequence[Field]):
+        self.cls = cls
+        self.fields = tuple(fields)
+        self.source = self._render()
+        namespace: Dict[str, Any] = {'_new': object.__new__, '_set': object.__setattr__, '_cls': cls,
+                                     '_Mismatch': TypeError}
+        for field in self.fields:
+            namespace[f"_t_{field.name}"] = field.type
+        exec(compile(self.source, f"<decoder {cls.__name__}>", "exec"), namespace)
+        self.decode: Callable[[Dict], Any] = namespace['decode']
+
+    def _render(self) -> str:
+        lines = ["def decode(data):"]
+        values = []
+        checks = []
+        for index, field in enumerate(self.fields):
+            var = f"v{index}"
+            lines.append(f"    {var} = {path_source('data', field.path)}")
+            check = _type_test(var, field)
+            if check:
+                checks.append(check)
+            values.append(f"{field.name!r}: _t_{field.name}({var})" if field.coerce else f"{field.name!r}: {var}")
+        if checks:
+            lines.append(f"    if not ({' and '.join(checks)}):")
+            lines.append("        raise _Mismatch")
+        lines.append("    obj = _new(_cls)")
+        # object.__setattr__ also works for frozen dataclasses
+        lines.append(f"    _set(obj, '__dict__', {{{', '.join(values)}}})")
+        lines.append("    return obj")
+        return "\n".join(lines) + "\n"
+
+    def check(self, data: Any, row: Optional[int] = None) -> List[RowError]:
+        """Walk the schema field by field and describe everything wrong with a row"""
+        if not isinstance(data, dict):
+            return [RowError(row, "<row>", f"expected object, got {type(data).__name__}")]
+
+        errors = []
+        for field in self.fields:
+            value: Any = data
+            walked = []
+            missing = False
+            for key in split_path(field.path):
+                if not isinstance(value, dict) or key not in value:
+                    walked.append(key)
+                    errors.append(RowError(row, field.path, f"missing key '{'.'.join(walked)}'"))
+                    missing = True
+                    break
+                walked.append(key)
+                value = value[key]
+            if missing:
+                continue
+            if field.coerce:
+                try:
+                    field.type(value)
+                except _DECODE_ERRORS:
+                    errors.append(RowError(row, field.path,
+                                           f"cannot convert {value!r} to {field.type.__name__}"))
+            elif type(value) is not field.type:
+                errors.append(RowError(row, field.path,
+                                       f"expected {field.type.__name__}, got {type(value).__name__}"))
+        return errors
+
+    def decode_one(self, data: Dict) -> Any:
+        """Decode a single row, raising DecodeError with field details on failure"""
+        try:
+            return self.decode(data)
+        except _DECODE_ERRORS as e:
+            raise DecodeError(self.check(data) or [RowError(None, "<row>", str(e))]) from None
+
+    def decode_many(self, records: Sequence[Dict]) -> DecodeResult:
+        """Decode a batch; malformed rows are reported by index and skipped"""
+        decode = self.decode
+        try:
+            return DecodeResult([decode(data) for data in records], [])
+        except _DECODE_ERRORS:
+            pass
+
+        # Slow path: at least one row is malformed, so go row by row
+        items = []
+        errors: List[RowError] = []
+        for row, data in enumerate(records):
+            try:
+                items.append(decode(data))
+            except _DECODE_ERRORS as e:
+                errors.extend(self.check(data, row) or [RowError(row, "<row>", str(e))])
+        logger.debug(f"Decoded {len(items)} {self.cls.__name__} rows with {len(errors)} errors")
+        return DecodeResult(items, errors)
+
+
+def compile_decoder(cls: type, fields: Sequence[Field]) -> Decoder:
+    """Generate the specialised decoder for ``cls`` from its schema"""
+    return Decoder(cls, fields)
+
+
+def iter_json_array(chunks: Iterable[bytes], encoding: str = "utf-8") -> Iterator[Any]:
+    """
+    Decode a top-level JSON array from byte chunks one element at a time,
+    so a large response body never has to be held in memory as a whole.
+    Malformed separators and anything but whitespace after the closing
+    bracket raise ValueError.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder(encoding)()
+    chunks = iter(chunks)
+    buffer, pos, exhausted = "", 0, False
+    # 'open': before '['; 'first': after '['; 'next': after ','; 'after': after a value; 'closed': after ']'
+    state = 'open'
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in _WHITESPACE:
+            pos += 1
+        if pos < len(buffer):
+            char = buffer[pos]
+            if state == 'open':
+                if char != '[':
+                    raise ValueError(f"expected a JSON array, got {char!r}")
+                state = 'first'
+                pos += 1
+                continue
+            if state == 'closed':
+                raise ValueError(f"unexpected {char!r} after the JSON array")
+            if state == 'after':
+                if char not in ',]':
+                    raise ValueError(f"expected ',' or ']' after an array element, got {char!r}")
+                state = 'next' if char == ',' else 'closed'
+                pos += 1
+                continue
+            if char == ']' and state == 'first':
+                state = 'closed'
+                pos += 1
+                continue
+            if char in ',]':
+                raise ValueError(f"expected an array element, got {char!r}")
+            try:
+                item, end = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if exhausted:
+                    raise
+            else:
+                # A value ending exactly at the buffer edge (e.g. a number) may continue in the next chunk
+                if end < len(buffer) or exhausted:
+                    yield item
+                    pos = end
+                    state = 'after'
+                    continue
+        if exhausted:
+            if state == 'closed':
+                return
+            raise ValueError("truncated JSON array")
+        chunk = next(chunks, None)
+        if chunk is None:
+            exhausted = True
+            buffer = buffer[pos:] + text.decode(b"", final=True)
+        else:
+            buffer = buffer[pos:] + text.decode(chunk)
+        pos = 0
+
+
+_WHITESPACE = " \t\r\n"
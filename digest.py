@@ -0,0 +1,177 @@
+"""
+Dataset fingerprints as a hash tree.
+
+``DatasetDigest`` hashes every user and todo row, groups the row hashes into
+buckets by user id range (todos follow their owner) and builds a fixed-shape
+tree of ``fanout``-way nodes over the buckets. Two datasets are equal exactly
+when their roots are; when they are not, ``diff`` descends only into the
+subtrees whose hashes differ and reports the changed buckets and the user and
+todo ids inside them. Because the shape depends only on ids, digests built on
+different machines or from different runs can be compared node by node
+(``children(level, index)``) without shipping the data, and ``to_dict`` lets a
+digest be stored next to a snapshot.
+"""
+
+import hashlib
+import json
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from todo import Todo
+from user import User
+
+_DIGEST_SIZE = 16
+
+# Rows within a bucket are keyed by (kind, id) so users and todos never collide
+RowKey = Tuple[str, int]
+
+
+def _hash(data: bytes) -> bytes:
+    return hashlib.blake2b(data, digest_size=_DIGEST_SIZE).digest()
+
+
+def user_hash(user: User) -> bytes:
+    return _hash(json.dumps([user.id, user.name, user.username, user.email, user.lat, user.lng, user.address],
+                            sort_keys=True, separators=(',', ':')).encode())
+
+
+def todo_hash(todo: Todo) -> bytes:
+    return _hash(json.dumps([todo.id, todo.user_id, todo.title, todo.completed],
+                            separators=(',', ':')).encode())
+
+
+class DigestDiff(NamedTuple):
+    """Where two digests differ"""
+    buckets: List[Tuple[int, int]]  # (first, last) user id of each differing bucket
+    user_ids: List[int]             # users added, removed or changed
+    todo_ids: List[int]             # todos added, removed or changed
+    nodes_compared: int             # tree nodes whose hashes were compared
+
+    @property
+    def identical(self) -> bool:
+        return not self.buckets
+
+
+class DatasetDigest:
+    """Hash tree over users and todos, bucketed by user id range"""
+
+    def __init__(self, users: Iterable[User], todos: Iterable[Todo], bucket_size: int = 64,
+                 fanout: int = 16, levels: int = 8):
+        """
+        bucket_size: consecutive user ids per leaf bucket
+        fanout / levels: tree shape; covers user ids below bucket_size * fanout ** levels
+        """
+        if bucket_size < 1 or fanout < 2 or levels < 1:
+            raise ValueError("bucket_size must be at least 1, fanout at least 2 and levels at least 1")
+        self.bucket_size = bucket_size
+        self.fanout = fanout
+        self.levels = levels
+        self._leaves: Dict[int, Dict[RowKey, bytes]] = {}
+        for user in users:
+            self._leaf(user.id)[('user', user.id)] = user_hash(user)
+        for todo in todos:
+            self._leaf(todo.user_id)[('todo', todo.id)] = todo_hash(todo)
+        self._build()
+
+    def _leaf(self, user_id: int) -> Dict[RowKey, bytes]:
+        bucket = user_id // self.bucket_size
+        if not 0 <= bucket < self.fanout ** self.levels:
+            raise ValueError(f"user id {user_id} is outside the digest's id range")
+        return self._leaves.setdefault(bucket, {})
+
+    def _build(self):
+        # _nodes[level] maps node index -> hash; level 0 are the buckets, level ``levels`` the root
+        level_nodes = {bucket: _hash(b''.join(kind.encode() + row_id.to_bytes(8, 'big', signed=True) + row
+                                              for (kind, row_id), row in sorted(rows.items())))
+                       for bucket, rows in self._leaves.items()}
+        self._nodes: List[Dict[int, bytes]] = [level_nodes]
+        for _ in range(self.levels):
+            parents: Dict[int, List[Tuple[int, bytes]]] = {}
+            for index, node in level_nodes.items():
+                parents.setdefault(index // self.fanout, []).append((index, node))
+            level_nodes = {parent: _hash(b''.join(index.to_bytes(8, 'big') + node for index, node in sorted(children)))
+                           for parent, children in parents.items()}
+            self._nodes.append(level_nodes)
+
+    @classmethod
+    def from_api(cls, api_client, **kwargs) -> 'DatasetDigest':
+        """Digest of the API's (or a Repository's) current users and todos"""
+        return cls(api_client.get_users(), api_client.get_todos(), **kwargs)
+
+    @property
+    def root(self) -> str:
+        """Hex root hash; empty datasets share the all-zero root"""
+        root = self._nodes[-1].get(0)
+        return root.hex() if root is not None else '0' * (2 * _DIGEST_SIZE)
+
+    def node(self, level: int, index: int) -> Optional[bytes]:
+        return self._nodes[level].get(index)
+
+    def children(self, level: int, index: int) -> Dict[int, bytes]:
+        """Non-empty children of node (level, index), keyed by child index at level - 1"""
+        below = self._nodes[level - 1]
+        first = index * self.fanout
+        return {child: below[child] for child in range(first, first + self.fanout) if child in below}
+
+    def bucket_rows(self, bucket: int) -> Dict[RowKey, bytes]:
+        return dict(self._leaves.get(bucket, {}))
+
+    def _compatible(self, other: 'DatasetDigest'):
+        if (self.bucket_size, self.fanout, self.levels) != (other.bucket_size, other.fanout, other.levels):
+            raise ValueError("digests were built with different bucket_size, fanout or levels")
+
+    def diff(self, other: 'DatasetDigest') -> DigestDiff:
+        """Descend from the roots through differing nodes only"""
+        self._compatible(other)
+        return self.diff_with(other.children, other.bucket_rows, other.node(self.levels, 0))
+
+    def diff_with(self, children: Callable[[int, int], Dict[int, bytes]],
+                  bucket_rows: Callable[[int], Dict[RowKey, bytes]], root: Optional[bytes]) -> DigestDiff:
+        """
+        Diff against a digest reachable only through callbacks, e.g. on another
+        host: ``children(level, index)`` and ``bucket_rows(bucket)`` are called
+        only for nodes whose hashes differ
+        """
+        compared = 1
+        if self.node(self.levels, 0) == root:
+            return DigestDiff([], [], [], compared)
+        frontier = [0]
+        for level in range(self.levels, 0, -1):
+            next_frontier = []
+            for index in frontier:
+                mine, theirs = self.children(level, index), children(level, index)
+                for child in mine.keys() | theirs.keys():
+                    compared += 1
+                    if mine.get(child) != theirs.get(child):
+                        next_frontier.append(child)
+            frontier = next_frontier
+        buckets: List[Tuple[int, int]] = []
+        user_ids: Set[int] = set()
+        todo_ids: Set[int] = set()
+        for bucket in sorted(frontier):
+            buckets.append((bucket * self.bucket_size, (bucket + 1) * self.bucket_size - 1))
+            mine, theirs = self._leaves.get(bucket, {}), bucket_rows(bucket)
+            for kind, row_id in mine.keys() | theirs.keys():
+                if mine.get((kind, row_id)) != theirs.get((kind, row_id)):
+                    (user_ids if kind == 'user' else todo_ids).add(row_id)
+        return DigestDiff(buckets, sorted(user_ids), sorted(todo_ids), compared)
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable form (the leaves; inner nodes are rebuilt on load)"""
+        return {
+            'bucket_size': self.bucket_size, 'fanout': self.fanout, 'levels': self.levels,
+            'buckets': {str(bucket): {f"{kind}:{row_id}": row.hex() for (kind, row_id), row in rows.items()}
+                        for bucket, rows in self._leaves.items()},
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'DatasetDigest':
+        digest = cls.__new__(cls)
+        digest.bucket_size, digest.fanout, digest.levels = data['bucket_size'], data['fanout'], data['levels']
+        digest._leaves = {}
+        for bucket, rows in data['buckets'].items():
+            leaf = digest._leaves[int(bucket)] = {}
+            for key, row in rows.items():
+                kind, row_id = key.split(':')
+                leaf[(kind, int(row_id))] = bytes.fromhex(row)
+        digest._build()
+        return digest
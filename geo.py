@@ -0,0 +1,213 @@
+"""
+City boundaries: boxes, polygons and multipolygons.
+
+``Polygon`` prefilters on its bounding box, then looks the point up in a
+grid built once at construction. Edges are bucketed into latitude bands and
+each band's ray crossings classify the grid cells: a cell no edge passes
+through is wholly inside or outside and answers in one lookup. In the few
+boundary cells the point is compared with a reference point of known state by
+crossing only the edges inside that cell, so detailed boundaries cost about
+as much as a box check. Every region also has a batch form,
+``contains_many(lats, lngs)``, for classifying a whole user column at once.
+
+Points are (lat, lng); ``from_geojson`` accepts GeoJSON geometries, whose
+coordinates are [lng, lat].
+"""
+
+from bisect import bisect_right
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+Point = Tuple[float, float]
+Bounds = Tuple[float, float, float, float]  # lat_min, lat_max, lng_min, lng_max
+
+_OUTSIDE, _INSIDE, _BOUNDARY = 0, 1, 2
+
+
+def _widest_gap_middle(low: float, high: float, cuts: Sequence[float]) -> float:
+    """Middle of the widest gap that ``cuts`` leave in [low, high]"""
+    points = sorted({low, high, *(cut for cut in cuts if low < cut < high)})
+    if len(points) < 2:
+        return low
+    width, start = max((b - a, a) for a, b in zip(points, points[1:]))
+    return start + width / 2
+
+
+class Box:
+    """Axis-aligned lat/lng box (the original FanCode city definition)"""
+
+    def __init__(self, lat_min: float, lat_max: float, lng_min: float, lng_max: float):
+        self.bounds: Bounds = (lat_min, lat_max, lng_min, lng_max)
+
+    def contains(self, lat: float, lng: float) -> bool:
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+        return lat_min <= lat <= lat_max and lng_min <= lng <= lng_max
+
+    def contains_many(self, lats: Sequence[float], lngs: Sequence[float]) -> List[bool]:
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+        return [lat_min <= lat <= lat_max and lng_min <= lng <= lng_max for lat, lng in zip(lats, lngs)]
+
+
+class Polygon:
+    """Polygon with optional holes, indexed by latitude bands and a cell grid"""
+
+    def __init__(self, exterior: Sequence[Point], holes: Sequence[Sequence[Point]] = (),
+                 bands: Optional[int] = None):
+        """
+        exterior / holes: rings of (lat, lng) points; closing the ring is optional
+        bands: grid resolution in both directions (default: about one per
+            four edges, at most 256)
+        """
+        if len(exterior) < 3:
+            raise ValueError("a polygon needs at least three points")
+        lats = [lat for lat, _ in exterior]
+        lngs = [lng for _, lng in exterior]
+        self.bounds: Bounds = (min(lats), max(lats), min(lngs), max(lngs))
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+
+        segments = [(lat1, lng1, lat2, lng2)
+                    for ring in (exterior, *holes)
+                    for (lat1, lng1), (lat2, lng2) in zip(ring, [*ring[1:], ring[0]])
+                    if (lat1, lng1) != (lat2, lng2)]
+        self.edge_count = len(segments)
+        self.band_count = bands or max(1, min(256, len(segments) // 4))
+        self._band_height = (lat_max - lat_min) / self.band_count or 1.0
+        self._cell_width = (lng_max - lng_min) / self.band_count or 1.0
+
+        # Edges per latitude band, as (lat_low, lat_high, lng at lat_low, d(lng)/d(lat)), used to
+        # ray-cast the reference points; horizontal edges never cross a horizontal ray
+        self._bands: List[List[Tuple[float, float, float, float]]] = [[] for _ in range(self.band_count)]
+        # Segments passing through each grid cell
+        cell_segments: Dict[int, List[Tuple[float, float, float, float]]] = {}
+        for segment in segments:
+            lat1, lng1, lat2, lng2 = segment
+            if lat1 > lat2:
+                lat1, lng1, lat2, lng2 = lat2, lng2, lat1, lng1
+            slope = (lng2 - lng1) / (lat2 - lat1) if lat2 != lat1 else 0.0
+            for band in range(self._band(lat1), self._band(lat2) + 1):
+                if lat2 != lat1:
+                    self._bands[band].append((lat1, lat2, lng1, slope))
+                band_low = lat_min + band * self._band_height
+                lng_a = lng1 + (max(lat1, band_low) - lat1) * slope
+                lng_b = lng1 + (min(lat2, band_low + self._band_height) - lat1) * slope
+                if lat2 == lat1:
+                    lng_a, lng_b = lng1, lng2
+                for column in range(self._column(min(lng_a, lng_b)), self._column(max(lng_a, lng_b)) + 1):
+                    cell_segments.setdefault(band * self.band_count + column, []).append(segment)
+
+        # Cells without segments are wholly inside or outside; boundary cells keep a reference
+        # point's state and their segments, so a query only crosses ref->point against a few
+        # local segments instead of casting a ray across the polygon. The reference point must
+        # lie off every edge, or the ray cast (half-open) and the crossing test (strict) would
+        # break the tie in opposite directions and invert the whole cell
+        self._cells = bytearray(self.band_count * self.band_count)
+        self._boundary: Dict[int, Tuple[float, float, bool, Tuple]] = {}
+        for band, band_edges in enumerate(self._bands):
+            band_low = lat_min + band * self._band_height
+            # A row away from every vertex latitude: no horizontal edge lies on it and no
+            # edge crosses it at an endpoint
+            ref_lat = _widest_gap_middle(band_low, min(band_low + self._band_height, lat_max),
+                                         [lat for low, high, _, _ in band_edges for lat in (low, high)])
+            # One sorted list of ray crossings per band gives every reference state by bisection
+            crossings = sorted(base + (ref_lat - low) * slope
+                               for low, high, base, slope in band_edges if low <= ref_lat < high)
+            for column in range(self.band_count):
+                index = band * self.band_count + column
+                cell_low = lng_min + column * self._cell_width
+                cell_high = min(cell_low + self._cell_width, lng_max)
+                # Farthest from the edges crossing this row inside the cell
+                ref_lng = _widest_gap_middle(cell_low, cell_high, crossings[
+                    bisect_right(crossings, cell_low):bisect_right(crossings, cell_high)])
+                inside = (len(crossings) - bisect_right(crossings, ref_lng)) % 2 == 1
+                if index in cell_segments:
+                    self._cells[index] = _BOUNDARY
+                    self._boundary[index] = (ref_lat, ref_lng, inside, tuple(cell_segments[index]))
+                else:
+                    self._cells[index] = _INSIDE if inside else _OUTSIDE
+
+    def _band(self, lat: float) -> int:
+        return max(0, min(self.band_count - 1, int((lat - self.bounds[0]) / self._band_height)))
+
+    def _column(self, lng: float) -> int:
+        return max(0, min(self.band_count - 1, int((lng - self.bounds[2]) / self._cell_width)))
+
+    @staticmethod
+    def _from_reference(boundary: Tuple[float, float, bool, Tuple], lat: float, lng: float) -> bool:
+        """Reference state flipped once per segment crossing the reference->point segment"""
+        ref_lat, ref_lng, inside, segments = boundary
+        d_lat, d_lng = lat - ref_lat, lng - ref_lng
+        for lat1, lng1, lat2, lng2 in segments:
+            if ((d_lat * (lng1 - ref_lng) - d_lng * (lat1 - ref_lat) > 0) !=
+                    (d_lat * (lng2 - ref_lng) - d_lng * (lat2 - ref_lat) > 0)):
+                e_lat, e_lng = lat2 - lat1, lng2 - lng1
+                if ((e_lat * (ref_lng - lng1) - e_lng * (ref_lat - lat1) > 0) !=
+                        (e_lat * (lng - lng1) - e_lng * (lat - lat1) > 0)):
+                    inside = not inside
+        return inside
+
+    def contains(self, lat: float, lng: float) -> bool:
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+        if not (lat_min <= lat <= lat_max and lng_min <= lng <= lng_max):
+            return False
+        index = self._band(lat) * self.band_count + self._column(lng)
+        cell = self._cells[index]
+        if cell != _BOUNDARY:
+            return cell == _INSIDE
+        return self._from_reference(self._boundary[index], lat, lng)
+
+    def contains_many(self, lats: Sequence[float], lngs: Sequence[float]) -> List[bool]:
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+        cells, boundary, from_reference = self._cells, self._boundary, self._from_reference
+        size, last = self.band_count, self.band_count - 1
+        height, width = self._band_height, self._cell_width
+        results = []
+        append = results.append
+        for lat, lng in zip(lats, lngs):
+            if not (lat_min <= lat <= lat_max and lng_min <= lng <= lng_max):
+                append(False)
+                continue
+            index = min(last, int((lat - lat_min) / height)) * size + min(last, int((lng - lng_min) / width))
+            cell = cells[index]
+            if cell != _BOUNDARY:
+                append(cell == _INSIDE)
+            else:
+                append(from_reference(boundary[index], lat, lng))
+        return results
+
+
+class MultiPolygon:
+    """Union of polygons, e.g. a city with islands"""
+
+    def __init__(self, polygons: Sequence[Polygon]):
+        if not polygons:
+            raise ValueError("a multipolygon needs at least one polygon")
+        self.polygons = list(polygons)
+        self.bounds: Bounds = (min(p.bounds[0] for p in polygons), max(p.bounds[1] for p in polygons),
+                               min(p.bounds[2] for p in polygons), max(p.bounds[3] for p in polygons))
+
+    def contains(self, lat: float, lng: float) -> bool:
+        lat_min, lat_max, lng_min, lng_max = self.bounds
+        if not (lat_min <= lat <= lat_max and lng_min <= lng <= lng_max):
+            return False
+        return any(polygon.contains(lat, lng) for polygon in self.polygons)
+
+    def contains_many(self, lats: Sequence[float], lngs: Sequence[float]) -> List[bool]:
+        results = [False] * len(lats)
+        for polygon in self.polygons:
+            for index, inside in enumerate(polygon.contains_many(lats, lngs)):
+                if inside:
+                    results[index] = True
+        return results
+
+
+def from_geojson(geometry: Dict) -> Union[Polygon, MultiPolygon]:
+    """Build a region from a GeoJSON Polygon or MultiPolygon geometry"""
+    def polygon(rings):
+        exterior, *holes = [[(lat, lng) for lng, lat, *_ in ring] for ring in rings]
+        return Polygon(exterior, holes)
+
+    kind = geometry.get('type')
+    if kind == 'Polygon':
+        return polygon(geometry['coordinates'])
+    if kind == 'MultiPolygon':
+        return MultiPolygon([polygon(rings) for rings in geometry['coordinates']])
+    raise ValueError(f"unsupported geometry type: {kind!r}")
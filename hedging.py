@@ -0,0 +1,176 @@
+"""
+Request hedging to cut tail latency.
+
+``Hedger.call(fn)`` runs ``fn`` and, if it has not finished by a configurable
+percentile of recently observed latency, starts a duplicate and returns
+whichever finishes first. The loser is cancelled if it has not started yet,
+otherwise its result is handed to ``discard`` (e.g. to close a response) when
+it arrives. A ``HedgeBudget`` caps hedges to a fraction of primary requests,
+so a slow upstream never sees more than that extra load from us.
+
+The first attempt never waits for a pool: it runs on the caller's thread
+when the budget has no hedge to spend, and otherwise on a thread of its own
+so a winning hedge can return without it. Only hedges go through the
+hedger's executor. Latency is measured from the start of the call, the
+same clock the hedge delay is compared against.
+
+Only hedge idempotent requests (GETs).
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyTracker:
+    """Sliding window of recent latencies with percentile lookup"""
+
+    def __init__(self, window: int = 200, min_samples: int = 10):
+        self.min_samples = min_samples
+        self._samples = deque(maxlen=window)
+        self._lock = threading.Lock()
+
+    def record(self, latency: float):
+        with self._lock:
+            self._samples.append(latency)
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        """Latency at ``percentile`` (0-100), or None until enough samples exist"""
+        with self._lock:
+            if len(self._samples) < self.min_samples:
+                return None
+            ordered = sorted(self._samples)
+        index = min(len(ordered) - 1, int(round(percentile / 100.0 * (len(ordered) - 1))))
+        return ordered[index]
+
+
+class HedgeBudget:
+    """Allows at most ``ratio`` hedges per primary request, plus a small burst"""
+
+    def __init__(self, ratio: float = 0.1, burst: float = 2.0):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def on_request(self):
+        """Earn credit for one primary request"""
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def available(self) -> bool:
+        """Whether a hedge could be paid for right now (try_spend may still lose a race)"""
+        with self._lock:
+            return self._tokens >= 1.0 - 1e-9
+
+    def try_spend(self) -> bool:
+        with self._lock:
+            # Tolerate float drift from summing fractional ratios
+            if self._tokens >= 1.0 - 1e-9:
+                self._tokens = max(0.0, self._tokens - 1.0)
+                return True
+            return False
+
+
+class Hedger:
+    """Issue a duplicate call when the first one is slower than recent latency suggests"""
+
+    def __init__(self, percentile: float = 95.0, budget_ratio: float = 0.1,
+                 window: int = 200, min_samples: int = 10, max_workers: int = 16):
+        """max_workers: hedges in flight at once; first attempts are not limited"""
+        self.percentile = percentile
+        self.tracker = LatencyTracker(window=window, min_samples=min_samples)
+        self.budget = HedgeBudget(ratio=budget_ratio)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="hedge")
+        self._stats_lock = threading.Lock()
+        self.stats = {'requests': 0, 'hedges_sent': 0, 'hedges_won': 0, 'hedges_denied': 0}
+
+    def _count(self, key: str):
+        with self._stats_lock:
+            self.stats[key] += 1
+
+    def _timed(self, fn: Callable[[], Any], started: float) -> Callable[[], Any]:
+        """``fn`` recording its latency from ``started``, i.e. including any queueing"""
+        def run():
+            result = fn()
+            self.tracker.record(time.monotonic() - started)
+            return result
+        return run
+
+    @staticmethod
+    def _in_thread(fn: Callable[[], Any]) -> Future:
+        """Run ``fn`` on a new thread right away, outside any pool"""
+        future: Future = Future()
+        future.set_running_or_notify_cancel()
+
+        def run():
+            try:
+                future.set_result(fn())
+            except BaseException as e:
+                future.set_exception(e)
+        threading.Thread(target=run, name="hedge-primary", daemon=True).start()
+        return future
+
+    @staticmethod
+    def _abandon(future: Future, discard: Optional[Callable[[Any], None]]):
+        """Cancel a losing call, or dispose of its result once it lands"""
+        if future.cancel() or discard is None:
+            return
+
+        def dispose(done: Future):
+            if not done.cancelled() and done.exception() is None:
+                discard(done.result())
+        future.add_done_callback(dispose)
+
+    def call(self, fn: Callable[[], Any], discard: Optional[Callable[[Any], None]] = None) -> Any:
+        """Run ``fn`` with hedging; ``discard`` receives the losing result, if any"""
+        self._count('requests')
+        self.budget.on_request()
+        delay = self.tracker.percentile(self.percentile)
+        started = time.monotonic()
+        if delay is None or not self.budget.available():
+            # No hedge can follow, so nothing needs to outrun this attempt
+            result = self._timed(fn, started)()
+            if delay is not None and time.monotonic() - started > delay:
+                self._count('hedges_denied')
+            return result
+
+        primary = self._in_thread(self._timed(fn, started))
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+        if not self.budget.try_spend():
+            self._count('hedges_denied')
+            return primary.result()
+
+        self._count('hedges_sent')
+        hedge = self._executor.submit(self._timed(fn, time.monotonic()))
+        pending = {primary, hedge}
+        first_error: Optional[BaseException] = None
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    for other in (primary, hedge):
+                        if other is not future:
+                            self._abandon(other, discard)
+                    if future is hedge:
+                        self._count('hedges_won')
+                    return future.result()
+                if first_error is None or future is primary:
+                    first_error = future.exception()
+        raise first_error
+
+    def metrics(self) -> Dict[str, Any]:
+        with self._stats_lock:
+            stats = dict(self.stats)
+        stats['hedge_delay'] = self.tracker.percentile(self.percentile)
+        return stats
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False)
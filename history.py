@@ -0,0 +1,215 @@
+"""
+Run history with delta encoding.
+
+``RunHistory`` records every validation run in SQLite. Most runs store only
+the users whose counts or status changed since the previous run (plus
+removals); every ``keyframe_interval`` runs a full snapshot is written so
+reconstructing any run never replays more than that many deltas. Storage
+therefore grows with change, not with population. Per-user history and
+"who flipped recently" are index lookups over the sparse change rows.
+"""
+
+import logging
+import sqlite3
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from results import ValidationResult
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    recorded_at REAL NOT NULL,
+    keyframe INTEGER NOT NULL,
+    total_users INTEGER NOT NULL,
+    passed_users INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS entries (
+    run_id INTEGER NOT NULL,
+    user_id INTEGER NOT NULL,
+    completed INTEGER,
+    total INTEGER,
+    passed INTEGER,
+    PRIMARY KEY (run_id, user_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_entries_user_run ON entries(user_id, run_id);
+"""
+
+State = Dict[int, Tuple[int, int, int]]  # user_id -> (completed, total, passed)
+
+
+class HistoryPoint(NamedTuple):
+    """One user's counts in one run; counts are None when the user was absent"""
+    run_id: int
+    recorded_at: float
+    completed: Optional[int]
+    total: Optional[int]
+    passed: Optional[bool]
+
+
+class Flip(NamedTuple):
+    """A pass/fail status change between two consecutive runs"""
+    user_id: int
+    run_id: int
+    passed: bool
+
+
+def _state_of(result: Union[ValidationResult, Dict]) -> State:
+    if isinstance(result, ValidationResult):
+        if not result.rows_retained:
+            raise ValueError("cannot record a result whose rows went to a sink")
+        return {user_id: (completed, total, passed) for user_id, completed, total, passed in
+                zip(result.user_ids, result.completed, result.totals, result.passed)}
+    return {row['user_id']: (row['completed_todos'], row['total_todos'], int(row['passed']))
+            for row in result['user_results']}
+
+
+class RunHistory:
+    """Delta-encoded per-user results across runs"""
+
+    def __init__(self, path: str = ":memory:", keyframe_interval: int = 50):
+        if keyframe_interval < 1:
+            raise ValueError("keyframe_interval must be at least 1")
+        self.path = path
+        self.keyframe_interval = keyframe_interval
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript(_SCHEMA)
+        self._latest: Optional[State] = None
+
+    def _last_run(self) -> Optional[Tuple[int, int]]:
+        return self.connection.execute("SELECT id, keyframe FROM runs ORDER BY id DESC LIMIT 1").fetchone()
+
+    def _runs_since_keyframe(self) -> int:
+        row = self.connection.execute(
+            "SELECT COUNT(*) FROM runs WHERE id > COALESCE((SELECT MAX(id) FROM runs WHERE keyframe = 1), 0)"
+        ).fetchone()
+        return row[0]
+
+    def record(self, result: Union[ValidationResult, Dict], recorded_at: Optional[float] = None) -> int:
+        """Store one run (a ValidationResult or a summary dict with 'user_results'); returns its run id"""
+        state = _state_of(result)
+        passed_users = sum(passed for _, _, passed in state.values())
+        with self._lock, self.connection:
+            previous = self._latest if self._latest is not None else self._state_at(None)
+            keyframe = previous is None or self._runs_since_keyframe() + 1 >= self.keyframe_interval
+            run_id = self.connection.execute(
+                "INSERT INTO runs (recorded_at, keyframe, total_users, passed_users) VALUES (?, ?, ?, ?)",
+                (time.time() if recorded_at is None else recorded_at, int(keyframe), len(state), passed_users),
+            ).lastrowid
+            if keyframe:
+                rows = [(run_id, user_id, *values) for user_id, values in state.items()]
+            else:
+                rows = [(run_id, user_id, *values) for user_id, values in state.items()
+                        if previous.get(user_id) != values]
+            # Removal markers, in keyframes too: per-user lookups read a user's last row and
+            # must not carry a departed user's values through a keyframe that omits them
+            if previous is not None:
+                rows.extend((run_id, user_id, None, None, None) for user_id in previous.keys() - state.keys())
+            self.connection.executemany("INSERT INTO entries VALUES (?, ?, ?, ?, ?)", rows)
+            self._latest = state
+        logger.info(f"Recorded run {run_id} ({'keyframe' if keyframe else 'delta'}, {len(rows)} rows)")
+        return run_id
+
+    def _state_at(self, run_id: Optional[int]) -> Optional[State]:
+        """Reconstruct a run from its nearest keyframe plus the deltas after it"""
+        if run_id is None:
+            last = self._last_run()
+            if last is None:
+                return None
+            run_id = last[0]
+        keyframe = self.connection.execute(
+            "SELECT MAX(id) FROM runs WHERE keyframe = 1 AND id <= ?", (run_id,)).fetchone()[0]
+        if keyframe is None:
+            return None
+        state: State = {}
+        for user_id, completed, total, passed in self.connection.execute(
+                "SELECT user_id, completed, total, passed FROM entries WHERE run_id BETWEEN ? AND ? ORDER BY run_id",
+                (keyframe, run_id)):
+            if total is None:
+                state.pop(user_id, None)
+            else:
+                state[user_id] = (completed, total, passed)
+        return state
+
+    def state_at(self, run_id: Optional[int] = None) -> State:
+        """{user_id: (completed, total, passed)} as of ``run_id`` (default: latest run)"""
+        with self._lock:
+            return self._state_at(run_id) or {}
+
+    def run_ids(self, last: Optional[int] = None) -> List[int]:
+        with self._lock:
+            if last is None:
+                return [row[0] for row in self.connection.execute("SELECT id FROM runs ORDER BY id")]
+            rows = self.connection.execute("SELECT id FROM runs ORDER BY id DESC LIMIT ?", (last,)).fetchall()
+            return [row[0] for row in reversed(rows)]
+
+    def user_history(self, user_id: int, last: Optional[int] = None) -> List[HistoryPoint]:
+        """The user's counts in every run (or the last ``last`` runs), oldest first"""
+        with self._lock:
+            query = "SELECT id, recorded_at FROM runs ORDER BY id DESC"
+            runs = self.connection.execute(query + (" LIMIT ?" if last else ""), (last,) if last else ()).fetchall()
+            runs.reverse()
+            if not runs:
+                return []
+            first = runs[0][0]
+            # The value in force at the window start, then the sparse changes inside it
+            current = self.connection.execute(
+                "SELECT completed, total, passed FROM entries WHERE user_id = ? AND run_id <= ? "
+                "ORDER BY run_id DESC LIMIT 1", (user_id, first)).fetchone()
+            changes = dict(((row[0], row[1:]) for row in self.connection.execute(
+                "SELECT run_id, completed, total, passed FROM entries WHERE user_id = ? AND run_id > ?",
+                (user_id, first))))
+        history = []
+        current = current or (None, None, None)
+        for run_id, recorded_at in runs:
+            current = changes.get(run_id, current)
+            completed, total, passed = current
+            history.append(HistoryPoint(run_id, recorded_at, completed, total,
+                                        None if passed is None else bool(passed)))
+        return history
+
+    def flipped_users(self, last: int) -> List[Flip]:
+        """Pass/fail changes made by any of the last ``last`` runs, oldest first"""
+        with self._lock:
+            window = self.connection.execute(
+                "SELECT id FROM runs ORDER BY id DESC LIMIT ?", (last,)).fetchall()
+            if not window:
+                return []
+            start = window[-1][0]
+            # A flip at the window's first run is relative to the run before it
+            changes = self.connection.execute(
+                "SELECT user_id, run_id, passed FROM entries WHERE run_id >= ? "
+                "ORDER BY user_id, run_id", (start,)).fetchall()
+            flips = []
+            previous_user, previous_passed = None, None
+            for user_id, run_id, passed in changes:
+                if user_id != previous_user:
+                    before = self.connection.execute(
+                        "SELECT passed FROM entries WHERE user_id = ? AND run_id < ? "
+                        "ORDER BY run_id DESC LIMIT 1", (user_id, run_id)).fetchone()
+                    previous_user, previous_passed = user_id, before[0] if before else None
+                # Removals (NULL) and returns after a removal are not flips
+                if previous_passed is not None and passed is not None and passed != previous_passed:
+                    flips.append(Flip(user_id, run_id, bool(passed)))
+                previous_passed = passed
+        flips.sort(key=lambda flip: (flip.run_id, flip.user_id))
+        return flips
+
+    def storage_rows(self) -> int:
+        """Entry rows stored across all runs"""
+        with self._lock:
+            return self.connection.execute("SELECT COUNT(*) FROM entries").fetchone()[0]
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,183 @@
+"""
+Cross-process HTTP response cache.
+
+``SharedHTTPCache`` keeps GET responses as files in one directory that any
+number of processes (e.g. pytest-xdist workers) point at. A fresh entry is
+read without locking, since entries are written to a temporary file and
+renamed into place. On a miss the process takes that entry's file lock,
+checks again and only then fetches, so exactly one process hits the
+upstream for each URL while the others wait and read its copy.
+
+``CachingAdapter`` plugs the cache into requests as a transport adapter:
+``APIClient(adapter=cache.adapter())``. Only plain GETs answered 200 are
+cached; conditional requests (If-None-Match / If-Modified-Since) always go
+upstream.
+"""
+
+import hashlib
+import io
+import json
+import logging
+import os
+import tempfile
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, NamedTuple, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+logger = logging.getLogger(__name__)
+
+CONDITIONAL_HEADERS = ('If-None-Match', 'If-Modified-Since')
+
+
+class CachedResponse(NamedTuple):
+    """A stored response: enough to rebuild a requests.Response"""
+    url: str
+    status: int
+    reason: str
+    headers: Dict[str, str]
+    body: bytes
+
+
+def build_response(request: requests.PreparedRequest, cached: CachedResponse,
+                   adapter: Optional[HTTPAdapter] = None) -> requests.Response:
+    """A requests.Response for ``request`` carrying a stored status, headers and body"""
+    response = requests.Response()
+    response.request = request
+    response.url = cached.url
+    response.status_code = cached.status
+    response.reason = cached.reason
+    response.headers = CaseInsensitiveDict(cached.headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response.raw = io.BytesIO(cached.body)
+    response._content = cached.body
+    response._content_consumed = True
+    response.connection = adapter
+    return response
+
+
+def capture(response: requests.Response) -> CachedResponse:
+    """Read a live response fully into a CachedResponse"""
+    headers = {name: value for name, value in response.headers.items()
+               if name.lower() not in ('content-encoding', 'transfer-encoding', 'content-length')}
+    return CachedResponse(response.url, response.status_code, response.reason or '', headers, response.content)
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """Exclusive inter-process lock on ``path`` (created if missing), released on exit"""
+    with open(path, 'a+b') as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            while True:
+                try:
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError:  # LK_LOCK gives up after about 10 seconds; keep waiting
+                    pass
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class SharedHTTPCache:
+    """On-disk response cache shared by every process using the same directory"""
+
+    def __init__(self, directory: str, ttl: Optional[float] = None):
+        """ttl: seconds an entry stays fresh (None: until the directory is removed)"""
+        self.directory = directory
+        self.ttl = ttl
+        os.makedirs(directory, exist_ok=True)
+        self.hits = 0
+        self.fetches = 0
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode()).hexdigest()[:32])
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """The stored response for ``key`` if present and fresh"""
+        path = self._path(key) + '.entry'
+        try:
+            with open(path, 'rb') as f:
+                meta = json.loads(f.readline())
+                body = f.read()
+        except FileNotFoundError:
+            return None
+        if self.ttl is not None and time.time() - meta['stored_at'] > self.ttl:
+            return None
+        return CachedResponse(meta['url'], meta['status'], meta['reason'], meta['headers'], body)
+
+    def put(self, key: str, response: CachedResponse):
+        meta = {'url': response.url, 'status': response.status, 'reason': response.reason,
+                'headers': response.headers, 'stored_at': time.time()}
+        fd, temp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(json.dumps(meta).encode() + b'\n')
+                f.write(response.body)
+            os.replace(temp_path, self._path(key) + '.entry')
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def fetch(self, key: str, load: Callable[[], CachedResponse],
+              store: Callable[[CachedResponse], bool] = lambda response: True) -> CachedResponse:
+        """
+        The cached response for ``key``, or ``load()``'s, fetched by exactly one
+        process at a time; ``store`` decides whether a loaded response is kept
+        """
+        cached = self.get(key)
+        if cached is None:
+            with file_lock(self._path(key) + '.lock'):
+                cached = self.get(key)  # filled while we waited for the lock
+                if cached is None:
+                    self.fetches += 1
+                    logger.debug(f"HTTP cache miss, fetching {key}")
+                    response = load()
+                    if store(response):
+                        self.put(key, response)
+                    return response
+        self.hits += 1
+        return cached
+
+    def adapter(self, **kwargs) -> 'CachingAdapter':
+        """A transport adapter serving GETs through this cache; kwargs go to HTTPAdapter"""
+        return CachingAdapter(self, **kwargs)
+
+    def stats(self) -> Dict[str, int]:
+        return {'hits': self.hits, 'fetches': self.fetches}
+
+
+class CachingAdapter(HTTPAdapter):
+    """HTTPAdapter that answers cacheable GETs from a SharedHTTPCache"""
+
+    def __init__(self, cache: SharedHTTPCache, **kwargs):
+        super().__init__(**kwargs)
+        self.cache = cache
+
+    def send(self, request: requests.PreparedRequest, **kwargs) -> requests.Response:
+        if request.method != 'GET' or any(header in request.headers for header in CONDITIONAL_HEADERS):
+            return super().send(request, **kwargs)
+
+        def load() -> CachedResponse:
+            return capture(super(CachingAdapter, self).send(request, **kwargs))
+
+        cached = self.cache.fetch(request.url, load, store=lambda response: response.status == 200)
+        return build_response(request, cached, self)
@@ -0,0 +1,186 @@
+"""
+Bounded-queue producer/consumer pipeline.
+
+Stages run on their own worker threads and are connected by bounded
+``queue.Queue``s: a full queue blocks the stage feeding it, so memory stays
+capped however fast the upstream answers, while network waits in an I/O
+stage overlap with CPU work in the next one. The caller consumes the last
+queue, which acts as the final (aggregation) stage.
+"""
+
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+_DONE = object()
+_POLL = 0.1  # seconds between stop-flag checks while blocked on a queue
+
+
+class StageStats:
+    """Counters for one stage: items processed, time spent and queue depth"""
+
+    def __init__(self, name: str, inbox: 'queue.Queue'):
+        self.name = name
+        self.inbox = inbox
+        self.processed = 0
+        self.busy_seconds = 0.0
+        self.max_queue_depth = 0
+        self.started: Optional[float] = None
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, depth: int):
+        with self._lock:
+            self.processed += 1
+            self.busy_seconds += seconds
+            if depth > self.max_queue_depth:
+                self.max_queue_depth = depth
+
+    @property
+    def throughput(self) -> float:
+        """Items per second of wall time since the stage started"""
+        if self.started is None:
+            return 0.0
+        elapsed = (self.finished or time.monotonic()) - self.started
+        return self.processed / elapsed if elapsed > 0 else 0.0
+
+    def as_dict(self) -> Dict[str, Any]:
+        return {
+            'stage': self.name,
+            'processed': self.processed,
+            'queue_depth': self.inbox.qsize(),
+            'max_queue_depth': self.max_queue_depth,
+            'busy_seconds': self.busy_seconds,
+            'throughput': self.throughput,
+        }
+
+
+class _Stage:
+    def __init__(self, name: str, fn: Callable[[Any], Any], workers: int, queue_size: int):
+        self.name = name
+        self.fn = fn
+        self.workers = workers
+        self.inbox: 'queue.Queue' = queue.Queue(maxsize=queue_size)
+        self.stats = StageStats(name, self.inbox)
+        self.remaining = workers
+        self.lock = threading.Lock()
+
+
+class Pipeline:
+    """Chain of stages joined by bounded queues"""
+
+    def __init__(self, queue_size: int = 64):
+        self.queue_size = queue_size
+        self._stages: List[_Stage] = []
+        self._stop = threading.Event()
+        self._error: Optional[BaseException] = None
+        self.sink_stats: Optional[StageStats] = None
+
+    def stage(self, name: str, fn: Callable[[Any], Any], workers: int = 1) -> 'Pipeline':
+        """Append a stage; ``fn`` maps one item to the item passed downstream"""
+        self._stages.append(_Stage(name, fn, workers, self.queue_size))
+        return self
+
+    def _put(self, target: 'queue.Queue', item: Any) -> bool:
+        while not self._stop.is_set():
+            try:
+                target.put(item, timeout=_POLL)
+                return True
+            except queue.Full:
+                continue
+        return False
+
+    def _get(self, source: 'queue.Queue') -> Any:
+        while not self._stop.is_set():
+            try:
+                return source.get(timeout=_POLL)
+            except queue.Empty:
+                continue
+        return _DONE
+
+    def _fail(self, error: BaseException):
+        if self._error is None:
+            self._error = error
+        self._stop.set()
+
+    def _feed(self, items: Iterable[Any], first: 'queue.Queue'):
+        try:
+            for item in items:
+                if not self._put(first, item):
+                    return
+        except BaseException as e:
+            self._fail(e)
+        self._put(first, _DONE)
+
+    def _work(self, stage: _Stage, outbox: 'queue.Queue'):
+        stats = stage.stats
+        while True:
+            item = self._get(stage.inbox)
+            if item is _DONE:
+                # Let sibling workers see the sentinel too; the last one out closes the stage
+                self._put(stage.inbox, _DONE)
+                with stage.lock:
+                    stage.remaining -= 1
+                    last = stage.remaining == 0
+                if last:
+                    stats.finished = time.monotonic()
+                    self._put(outbox, _DONE)
+                return
+            depth = stage.inbox.qsize()
+            started = time.monotonic()
+            try:
+                result = stage.fn(item)
+            except BaseException as e:
+                logger.error(f"Pipeline stage '{stage.name}' failed: {e}")
+                self._fail(e)
+                return
+            stats.record(time.monotonic() - started, depth)
+            if not self._put(outbox, result):
+                return
+
+    def run(self, items: Iterable[Any], sink_name: str = "aggregate") -> Iterator[Any]:
+        """Stream ``items`` through every stage, yielding results as they complete (unordered)"""
+        if not self._stages:
+            raise ValueError("pipeline has no stages")
+        output: 'queue.Queue' = queue.Queue(maxsize=self.queue_size)
+        self.sink_stats = StageStats(sink_name, output)
+        threads = [threading.Thread(target=self._feed, args=(items, self._stages[0].inbox),
+                                    name="pipeline-feed", daemon=True)]
+        for index, stage in enumerate(self._stages):
+            outbox = self._stages[index + 1].inbox if index + 1 < len(self._stages) else output
+            stage.stats.started = time.monotonic()
+            for worker in range(stage.workers):
+                threads.append(threading.Thread(target=self._work, args=(stage, outbox),
+                                                name=f"pipeline-{stage.name}-{worker}", daemon=True))
+        for thread in threads:
+            thread.start()
+
+        sink = self.sink_stats
+        sink.started = time.monotonic()
+        try:
+            while True:
+                item = self._get(output)
+                if item is _DONE:
+                    break
+                depth = output.qsize()
+                started = time.monotonic()
+                yield item
+                sink.record(time.monotonic() - started, depth)
+        finally:
+            sink.finished = time.monotonic()
+            self._stop.set()
+            for thread in threads:
+                thread.join()
+        if self._error is not None:
+            raise self._error
+
+    def metrics(self) -> List[Dict[str, Any]]:
+        """Queue depth and throughput for every stage, including the final consumer"""
+        stats = [stage.stats.as_dict() for stage in self._stages]
+        if self.sink_stats is not None:
+            stats.append(self.sink_stats.as_dict())
+        return stats
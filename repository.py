@@ -0,0 +1,154 @@
+"""
+In-memory repository in front of ``APIClient``.
+
+``Repository`` exposes the same read methods as ``APIClient`` but memoizes
+the parsed model lists in a size-bounded LRU with per-entry TTLs, so repeated
+in-process access costs a dict lookup instead of an HTTP round trip and a
+parse. Anything it does not cache is delegated to the wrapped client;
+``FanCodeCityValidator`` therefore reads per-user todos through
+``get_user_todos`` rather than raw payloads when its client is a Repository.
+"""
+
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Iterator, List, Optional, Tuple
+
+from api_client import APIClient
+from config import Settings, get_settings
+from todo import Todo
+from user import User
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries also expire ``ttl`` seconds after being stored"""
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = 300.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable, default: Any = _MISSING) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at >= self._clock():
+                    self._data.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._data[key]
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any):
+        expires_at = float('inf') if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, predicate: Optional[Callable[[Hashable], bool]] = None):
+        """Drop every entry, or only those whose key matches ``predicate``"""
+        with self._lock:
+            if predicate is None:
+                self._data.clear()
+                return
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {'hits': self.hits, 'misses': self.misses,
+                    'evictions': self.evictions, 'size': len(self._data)}
+
+
+class Repository:
+    """Caching repository over APIClient for users, todos and per-user todos"""
+
+    def __init__(self, api_client: Optional[APIClient] = None, ttl: Optional[float] = None,
+                 maxsize: int = 1024, settings: Optional[Settings] = None):
+        settings = settings or get_settings()
+        self.api_client = api_client or APIClient(settings=settings)
+        self.cache = TTLCache(maxsize=maxsize, ttl=settings.cache_ttl if ttl is None else ttl)
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+
+    def __getattr__(self, name: str) -> Any:
+        # Only reached for attributes the repository does not define itself
+        if name == 'api_client':
+            raise AttributeError(name)
+        return getattr(self.api_client, name)
+
+    def _lock_for(self, key: Hashable) -> threading.Lock:
+        with self._key_locks_guard:
+            return self._key_locks.setdefault(key, threading.Lock())
+
+    def _cached(self, key: Hashable, load: Callable[[], List]) -> List:
+        value = self.cache.get(key)
+        if value is _MISSING:
+            # Single flight: concurrent misses on one key trigger one upstream fetch
+            with self._lock_for(key):
+                value = self.cache.get(key)
+                if value is _MISSING:
+                    value = tuple(load())
+                    self.cache.set(key, value)
+        return list(value)
+
+    def get_users(self, timeout: Optional[float] = None) -> List[User]:
+        """All users, from cache when fresh"""
+        return self._cached(('users',), lambda: self.api_client.get_users(timeout=timeout))
+
+    def get_todos(self, timeout: Optional[float] = None) -> List[Todo]:
+        """All todos, from cache when fresh; also primes the per-user todo entries"""
+        def load() -> List[Todo]:
+            todos = self.api_client.get_todos(timeout=timeout)
+            by_user: Dict[int, List[Todo]] = {}
+            for todo in todos:
+                by_user.setdefault(todo.user_id, []).append(todo)
+            for user_id, user_todos in by_user.items():
+                self.cache.set(('user_todos', user_id), tuple(user_todos))
+            return todos
+        return self._cached(('todos',), load)
+
+    def iter_todos(self, timeout: Optional[float] = None, chunk_size: int = 65536) -> Iterator[Todo]:
+        """All todos from the cached list; the repository holds them in memory anyway"""
+        return iter(self.get_todos(timeout=timeout))
+
+    def get_user_todos(self, user_id: int, timeout: Optional[float] = None) -> List[Todo]:
+        """Todos for one user, from cache when fresh"""
+        return self._cached(('user_todos', user_id),
+                            lambda: self.api_client.get_user_todos(user_id, timeout=timeout))
+
+    def invalidate(self, kind: Optional[str] = None, user_id: Optional[int] = None):
+        """
+        Drop cached entries: everything, one kind ('users', 'todos',
+        'user_todos'), or one user's todos.
+        """
+        if kind is None and user_id is None:
+            self.cache.invalidate()
+        elif user_id is not None:
+            self.cache.invalidate(lambda key: key == ('user_todos', user_id))
+        else:
+            self.cache.invalidate(lambda key: key[0] == kind)
+        logger.debug(f"Invalidated repository cache (kind={kind}, user_id={user_id})")
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters and current size"""
+        return self.cache.stats()
@@ -0,0 +1,235 @@
+"""
+Compact validation results.
+
+``ValidationResult`` stores one run's per-user outcome as parallel typed
+arrays (user id, completed, total, percentage, passed) plus references to
+the ``User`` objects, instead of one nested dict per user. Rows are exposed
+as lightweight views built on access; ``to_dict()`` materializes the
+familiar ``validate_all_fancode_users`` summary when it is needed.
+
+With a sink attached, each row is handed to the sink and then dropped: the
+result keeps only user ids and pass flags (enough for the summary) and
+tallies rules as rows arrive.
+"""
+
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from rules import RuleSet
+from sinks import ResultSink
+from user import User
+
+
+def build_summary(user_results: List[Dict], skipped_user_ids: List[int], passed_count: int,
+                  partial: bool = False) -> Dict:
+    """Assemble the result summary; any skipped user makes the result partial"""
+    total_users = len(user_results) + len(skipped_user_ids)
+    return {
+        'total_users': total_users,
+        'passed_users': passed_count,
+        'failed_users': len(user_results) - passed_count,
+        'overall_result': total_users > 0 and passed_count == total_users,
+        'partial': partial or bool(skipped_user_ids),
+        'evaluated_user_ids': [result['user_id'] for result in user_results],
+        'skipped_user_ids': skipped_user_ids,
+        'user_results': user_results
+    }
+
+
+class _RowFormat:
+    """Summary dict and repr shared by the row types; subclasses supply the fields"""
+
+    __slots__ = ()
+
+    def to_dict(self) -> Dict:
+        """The per-user dict of the summary's 'user_results'"""
+        user = self.user
+        return {
+            'user_id': user.id,
+            'user_name': user.name,
+            'username': user.username,
+            'coordinates': {'lat': user.lat, 'lng': user.lng},
+            'total_todos': self.total_todos,
+            'completed_todos': self.completed_todos,
+            'completion_percentage': self.completion_percentage,
+            'passed': self.passed
+        }
+
+    def __repr__(self) -> str:
+        return (f"{type(self).__name__}(user_id={self.user_id}, {self.completed_todos}/{self.total_todos}, "
+                f"passed={self.passed})")
+
+
+class SinkRow(_RowFormat):
+    """One user's row on its way to a sink; never stored"""
+
+    __slots__ = ('user', 'completed_todos', 'total_todos', 'completion_percentage', 'passed')
+
+    def __init__(self, user: User, completed_todos: int, total_todos: int, threshold: float):
+        self.user = user
+        self.completed_todos = completed_todos
+        self.total_todos = total_todos
+        self.completion_percentage = (completed_todos / total_todos) * 100 if total_todos else 0.0
+        self.passed = self.completion_percentage > threshold
+
+    @property
+    def user_id(self) -> int:
+        return self.user.id
+
+
+class ResultRow(_RowFormat):
+    """View of one user's entry in a ValidationResult"""
+
+    __slots__ = ('_result', '_index')
+
+    def __init__(self, result: 'ValidationResult', index: int):
+        self._result = result
+        self._index = index
+
+    @property
+    def user(self) -> User:
+        return self._result.users[self._index]
+
+    @property
+    def user_id(self) -> int:
+        return self._result.user_ids[self._index]
+
+    @property
+    def completed_todos(self) -> int:
+        return self._result.completed[self._index]
+
+    @property
+    def total_todos(self) -> int:
+        return self._result.totals[self._index]
+
+    @property
+    def completion_percentage(self) -> float:
+        return self._result.percentages[self._index]
+
+    @property
+    def passed(self) -> bool:
+        return bool(self._result.passed[self._index])
+
+
+class ValidationResult:
+    """One validation run as parallel arrays"""
+
+    def __init__(self, threshold: float, partial: bool = False, sink: Optional[ResultSink] = None,
+                 ruleset: Optional[RuleSet] = None):
+        """
+        sink: receives every row as it is appended; rows are then not kept
+        ruleset: rules for evaluate_rules(); tallied on append when rows are not kept
+        """
+        self.threshold = threshold
+        self.sink = sink
+        self.ruleset = ruleset
+        self._tally = ruleset.tally() if sink is not None and ruleset is not None else None
+        self.users: List[User] = []
+        self.user_ids = array('q')
+        self.completed = array('q')
+        self.totals = array('q')
+        self.percentages = array('d')
+        self.passed = bytearray()
+        self.skipped_user_ids: List[int] = []
+        self.partial = partial
+        # Per-rule breakdown from a RuleSet, when the validator has one
+        self.rules: Optional[Dict[str, Dict]] = None
+
+    @property
+    def rows_retained(self) -> bool:
+        """False when rows went to a sink and only ids and pass flags were kept"""
+        return self.sink is None
+
+    def _require_rows(self):
+        if not self.rows_retained:
+            raise ValueError("rows were written to the sink and not kept")
+
+    def append(self, user: User, completed_count: int, total_count: int):
+        if self.sink is not None:
+            row = SinkRow(user, completed_count, total_count, self.threshold)
+            self.sink.write(row)
+            self.user_ids.append(user.id)
+            self.passed.append(row.passed)
+            if self._tally is not None:
+                self._tally.add(user, completed_count, total_count)
+            return
+        completion_percentage = (completed_count / total_count) * 100 if total_count else 0.0
+        self.users.append(user)
+        self.user_ids.append(user.id)
+        self.completed.append(completed_count)
+        self.totals.append(total_count)
+        self.percentages.append(completion_percentage)
+        self.passed.append(completion_percentage > self.threshold)
+
+    def __len__(self) -> int:
+        return len(self.user_ids)
+
+    def __getitem__(self, index: int) -> ResultRow:
+        self._require_rows()
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("result index out of range")
+        return ResultRow(self, index)
+
+    def __iter__(self) -> Iterator[ResultRow]:
+        self._require_rows()
+        return (ResultRow(self, index) for index in range(len(self)))
+
+    def counts(self) -> Iterator[Tuple[User, int, int]]:
+        """(user, completed, total) rows, e.g. for RuleSet.evaluate"""
+        self._require_rows()
+        return zip(self.users, self.completed, self.totals)
+
+    def evaluate_rules(self):
+        """Fill ``rules`` from the ruleset, over the kept rows or the running tally"""
+        if self.ruleset is None:
+            return
+        self.rules = self._tally.breakdown() if self._tally is not None else self.ruleset.evaluate(self.counts())
+
+    @property
+    def passed_count(self) -> int:
+        return self.passed.count(1)
+
+    @property
+    def overall_result(self) -> bool:
+        total_users = len(self) + len(self.skipped_user_ids)
+        passed = total_users > 0 and self.passed_count == total_users
+        if self.rules is not None:
+            passed = passed and all(rule['result'] for rule in self.rules.values())
+        return passed
+
+    def reorder(self, position: Dict[int, int]):
+        """Sort rows (and skipped ids) by ``position[user_id]``, e.g. the API's user order"""
+        order = sorted(range(len(self)), key=lambda index: position[self.user_ids[index]])
+        self.user_ids = array('q', (self.user_ids[index] for index in order))
+        self.passed = bytearray(self.passed[index] for index in order)
+        if self.rows_retained:
+            self.users = [self.users[index] for index in order]
+            self.completed = array('q', (self.completed[index] for index in order))
+            self.totals = array('q', (self.totals[index] for index in order))
+            self.percentages = array('d', (self.percentages[index] for index in order))
+        if self._tally is not None:
+            for failed_ids in self._tally.failed:
+                failed_ids.sort(key=position.__getitem__)
+        self.skipped_user_ids.sort(key=position.__getitem__)
+
+    def to_dict(self, include_rows: bool = True) -> Dict:
+        """
+        The summary dict returned by validate_all_fancode_users; without
+        rows (e.g. when they went to a sink) 'user_results' is left out
+        """
+        if include_rows:
+            summary = build_summary([row.to_dict() for row in self], list(self.skipped_user_ids),
+                                    self.passed_count, self.partial)
+        else:
+            summary = build_summary([], list(self.skipped_user_ids), self.passed_count, self.partial)
+            summary['total_users'] += len(self)
+            summary['failed_users'] = len(self) - self.passed_count
+            summary['overall_result'] = self.overall_result
+            summary['evaluated_user_ids'] = list(self.user_ids)
+            del summary['user_results']
+        if self.rules is not None:
+            summary['rules'] = self.rules
+            summary['overall_result'] = self.overall_result
+        return summary
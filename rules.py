@@ -0,0 +1,131 @@
+"""
+Declarative validation rules compiled into one fused evaluator.
+
+A ``Rule`` is a boolean expression over one user's aggregated row, with an
+optional ``where`` clause restricting which users it applies to. The
+expressions may use ``user``, ``lat``, ``lng``, ``completed``, ``total`` and
+``rate`` (completion percentage), plus the rule's own ``params`` written as
+``{name}`` placeholders. ``RuleSet`` generates a single loop that evaluates
+every rule for a row before moving to the next, so adding rules costs one
+extra comparison per user rather than another pass (or fetch).
+"""
+
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+@dataclass(frozen=True)
+class Rule:
+    """One validation rule; passes when ``test`` holds for every user matching ``where``"""
+    name: str
+    test: str
+    where: Optional[str] = None
+    params: Dict[str, Any] = field(default_factory=dict, hash=False)
+
+
+def completion_above(threshold: float, name: Optional[str] = None) -> Rule:
+    return Rule(name or f"completion_above_{threshold:g}", "rate > {threshold}", params={'threshold': threshold})
+
+
+def min_todos(count: int, name: Optional[str] = None) -> Rule:
+    return Rule(name or f"min_todos_{count}", "total >= {count}", params={'count': count})
+
+
+def no_zero_completions(name: str = "no_zero_completions") -> Rule:
+    return Rule(name, "completed > 0")
+
+
+def city_threshold(city: str, lat_min: float, lat_max: float, lng_min: float, lng_max: float,
+                   threshold: float) -> Rule:
+    """Completion threshold for users inside one city's bounding box"""
+    return Rule(f"{city}_completion_above_{threshold:g}", "rate > {threshold}",
+                where="{lat_min} <= lat <= {lat_max} and {lng_min} <= lng <= {lng_max}",
+                params={'threshold': threshold, 'lat_min': lat_min, 'lat_max': lat_max,
+                        'lng_min': lng_min, 'lng_max': lng_max})
+
+
+class RuleSet:
+    """Rules fused into one generated evaluation loop"""
+
+    def __init__(self, rules: Sequence[Rule]):
+        names = [rule.name for rule in rules]
+        if len(set(names)) != len(names):
+            raise ValueError(f"duplicate rule names in {names}")
+        self.rules = tuple(rules)
+        namespace: Dict[str, Any] = {}
+        for index, rule in enumerate(self.rules):
+            for key, value in rule.params.items():
+                namespace[f"_p{index}_{key}"] = value
+        self.source = self._render()
+        exec(compile(self.source, "<ruleset>", "exec"), namespace)
+        self._evaluate: Callable[[Iterable], List[Tuple[int, List[int]]]] = namespace['evaluate']
+        self._step: Callable[..., None] = namespace['step']
+
+    def _expr(self, index: int, template: str) -> str:
+        return template.format(**{key: f"_p{index}_{key}" for key in self.rules[index].params})
+
+    def _row_checks(self, indent: str) -> List[str]:
+        lines = [f"{indent}lat = user.lat; lng = user.lng",
+                 f"{indent}rate = (completed / total) * 100 if total else 0.0"]
+        for index, rule in enumerate(self.rules):
+            rule_indent = indent
+            if rule.where:
+                lines.append(f"{rule_indent}if {self._expr(index, rule.where)}:")
+                rule_indent += "    "
+            lines.append(f"{rule_indent}n[{index}] += 1")
+            lines.append(f"{rule_indent}if not ({self._expr(index, rule.test)}):")
+            lines.append(f"{rule_indent}    failed[{index}].append(user.id)")
+        return lines
+
+    def _render(self) -> str:
+        count = len(self.rules)
+        lines = ["def evaluate(rows):"]
+        lines.append(f"    n = [0] * {count}")
+        lines.append(f"    failed = [[] for _ in range({count})]")
+        lines.append("    for user, completed, total in rows:")
+        lines.extend(self._row_checks("        "))
+        lines.append("    return list(zip(n, failed))")
+        # The same checks for one row at a time, over counters the caller keeps
+        lines.append("def step(n, failed, user, completed, total):")
+        lines.extend(self._row_checks("    "))
+        return "\n".join(lines) + "\n"
+
+    def tally(self) -> 'RuleTally':
+        """An evaluation fed one row at a time, for rows that are not kept"""
+        return RuleTally(self)
+
+    def evaluate(self, rows: Iterable[Tuple[Any, int, int]]) -> Dict[str, Dict]:
+        """
+        Evaluate every rule over (user, completed, total) rows in one scan.
+        Returns {rule name: {'applicable', 'passed', 'failed',
+        'failed_user_ids', 'result'}}; a rule no user matches passes.
+        """
+        return self._breakdown(self._evaluate(rows))
+
+    def _breakdown(self, tallies: Iterable[Tuple[int, List[int]]]) -> Dict[str, Dict]:
+        breakdown = {}
+        for rule, (applicable, failed_ids) in zip(self.rules, tallies):
+            breakdown[rule.name] = {
+                'applicable': applicable,
+                'passed': applicable - len(failed_ids),
+                'failed': len(failed_ids),
+                'failed_user_ids': failed_ids,
+                'result': not failed_ids,
+            }
+        return breakdown
+
+
+class RuleTally:
+    """Running RuleSet evaluation: add() each row, breakdown() at the end"""
+
+    def __init__(self, ruleset: RuleSet):
+        self.ruleset = ruleset
+        self.applicable = [0] * len(ruleset.rules)
+        self.failed: List[List[int]] = [[] for _ in ruleset.rules]
+
+    def add(self, user: Any, completed: int, total: int):
+        self.ruleset._step(self.applicable, self.failed, user, completed, total)
+
+    def breakdown(self) -> Dict[str, Dict]:
+        """Same shape as RuleSet.evaluate over every row added so far"""
+        return self.ruleset._breakdown(zip(self.applicable, [list(ids) for ids in self.failed]))
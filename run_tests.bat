@@ -101,6 +101,9 @@ if "%RUN_MODE%"=="smoke" (
 )
 
 REM Add parallel execution if requested
+REM Unlike run_tests.sh, no shared dataset is published here: Windows frees a shared-memory
+REM segment when its last handle closes, so it cannot outlive "python shared.py publish".
+REM Each worker loads its own copy instead, through the shared HTTP cache.
 if "%PARALLEL%"=="true" (
     set PYTEST_CMD=%PYTEST_CMD% -n auto
     echo [INFO] Parallel execution enabled
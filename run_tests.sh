@@ -139,6 +139,16 @@ esac
 if [ "$PARALLEL" = "true" ]; then
     PYTEST_CMD="$PYTEST_CMD -n auto"
     print_status "Parallel execution enabled"
+
+    # Load the dataset once into shared memory; workers attach to it instead of fetching their own
+    if FANCODE_SHARED_DATASET=$(python shared.py publish); then
+        export FANCODE_SHARED_DATASET
+        trap 'python shared.py unlink "$FANCODE_SHARED_DATASET"' EXIT
+        print_status "Shared dataset published: $FANCODE_SHARED_DATASET"
+    else
+        unset FANCODE_SHARED_DATASET
+        print_warning "Could not publish the shared dataset; workers will load their own"
+    fi
 fi
 
 # Add report generation
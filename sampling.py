@@ -0,0 +1,160 @@
+"""
+Sampling-based approximate validation.
+
+``PassRateEstimator`` validates FanCode users in a random (optionally
+stratified) order, a batch at a time, and reports the pass fraction seen so
+far with a Wilson score interval. The interval includes a finite-population
+correction, so it narrows to the exact value once every user is sampled.
+Call ``refine()`` again to tighten an estimate; only the newly sampled users'
+todos are fetched.
+"""
+
+import logging
+import math
+import random
+from statistics import NormalDist
+from typing import Callable, Dict, Hashable, List, NamedTuple, Optional
+
+from deadline import Deadline
+from user import User
+
+logger = logging.getLogger(__name__)
+
+
+def wilson_interval(passed: int, sampled: int, confidence: float = 0.95,
+                    population: Optional[int] = None) -> tuple:
+    """
+    (lower, upper) bounds on the pass fraction; with ``population`` the
+    interval shrinks as the sample covers more of it
+    """
+    if sampled == 0:
+        return 0.0, 1.0
+    z = NormalDist().inv_cdf((1 + confidence) / 2)
+    z2 = z * z
+    if population is not None and population > 1:
+        z2 *= max(0.0, (population - sampled) / (population - 1))
+    p = passed / sampled
+    denominator = 1 + z2 / sampled
+    centre = (p + z2 / (2 * sampled)) / denominator
+    margin = math.sqrt(p * (1 - p) / sampled + z2 / (4 * sampled * sampled)) * math.sqrt(z2) / denominator
+    return max(0.0, centre - margin), min(1.0, centre + margin)
+
+
+class PassRateEstimate(NamedTuple):
+    """Estimated pass fraction over the FanCode population"""
+    population: int
+    sampled: int
+    passed: int
+    lower: float
+    upper: float
+    confidence: float
+    failed_user_ids: List[int]
+
+    @property
+    def pass_rate(self) -> float:
+        return self.passed / self.sampled if self.sampled else 0.0
+
+    @property
+    def exact(self) -> bool:
+        return self.sampled == self.population
+
+    @property
+    def max_failing_users(self) -> int:
+        """Upper bound on failing users in the population at this confidence"""
+        return len(self.failed_user_ids) if self.exact else math.ceil((1 - self.lower) * self.population)
+
+    def as_dict(self) -> Dict:
+        return {
+            'population': self.population,
+            'sampled': self.sampled,
+            'passed': self.passed,
+            'pass_rate': self.pass_rate,
+            'lower': self.lower,
+            'upper': self.upper,
+            'confidence': self.confidence,
+            'exact': self.exact,
+            'any_failure_found': bool(self.failed_user_ids),
+            'max_failing_users': self.max_failing_users,
+            'failed_user_ids': self.failed_user_ids,
+        }
+
+
+class PassRateEstimator:
+    """Progressively refined pass-rate estimate over a random sample of users"""
+
+    def __init__(self, validator, users: List[User], confidence: float = 0.95, seed: Optional[int] = None,
+                 stratify: Optional[Callable[[User], Hashable]] = None):
+        """
+        validator: FanCodeCityValidator whose fetch strategy evaluates sampled users
+        stratify: key function; when given, each batch draws from every
+            stratum in proportion to its size
+        """
+        self.validator = validator
+        self.population = len(users)
+        self.confidence = confidence
+        self._order = self._sample_order(users, random.Random(seed), stratify)
+        self._next = 0
+        self.passed = 0
+        self.sampled = 0
+        self.failed_user_ids: List[int] = []
+        self.skipped_user_ids: List[int] = []
+        self.user_results: List[Dict] = []
+
+    @staticmethod
+    def _sample_order(users: List[User], rng: random.Random,
+                      stratify: Optional[Callable[[User], Hashable]]) -> List[User]:
+        if stratify is None:
+            order = list(users)
+            rng.shuffle(order)
+            return order
+        strata: Dict[Hashable, List[User]] = {}
+        for user in users:
+            strata.setdefault(stratify(user), []).append(user)
+        # Interleave strata by relative rank so every prefix is close to proportional
+        keyed = []
+        for members in strata.values():
+            rng.shuffle(members)
+            size = len(members)
+            keyed.extend(((rank + rng.random()) / size, user) for rank, user in enumerate(members))
+        keyed.sort(key=lambda item: item[0])
+        return [user for _, user in keyed]
+
+    @property
+    def remaining(self) -> int:
+        return len(self._order) - self._next
+
+    def estimate(self) -> PassRateEstimate:
+        lower, upper = wilson_interval(self.passed, self.sampled, self.confidence, self.population)
+        return PassRateEstimate(self.population, self.sampled, self.passed, lower, upper,
+                                self.confidence, list(self.failed_user_ids))
+
+    def refine(self, count: int, deadline: Optional[Deadline] = None) -> PassRateEstimate:
+        """Validate up to ``count`` more users and return the updated estimate"""
+        batch = self._order[self._next:self._next + count]
+        self._next += len(batch)
+        for user, counts in self.validator.iter_user_counts(batch, deadline, per_user=True):
+            if counts is None:
+                self.skipped_user_ids.append(user.id)
+                continue
+            result = self.validator.build_user_result(user, *counts)
+            self.user_results.append(result)
+            self.sampled += 1
+            if result['passed']:
+                self.passed += 1
+            else:
+                self.failed_user_ids.append(user.id)
+        estimate = self.estimate()
+        logger.info(f"Sampled {estimate.sampled}/{estimate.population} users: pass rate "
+                    f"{estimate.pass_rate:.1%} ({estimate.lower:.1%}-{estimate.upper:.1%} "
+                    f"at {estimate.confidence:.0%})")
+        return estimate
+
+    def refine_until(self, width: float, step: int = 10, max_samples: Optional[int] = None) -> PassRateEstimate:
+        """Refine in steps until the interval is at most ``width`` wide or the sample budget is spent"""
+        estimate = self.estimate()
+        while self.remaining and estimate.upper - estimate.lower > width:
+            if max_samples is not None and self._next >= max_samples:
+                break
+            batch = step if max_samples is None else min(step, max_samples - self._next)
+            estimate = self.refine(batch)
+        return estimate
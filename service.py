@@ -0,0 +1,232 @@
+"""
+Long-running validation service.
+
+``ValidationService`` keeps an ``APIClient`` and validators warm, refreshes
+the results on a schedule (or on ``POST /refresh``) and serves the latest
+snapshot over a small local HTTP endpoint:
+
+    GET  /summary            result summary of the default city
+    GET  /cities             configured city names
+    GET  /cities/<name>      result summary of one city
+    GET  /users/<id>         one user's result rows, one per city they belong to
+    GET  /health             refresh count and snapshot age
+    POST /refresh            refresh now and return the default summary
+
+Responses are serialized once per refresh and swapped in atomically, so a
+request costs a dict lookup and a socket write; dashboards can poll as often
+as they like without adding upstream load.
+"""
+
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+from api_client import APIClient
+from config import Settings, get_settings
+from repository import Repository
+from validator import FanCodeCityValidator
+
+logger = logging.getLogger(__name__)
+
+
+def _encode(payload) -> bytes:
+    return json.dumps(payload, separators=(',', ':')).encode()
+
+
+class Snapshot:
+    """Pre-serialized responses for one refresh"""
+
+    def __init__(self, summaries: Dict[str, Dict], refreshed_at: float):
+        self.summaries = summaries
+        self.refreshed_at = refreshed_at
+        self.cities = {name: _encode(summary) for name, summary in summaries.items()}
+        # A user inside several cities' boundaries has one row per city
+        rows: Dict[str, List[Dict]] = {}
+        for name, summary in summaries.items():
+            for result in summary['user_results']:
+                rows.setdefault(str(result['user_id']), []).append(dict(result, city=name))
+        self.users: Dict[str, bytes] = {user_id: _encode(user_rows) for user_id, user_rows in rows.items()}
+        self.city_names = _encode(sorted(summaries))
+
+
+class ValidationService:
+    """Keeps validation results fresh and serves them over HTTP"""
+
+    def __init__(self, api_client: Optional[APIClient] = None,
+                 cities: Optional[Dict[str, FanCodeCityValidator]] = None,
+                 refresh_interval: Optional[float] = None, settings: Optional[Settings] = None):
+        """
+        api_client: upstream client; wrapped in a Repository so every city
+            validator shares one fetch of users and todos per refresh
+        cities: city name -> validator (default: {'fancode': validator with
+            the configured bounds}); the first one backs /summary
+        refresh_interval: seconds between scheduled refreshes
+        """
+        settings = settings or get_settings()
+        self.settings = settings
+        self.refresh_interval = settings.refresh_interval if refresh_interval is None else refresh_interval
+        if cities is None:
+            repository = api_client if isinstance(api_client, Repository) else Repository(api_client, settings=settings)
+            cities = {'fancode': FanCodeCityValidator(repository, settings=settings)}
+        if not cities:
+            raise ValueError("at least one city is required")
+        self.cities = cities
+        self.default_city = next(iter(cities))
+        self.snapshot: Optional[Snapshot] = None
+        self.refreshes = 0
+        self.last_error: Optional[str] = None
+        self._refresh_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._threads = []
+        self.server: Optional[ThreadingHTTPServer] = None
+
+    def refresh(self) -> Snapshot:
+        """Re-run validation for every city and publish the new snapshot"""
+        with self._refresh_lock:
+            for validator in self.cities.values():
+                if isinstance(validator.api_client, Repository):
+                    validator.api_client.invalidate()
+            started = time.monotonic()
+            summaries = {name: validator.validate_all_fancode_users()
+                         for name, validator in self.cities.items()}
+            self.snapshot = Snapshot(summaries, time.time())
+            self.refreshes += 1
+            self.last_error = None
+            logger.info(f"Refreshed {len(summaries)} cities in {time.monotonic() - started:.3f}s")
+            return self.snapshot
+
+    def _refresh_loop(self):
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+            except Exception as e:
+                # Keep serving the previous snapshot
+                self.last_error = str(e)
+                logger.error(f"Scheduled refresh failed: {e}")
+
+    def health(self) -> Dict:
+        snapshot = self.snapshot
+        return {
+            'refreshes': self.refreshes,
+            'refreshed_at': snapshot.refreshed_at if snapshot else None,
+            'age_seconds': time.time() - snapshot.refreshed_at if snapshot else None,
+            'last_error': self.last_error,
+        }
+
+    def lookup(self, method: str, path: str) -> Tuple[int, bytes]:
+        """Status and body for one request"""
+        parts = [part for part in path.split('?', 1)[0].split('/') if part]
+        if method == 'POST':
+            if parts == ['refresh']:
+                try:
+                    return 200, self.refresh().cities[self.default_city]
+                except Exception as e:
+                    self.last_error = str(e)
+                    logger.error(f"On-demand refresh failed: {e}")
+                    return 502, _encode({'error': str(e)})
+            return 404, _encode({'error': 'not found'})
+
+        if parts == ['health']:
+            return 200, _encode(self.health())
+        snapshot = self.snapshot
+        if snapshot is None:
+            return 503, _encode({'error': 'no results yet'})
+        body = None
+        if parts == ['summary']:
+            body = snapshot.cities[self.default_city]
+        elif parts == ['cities']:
+            body = snapshot.city_names
+        elif len(parts) == 2 and parts[0] == 'cities':
+            body = snapshot.cities.get(parts[1])
+        elif len(parts) == 2 and parts[0] == 'users':
+            body = snapshot.users.get(parts[1])
+        if body is None:
+            return 404, _encode({'error': 'not found'})
+        return 200, body
+
+    def serve(self, host: Optional[str] = None, port: Optional[int] = None) -> Tuple[str, int]:
+        """
+        Refresh once, then serve and refresh on schedule in background threads.
+        A failed first refresh is recorded in /health's last_error and the
+        service starts anyway, answering 503 until a refresh succeeds.
+        Returns the bound (host, port); pass port=0 for any free port.
+        """
+        try:
+            self.refresh()
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Initial refresh failed, serving without results: {e}")
+        host = self.settings.service_host if host is None else host
+        port = self.settings.service_port if port is None else port
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.server.service = self
+        self._stop.clear()
+        self._threads = [
+            threading.Thread(target=self.server.serve_forever, name="service-http", daemon=True),
+            threading.Thread(target=self._refresh_loop, name="service-refresh", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        address = self.server.server_address[:2]
+        logger.info(f"Serving validation results on http://{address[0]}:{address[1]}")
+        return address
+
+    def stop(self):
+        """Stop serving and refreshing"""
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+        for thread in self._threads:
+            thread.join()
+        self._threads = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive for polling dashboards
+
+    def _respond(self, method: str):
+        status, body = self.server.service.lookup(method, self.path)
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        self._respond('GET')
+
+    def do_POST(self):
+        self._respond('POST')
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.address_string()} {format % args}")
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve FanCode validation results over local HTTP")
+    parser.add_argument("--host", default=None)
+    parser.add_argument("--port", type=int, default=None)
+    parser.add_argument("--interval", type=float, default=None, help="seconds between refreshes")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=get_settings().log_level, format='%(asctime)s - %(levelname)s - %(message)s')
+    service = ValidationService(refresh_interval=args.interval)
+    service.serve(args.host, args.port)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        service.stop()
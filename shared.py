@@ -0,0 +1,269 @@
+"""
+Users and todos in shared memory.
+
+``SharedDataset.create`` lays the dataset out once as typed columns in a
+single ``multiprocessing.shared_memory`` segment: numeric columns as raw
+arrays, strings as an offsets column plus a UTF-8 blob, todos sorted by
+owner, and per-user completed/total counts precomputed. Any other process
+(an xdist worker, a service replica) ``attach``es by name and reads the
+columns through memoryviews without copying or decoding anything;
+``SharedDatasetValidator`` validates straight from those columns and only
+builds ``User`` objects for the FanCode city rows it reports.
+
+The segment outlives its creator until ``unlink()``; ``python shared.py
+publish`` creates one and prints its name for ``FANCODE_SHARED_DATASET``,
+and ``python shared.py unlink <name>`` removes it.
+"""
+
+import argparse
+import json
+import logging
+import struct
+from bisect import bisect_left, bisect_right
+from multiprocessing import resource_tracker, shared_memory
+from typing import Dict, List, Optional, Sequence, Tuple, Union
+
+from api_client import APIClient
+from config import Settings
+from deadline import Deadline
+from geo import Box, MultiPolygon, Polygon
+from results import ValidationResult
+from rules import Rule, RuleSet
+from sinks import ResultSink
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+
+logger = logging.getLogger(__name__)
+
+_PREFIX = struct.Struct('<QQ')  # header offset, header size
+_ALIGN = 8
+
+# String columns are stored as '<field>_offsets' ('q') plus '<field>_blob' (UTF-8 bytes)
+_USER_STRINGS = ('name', 'username', 'email', 'address')
+
+# Segments created by this process; attaching to one of them must keep its tracker registration
+_created = set()
+
+
+def _strings(values: Sequence[str]) -> Tuple[List[int], bytes]:
+    encoded = [value.encode('utf-8') for value in values]
+    offsets = [0]
+    for data in encoded:
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b''.join(encoded)
+
+
+def _open_segment(name: str) -> shared_memory.SharedMemory:
+    """Attach without leaving a resource-tracker registration, so exiting never unlinks the segment"""
+    segment = shared_memory.SharedMemory(name=name)
+    if segment._name not in _created:
+        resource_tracker.unregister(segment._name, 'shared_memory')
+    return segment
+
+
+class SharedDataset:
+    """Columnar users and todos in one shared-memory segment"""
+
+    def __init__(self, segment: shared_memory.SharedMemory, owner: bool = False):
+        self._segment = segment
+        self.owner = owner
+        self.name = segment.name
+        buffer = segment.buf
+        header_offset, header_size = _PREFIX.unpack_from(buffer, 0)
+        header = json.loads(bytes(buffer[header_offset:header_offset + header_size]))
+        self.user_count: int = header['users']
+        self.todo_count: int = header['todos']
+        self._views: Dict[str, memoryview] = {}
+        for name, (offset, fmt, count) in header['columns'].items():
+            size = struct.calcsize(fmt) * count
+            self._views[name] = buffer[offset:offset + size].cast(fmt)
+
+    @classmethod
+    def create(cls, users: Sequence[User], todos: Sequence[Todo], name: Optional[str] = None) -> 'SharedDataset':
+        """Lay ``users`` and ``todos`` out in a new segment; the returned instance owns it"""
+        todos = sorted(todos, key=lambda todo: (todo.user_id, todo.id))
+        todo_user_ids = [todo.user_id for todo in todos]
+        completed, totals = [], []
+        for user in users:
+            start, end = bisect_left(todo_user_ids, user.id), bisect_right(todo_user_ids, user.id)
+            totals.append(end - start)
+            completed.append(sum(todos[index].completed for index in range(start, end)))
+
+        columns: Dict[str, Tuple[str, Sequence]] = {
+            'user_ids': ('q', [user.id for user in users]),
+            'lat': ('d', [user.lat for user in users]),
+            'lng': ('d', [user.lng for user in users]),
+            'completed': ('q', completed),
+            'totals': ('q', totals),
+            'todo_ids': ('q', [todo.id for todo in todos]),
+            'todo_user_ids': ('q', todo_user_ids),
+            'todo_completed': ('B', [int(todo.completed) for todo in todos]),
+        }
+        for field in _USER_STRINGS:
+            values = [json.dumps(user.address, separators=(',', ':')) if field == 'address' else getattr(user, field)
+                      for user in users]
+            offsets, blob = _strings(values)
+            columns[f'{field}_offsets'] = ('q', offsets)
+            columns[f'{field}_blob'] = ('B', blob)
+        offsets, blob = _strings([todo.title for todo in todos])
+        columns['title_offsets'] = ('q', offsets)
+        columns['title_blob'] = ('B', blob)
+
+        # Columns 8-byte aligned after the prefix, then the JSON header (column -> [offset, format, count])
+        layout: Dict[str, List] = {}
+        position = _PREFIX.size
+        for column, (fmt, values) in columns.items():
+            position += -position % _ALIGN
+            layout[column] = [position, fmt, len(values)]
+            position += struct.calcsize(fmt) * len(values)
+        header = json.dumps({'users': len(users), 'todos': len(todos), 'columns': layout}).encode()
+        segment = shared_memory.SharedMemory(name=name, create=True, size=position + len(header))
+        _created.add(segment._name)
+        buffer = segment.buf
+        _PREFIX.pack_into(buffer, 0, position, len(header))
+        buffer[position:position + len(header)] = header
+        for column, (fmt, values) in columns.items():
+            offset, _, count = layout[column]
+            if isinstance(values, bytes):
+                buffer[offset:offset + count] = values
+            else:
+                struct.pack_into(f'<{count}{fmt}', buffer, offset, *values)
+        logger.info(f"Shared dataset {segment.name}: {len(users)} users, {len(todos)} todos, {segment.size} bytes")
+        return cls(segment, owner=True)
+
+    @classmethod
+    def load(cls, api_client: APIClient, name: Optional[str] = None) -> 'SharedDataset':
+        """Fetch users and todos once and share them"""
+        return cls.create(api_client.get_users(), api_client.get_todos(), name)
+
+    @classmethod
+    def attach(cls, name: str) -> 'SharedDataset':
+        """Map an existing segment by name; no data is copied"""
+        return cls(_open_segment(name))
+
+    def column(self, name: str) -> memoryview:
+        """A typed, zero-copy view of one column (e.g. 'lat', 'completed', 'todo_user_ids')"""
+        return self._views[name]
+
+    def _string(self, field: str, index: int) -> str:
+        offsets = self._views[f'{field}_offsets']
+        return bytes(self._views[f'{field}_blob'][offsets[index]:offsets[index + 1]]).decode('utf-8')
+
+    def user(self, index: int) -> User:
+        """Materialize the user at row ``index``"""
+        return User(self._views['user_ids'][index], self._string('name', index), self._string('username', index),
+                    self._string('email', index), json.loads(self._string('address', index)),
+                    self._views['lat'][index], self._views['lng'][index])
+
+    def todo(self, index: int) -> Todo:
+        return Todo(self._views['todo_ids'][index], self._views['todo_user_ids'][index],
+                    self._string('title', index), bool(self._views['todo_completed'][index]))
+
+    def counts(self, index: int) -> Tuple[int, int]:
+        """(completed, total) todos of the user at row ``index``"""
+        return self._views['completed'][index], self._views['totals'][index]
+
+    # APIClient-shaped accessors, for code that wants model objects
+
+    def get_users(self, timeout: Optional[float] = None) -> List[User]:
+        return [self.user(index) for index in range(self.user_count)]
+
+    def get_todos(self, timeout: Optional[float] = None) -> List[Todo]:
+        return [self.todo(index) for index in range(self.todo_count)]
+
+    def get_user_todos(self, user_id: int, timeout: Optional[float] = None) -> List[Todo]:
+        owners = self._views['todo_user_ids']
+        return [self.todo(index) for index in range(bisect_left(owners, user_id), bisect_right(owners, user_id))]
+
+    def close(self):
+        """Release this process's mapping; the owner also unlinks the segment"""
+        if self._segment is None:
+            return
+        for view in self._views.values():
+            view.release()
+        self._views = {}
+        self._segment.close()
+        if self.owner:
+            self._segment.unlink()
+            _created.discard(self._segment._name)
+        self._segment = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SharedDatasetValidator(FanCodeCityValidator):
+    """FanCodeCityValidator over a SharedDataset's columns, with no fetching or decoding"""
+
+    def __init__(self, dataset: SharedDataset, settings: Optional[Settings] = None,
+                 rules: Union[RuleSet, Sequence[Rule], None] = None,
+                 region: Union[Box, Polygon, MultiPolygon, None] = None):
+        super().__init__(None, settings=settings, rules=rules, region=region)
+        self.dataset = dataset
+
+    def validate_fancode_users(self, deadline: Union[Deadline, float, None] = None,
+                               sink: Optional[ResultSink] = None) -> ValidationResult:
+        """
+        Validate from the shared columns. Nothing is fetched, so
+        fetch_strategy does not apply; sink and rules behave as in the base
+        class. deadline (default settings.run_timeout) bounds the scan as the
+        'aggregate' stage: users not reached in time go to 'skipped_user_ids'.
+        """
+        if deadline is None:
+            deadline = self.settings.run_timeout
+        run_deadline = None
+        if deadline is not None or self.stage_timeouts:
+            run_deadline = Deadline.coerce(deadline)
+        aggregate_deadline = self._stage(run_deadline, 'aggregate')
+
+        dataset = self.dataset
+        lats, lngs, user_ids = dataset.column('lat'), dataset.column('lng'), dataset.column('user_ids')
+        region = self.region or Box(self.LAT_MIN, self.LAT_MAX, self.LNG_MIN, self.LNG_MAX)
+        result = ValidationResult(self.COMPLETION_THRESHOLD, sink=sink, ruleset=self.rules)
+        for index, inside in enumerate(region.contains_many(lats, lngs)):
+            if not inside:
+                continue
+            if aggregate_deadline is not None and aggregate_deadline.expired:
+                result.skipped_user_ids.append(user_ids[index])
+                continue
+            result.append(dataset.user(index), *dataset.counts(index))
+
+        if not len(result) and not result.skipped_user_ids:
+            logger.warning("No users found in FanCode city")
+        result.evaluate_rules()
+        logger.info(f"Validation Summary: {result.passed_count}/{len(result)} users passed the "
+                    f"{self.COMPLETION_THRESHOLD:g}% completion criteria")
+        if result.skipped_user_ids:
+            logger.warning(f"Partial result: {len(result.skipped_user_ids)} users skipped by the deadline")
+        return result
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description="Publish or remove a shared-memory FanCode dataset")
+    commands = parser.add_subparsers(dest='command', required=True)
+    publish = commands.add_parser('publish', help="fetch the dataset into a new segment and print its name")
+    publish.add_argument('--name', default=None)
+    remove = commands.add_parser('unlink', help="remove a published segment")
+    remove.add_argument('name')
+    args = parser.parse_args(argv)
+
+    if args.command == 'publish':
+        dataset = SharedDataset.load(APIClient(), args.name)
+        # Hand the segment over to whoever unlinks it later instead of removing it at exit
+        resource_tracker.unregister(dataset._segment._name, 'shared_memory')
+        _created.discard(dataset._segment._name)
+        dataset.owner = False
+        print(dataset.name)
+        dataset.close()
+    else:
+        segment = shared_memory.SharedMemory(name=args.name)
+        segment.close()
+        segment.unlink()
+
+
+if __name__ == '__main__':
+    main()
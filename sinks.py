@@ -0,0 +1,138 @@
+"""
+Streaming result sinks.
+
+A sink receives each user's result row as soon as it is evaluated and
+writes it through a buffered (optionally compressed) file, so a report
+over millions of users never has to exist as one in-memory summary. Pass
+one to ``FanCodeCityValidator.validate_all_fancode_users(sink=...)``; rows
+arrive in evaluation order and are not kept in memory afterwards.
+
+    NDJSONSink     one JSON object per line, same shape as 'user_results'
+    CSVSink        flat columns (coordinates split into lat and lng)
+    ColumnarSink   row groups of per-column arrays, one JSON line per group;
+                   read back with ``read_columnar``
+
+Compression is chosen by ``compression=`` ('gzip', 'bz2', 'xz') or by the
+file extension (.gz, .bz2, .xz).
+"""
+
+import bz2
+import csv
+import gzip
+import io
+import json
+import logging
+import lzma
+from abc import ABC, abstractmethod
+from typing import Any, Dict, IO, Iterator, List, Optional
+
+logger = logging.getLogger(__name__)
+
+COLUMNS = ('user_id', 'user_name', 'username', 'lat', 'lng',
+           'total_todos', 'completed_todos', 'completion_percentage', 'passed')
+
+_OPENERS = {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}
+_EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz'}
+_BUFFER_SIZE = 1 << 20
+
+
+def open_text(path: str, mode: str = 'w', compression: Optional[str] = None) -> IO[str]:
+    """Open ``path`` as buffered text, compressed per ``compression`` or the file extension"""
+    if compression is None:
+        compression = next((kind for ext, kind in _EXTENSIONS.items() if path.endswith(ext)), None)
+    if compression is None:
+        return open(path, mode, buffering=_BUFFER_SIZE, encoding='utf-8', newline='')
+    if compression not in _OPENERS:
+        raise ValueError(f"unsupported compression {compression!r}; expected one of {sorted(_OPENERS)}")
+    raw = _OPENERS[compression](path, mode + 'b')
+    buffered = io.BufferedWriter(raw, _BUFFER_SIZE) if mode == 'w' else io.BufferedReader(raw, _BUFFER_SIZE)
+    return io.TextIOWrapper(buffered, encoding='utf-8', newline='')
+
+
+def _flat(row) -> tuple:
+    user = row.user
+    return (user.id, user.name, user.username, user.lat, user.lng,
+            row.total_todos, row.completed_todos, row.completion_percentage, row.passed)
+
+
+class ResultSink(ABC):
+    """Base sink: write(row) per evaluated user, close() at the end"""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        self.path = path
+        self.rows_written = 0
+        self._file = open_text(path, 'w', compression)
+
+    @abstractmethod
+    def write(self, row):
+        """Write one results.ResultRow or results.SinkRow; it is only valid during the call"""
+
+    def close(self):
+        if not self._file.closed:
+            self._file.close()
+            logger.info(f"Wrote {self.rows_written} result rows to {self.path}")
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class NDJSONSink(ResultSink):
+    """One JSON object per line, in the 'user_results' shape"""
+
+    def write(self, row):
+        self._file.write(json.dumps(row.to_dict(), separators=(',', ':')))
+        self._file.write('\n')
+        self.rows_written += 1
+
+
+class CSVSink(ResultSink):
+    """CSV with a header row and flat columns"""
+
+    def __init__(self, path: str, compression: Optional[str] = None):
+        super().__init__(path, compression)
+        self._writer = csv.writer(self._file)
+        self._writer.writerow(COLUMNS)
+
+    def write(self, row):
+        self._writer.writerow(_flat(row))
+        self.rows_written += 1
+
+
+class ColumnarSink(ResultSink):
+    """Row groups stored column by column, one JSON line per group"""
+
+    def __init__(self, path: str, compression: Optional[str] = None, row_group_size: int = 10000):
+        super().__init__(path, compression)
+        self.row_group_size = row_group_size
+        self._columns: List[List[Any]] = [[] for _ in COLUMNS]
+
+    def write(self, row):
+        for column, value in zip(self._columns, _flat(row)):
+            column.append(value)
+        self.rows_written += 1
+        if len(self._columns[0]) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if not self._columns[0]:
+            return
+        group = {'rows': len(self._columns[0]), 'columns': dict(zip(COLUMNS, self._columns))}
+        self._file.write(json.dumps(group, separators=(',', ':')))
+        self._file.write('\n')
+        self._columns = [[] for _ in COLUMNS]
+
+    def close(self):
+        if not self._file.closed:
+            self._flush()
+        super().close()
+
+
+def read_columnar(path: str, compression: Optional[str] = None) -> Iterator[Dict[str, List[Any]]]:
+    """Yield each row group of a ColumnarSink file as {column: values}"""
+    with open_text(path, 'r', compression) as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)['columns']
@@ -0,0 +1,221 @@
+"""
+SQLite-backed local store for users and todos.
+
+``SQLiteStore.sync()`` loads ``APIClient`` results into SQLite in a single
+transaction with bulk upserts; rows whose values did not change are not
+rewritten, and rows that disappeared upstream are deleted. Indexes on
+``todos(user_id, completed)`` and ``users(lat, lng)`` back
+``SQLiteValidator``, which computes the geo filter and per-user completion
+as one aggregate query instead of walking Python lists. A polygon region is
+queried by its bounding box and refined in Python.
+"""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+from itertools import islice
+from typing import Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+import requests
+
+from api_client import APIClient
+from config import Settings, get_settings
+from deadline import Deadline, DeadlineExceeded
+from geo import Box, MultiPolygon, Polygon
+from results import ValidationResult
+from rules import Rule, RuleSet
+from sinks import ResultSink
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+
+logger = logging.getLogger(__name__)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL,
+    username TEXT NOT NULL,
+    email TEXT NOT NULL,
+    address TEXT NOT NULL,
+    lat REAL NOT NULL,
+    lng REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS todos (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    completed INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_todos_user_completed ON todos(user_id, completed);
+CREATE INDEX IF NOT EXISTS idx_users_lat_lng ON users(lat, lng);
+"""
+
+# Upserts that leave identical rows untouched, so total_changes counts real changes
+_UPSERT_USER = """
+INSERT INTO users (id, name, username, email, address, lat, lng) VALUES (?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    name = excluded.name, username = excluded.username, email = excluded.email,
+    address = excluded.address, lat = excluded.lat, lng = excluded.lng
+WHERE (name, username, email, address, lat, lng) IS NOT
+      (excluded.name, excluded.username, excluded.email, excluded.address, excluded.lat, excluded.lng)
+"""
+
+_UPSERT_TODO = """
+INSERT INTO todos (id, user_id, title, completed) VALUES (?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    user_id = excluded.user_id, title = excluded.title, completed = excluded.completed
+WHERE (user_id, title, completed) IS NOT (excluded.user_id, excluded.title, excluded.completed)
+"""
+
+_COMPLETION_QUERY = """
+SELECT u.id, u.name, u.username, u.email, u.address, u.lat, u.lng,
+       COUNT(t.id) AS total, COALESCE(SUM(t.completed), 0) AS completed
+FROM users u LEFT JOIN todos t ON t.user_id = u.id
+WHERE u.lat BETWEEN ? AND ? AND u.lng BETWEEN ? AND ?
+GROUP BY u.id
+ORDER BY u.id
+"""
+
+
+class SyncStats(NamedTuple):
+    """Rows written or deleted by one sync"""
+    users_changed: int
+    users_deleted: int
+    todos_changed: int
+    todos_deleted: int
+
+
+class SQLiteStore:
+    """Users and todos persisted in SQLite"""
+
+    def __init__(self, path: Optional[str] = None, settings: Optional[Settings] = None):
+        """path: database file, or ':memory:' (default: <cache_dir>/fancode.sqlite3)"""
+        settings = settings or get_settings()
+        # Rows built and written per executemany call, so a sync never materializes a whole table
+        self.batch_size = settings.batch_size
+        if path is None:
+            os.makedirs(settings.cache_dir, exist_ok=True)
+            path = os.path.join(settings.cache_dir, "fancode.sqlite3")
+        self.path = path
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self.connection:
+            self.connection.executescript(_SCHEMA)
+
+    def _replace(self, table: str, upsert: str, rows: Iterable[Tuple]) -> Tuple[int, int]:
+        """Upsert ``rows`` in batches and delete ids not among them; returns (changed, deleted)"""
+        connection = self.connection
+        connection.execute("CREATE TEMP TABLE IF NOT EXISTS seen_ids (id INTEGER PRIMARY KEY)")
+        connection.execute("DELETE FROM seen_ids")
+        changed = 0
+        rows = iter(rows)
+        while True:
+            batch = list(islice(rows, self.batch_size))
+            if not batch:
+                break
+            before = connection.total_changes
+            connection.executemany(upsert, batch)
+            changed += connection.total_changes - before
+            connection.executemany("INSERT INTO seen_ids (id) VALUES (?)", ((row[0],) for row in batch))
+        deleted = connection.execute(
+            f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM seen_ids)").rowcount
+        return changed, deleted
+
+    def sync(self, api_client: APIClient, deadline: Optional[Deadline] = None) -> SyncStats:
+        """Mirror the API's users and todos into the store in one transaction"""
+        users = api_client.get_users(**FanCodeCityValidator._timeout_kwargs(deadline))
+        todos = api_client.get_todos(**FanCodeCityValidator._timeout_kwargs(deadline))
+        return self.load(users, todos)
+
+    def load(self, users: Iterable[User], todos: Iterable[Todo]) -> SyncStats:
+        """Make the store hold exactly ``users`` and ``todos``, writing only what changed"""
+        user_rows = ((user.id, user.name, user.username, user.email,
+                      json.dumps(user.address, sort_keys=True), user.lat, user.lng) for user in users)
+        todo_rows = ((todo.id, todo.user_id, todo.title, int(todo.completed)) for todo in todos)
+        with self._lock, self.connection:
+            users_changed, users_deleted = self._replace("users", _UPSERT_USER, user_rows)
+            todos_changed, todos_deleted = self._replace("todos", _UPSERT_TODO, todo_rows)
+        stats = SyncStats(users_changed, users_deleted, todos_changed, todos_deleted)
+        logger.info(f"SQLite sync: {stats}")
+        return stats
+
+    def completion_rows(self, lat_min: float, lat_max: float,
+                        lng_min: float, lng_max: float) -> List[Tuple]:
+        """(id, name, username, email, address, lat, lng, total, completed) for users inside the bounds"""
+        with self._lock:
+            return self.connection.execute(_COMPLETION_QUERY, (lat_min, lat_max, lng_min, lng_max)).fetchall()
+
+    def counts(self) -> Dict[str, int]:
+        with self._lock:
+            return {table: self.connection.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+                    for table in ("users", "todos")}
+
+    def close(self):
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class SQLiteValidator(FanCodeCityValidator):
+    """FanCodeCityValidator whose filter and aggregation run as one SQL query"""
+
+    def __init__(self, store: SQLiteStore, api_client: Optional[APIClient] = None,
+                 settings: Optional[Settings] = None,
+                 rules: Union[RuleSet, Sequence[Rule], None] = None,
+                 region: Union[Box, Polygon, MultiPolygon, None] = None):
+        """api_client: when given, the store is synced from it before each validation"""
+        super().__init__(api_client, settings=settings, rules=rules, region=region)
+        self.store = store
+
+    def validate_fancode_users(self, deadline: Union[Deadline, float, None] = None,
+                               sink: Optional[ResultSink] = None) -> ValidationResult:
+        """
+        Validate FanCode city users from the store into a ValidationResult.
+
+        deadline bounds the sync (stage 'users') and is checked again before
+        the query (stage 'aggregate'); when it runs out the result is partial
+        and empty, as when the API-backed validator cannot fetch users.
+        fetch_strategy does not apply: there is nothing to fetch per user.
+        """
+        if deadline is None:
+            deadline = self.settings.run_timeout
+        run_deadline = None
+        if deadline is not None or self.stage_timeouts:
+            run_deadline = Deadline.coerce(deadline)
+
+        result = ValidationResult(self.COMPLETION_THRESHOLD, sink=sink, ruleset=self.rules)
+        try:
+            if self.api_client is not None:
+                self.store.sync(self.api_client, self._stage(run_deadline, 'users'))
+            aggregate_deadline = self._stage(run_deadline, 'aggregate')
+            if aggregate_deadline is not None and aggregate_deadline.expired:
+                raise DeadlineExceeded(f"deadline '{aggregate_deadline.name}' expired")
+        except (DeadlineExceeded, requests.Timeout) as e:
+            if run_deadline is None:
+                raise
+            logger.warning(f"Deadline hit before querying the store: {e}")
+            result.partial = True
+            return result
+
+        region = self.region or Box(self.LAT_MIN, self.LAT_MAX, self.LNG_MIN, self.LNG_MAX)
+        rows = self.store.completion_rows(*region.bounds)
+        if not isinstance(region, Box):
+            # The query narrows to the bounding box; the polygon test finishes the job
+            inside = region.contains_many([row[5] for row in rows], [row[6] for row in rows])
+            rows = [row for row, is_inside in zip(rows, inside) if is_inside]
+        for user_id, name, username, email, address, lat, lng, total, completed in rows:
+            result.append(User(user_id, name, username, email, json.loads(address), lat, lng), completed, total)
+
+        if not len(result):
+            logger.warning("No users found in FanCode city")
+        result.evaluate_rules()
+        logger.info(f"Validation Summary: {result.passed_count}/{len(result)} users passed the "
+                    f"{self.COMPLETION_THRESHOLD:g}% completion criteria")
+        return result
@@ -0,0 +1,62 @@
+"""
+Shared test doubles.
+
+Small fakes used by more than one test module, kept here so each module
+imports one definition instead of carrying its own copy.
+"""
+
+import threading
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator
+
+from user import User
+
+
+class FakeClock:
+    """Stand-in for time.monotonic that only moves when a test sets ``now``"""
+
+    def __init__(self, now: float = 0.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def make_user(user_id: int, lat: float = 0.0, lng: float = 50.0) -> User:
+    """A user with fields derived from ``user_id``, placed at (lat, lng)"""
+    return User(user_id, f"User {user_id}", f"u{user_id}", f"u{user_id}@test.com", {}, lat=lat, lng=lng)
+
+
+class UpstreamHandler(BaseHTTPRequestHandler):
+    """Base for local stand-ins of the API; subclasses implement do_GET"""
+
+    protocol_version = "HTTP/1.1"
+
+    def send_body(self, status: int, body: bytes = b'', headers: Dict[str, str] = None):
+        """Reply with ``body`` and a Content-Length, as keep-alive clients need"""
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@contextmanager
+def serve_upstream(handler: type, **attributes) -> Iterator[ThreadingHTTPServer]:
+    """Serve ``handler`` on a free local port; ``attributes`` are set on the server, plus ``url``"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+    server.daemon_threads = True
+    for name, value in attributes.items():
+        setattr(server, name, value)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    server.url = "http://127.0.0.1:%d" % server.server_address[1]
+    try:
+        yield server
+    finally:
+        server.shutdown()
+        server.server_close()
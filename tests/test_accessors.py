@@ -0,0 +1,71 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import utils
+from accessors import compile_path
+
+
+SAMPLE_USERS = [
+    {"id": 1, "address": {"geo": {"lat": "-37.3159", "lng": "81.1496"}}},
+    {"id": 2, "address": {"geo": {"lat": "-43.9509", "lng": "-34.4618"}}},
+    {"id": 3, "address": {"geo": {"lat": "0", "lng": "50"}}},
+    {"id": 4, "address": {}},
+]
+
+
+class TestCompiledAccessors:
+    """Tests for compiled nested-path accessors"""
+
+    def test_get_with_coercion(self):
+        """Dotted paths resolve and string coordinates are coerced to float"""
+        lat = compile_path("address.geo.lat", coerce=float)
+
+        assert lat(SAMPLE_USERS[0]) == -37.3159
+        assert lat(SAMPLE_USERS[3]) is None
+
+    def test_default_on_missing_or_invalid(self):
+        """Missing keys, wrong container types and bad coercions yield the default"""
+        lat = compile_path("address.geo.lat", default=0.0, coerce=float)
+
+        assert lat({}) == 0.0
+        assert lat({"address": "not a dict"}) == 0.0
+        assert lat({"address": {"geo": {"lat": "north"}}}) == 0.0
+        assert lat(None) == 0.0
+
+    def test_key_sequence_path(self):
+        """Key lists work like dotted strings, matching safe_get's calling style"""
+        getter = compile_path(["user", "profile", "id"])
+
+        assert getter({"user": {"profile": {"id": 7}}}) == 7
+        assert getter({"user": {}}) is None
+
+    def test_column_extraction(self):
+        """Batch form extracts a column and falls back per row on bad records"""
+        ids = compile_path("id")
+        lng = compile_path("address.geo.lng", coerce=float)
+
+        assert ids.column(SAMPLE_USERS) == [1, 2, 3, 4]
+        assert lng.column(SAMPLE_USERS) == [81.1496, -34.4618, 50.0, None]
+
+    def test_accessors_are_cached(self):
+        """Compiling the same path twice reuses the same accessor"""
+        assert compile_path("address.geo.lat", coerce=float) is compile_path(["address", "geo", "lat"], coerce=float)
+
+    def test_equal_defaults_of_different_types_are_not_shared(self):
+        """False, 0 and 0.0 hash alike but must each keep their own default"""
+        assert compile_path("missing", default=0)({}) == 0
+        assert compile_path("missing", default=False)({}) is False
+        assert isinstance(compile_path("missing", default=0.0)({}), float)
+
+
+@pytest.mark.fancode
+class TestGeoRecordFilter:
+    """Tests for the raw-record FanCode city filter"""
+
+    def test_filter_fancode_city_records(self):
+        """Only records with coordinates inside the bounds are kept"""
+        selected = utils.filter_fancode_city_records(SAMPLE_USERS)
+
+        assert [record["id"] for record in selected] == [1, 3]
@@ -0,0 +1,84 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import random
+from unittest.mock import Mock, patch
+from aggregation import CompletionAggregator
+from api_client import APIClient
+from config import Settings
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+
+
+class TestCompletionAggregator:
+    """Tests for the spill-to-disk completion counter"""
+
+    def test_spilled_counts_match_in_memory_counts(self, tmp_path):
+        rng = random.Random(7)
+        events = [(rng.randrange(500), rng.random() < 0.4) for _ in range(5000)]
+        expected = {}
+        for user_id, completed in events:
+            counts = expected.setdefault(user_id, [0, 0])
+            counts[0] += completed
+            counts[1] += 1
+
+        aggregator = CompletionAggregator(max_entries=50, spill_dir=str(tmp_path))
+        for user_id, completed in events:
+            aggregator.add(user_id, completed)
+
+        assert len(aggregator.spills) > 1
+        results = list(aggregator.results())
+        assert results == [(user_id, c, t) for user_id, (c, t) in sorted(expected.items())]
+        assert list(tmp_path.iterdir()) == []
+
+    def test_discard_removes_spill_files(self, tmp_path):
+        aggregator = CompletionAggregator(max_entries=1, spill_dir=str(tmp_path))
+        for user_id in range(5):
+            aggregator.add(user_id, True)
+
+        aggregator.discard()
+
+        assert list(tmp_path.iterdir()) == []
+        assert list(aggregator.results()) == []
+
+
+class TestStreamingStrategy:
+    """The streaming strategy reproduces the per-user results in one /todos pass"""
+
+    USERS = [User(user_id, f"User {user_id}", f"u{user_id}", f"u{user_id}@test.com", {}, lat=0.0, lng=50.0)
+             for user_id in (3, 1, 2)]
+    TODOS = [Todo(user_id * 10 + i, user_id, "Task", i < user_id) for user_id in (1, 3, 9) for i in range(4)]
+
+    def test_matches_sequential_strategy(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = self.USERS
+        api_client.get_user_todos.side_effect = lambda user_id: [t for t in self.TODOS if t.user_id == user_id]
+        api_client.iter_todos.side_effect = lambda: iter(self.TODOS)
+
+        expected = FanCodeCityValidator(api_client, settings=Settings()).validate_all_fancode_users()
+        streamed = FanCodeCityValidator(
+            api_client, settings=Settings(fetch_strategy="streaming", spill_threshold=1)).validate_all_fancode_users()
+
+        assert streamed == expected
+        assert [r['user_id'] for r in streamed['user_results']] == [3, 1, 2]
+        api_client.iter_todos.assert_called_once()
+
+    @patch('requests.Session.get')
+    def test_iter_todos_decodes_incrementally(self, mock_get):
+        body = json.dumps([{"id": i, "userId": 1, "title": "Task", "completed": i % 2 == 0}
+                           for i in range(100)]).encode()
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.iter_content.side_effect = lambda chunk_size: (
+            body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+        mock_get.return_value = mock_response
+
+        todos = list(APIClient().iter_todos(chunk_size=16))
+
+        assert len(todos) == 100
+        assert sum(todo.completed for todo in todos) == 50
+        assert mock_get.call_args.kwargs['stream'] is True
+        mock_response.close.assert_called_once()
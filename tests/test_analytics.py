@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import random
+import pytest
+from analytics import CompletionDistribution
+
+
+def results_for(rates):
+    return [{'user_id': user_id, 'completion_percentage': rate} for user_id, rate in enumerate(rates, 1)]
+
+
+class TestCompletionDistribution:
+    """Tests for threshold sweeps and distribution queries"""
+
+    RATES = [10.0, 50.0, 50.0, 55.0, 62.5, 75.0, 100.0]
+
+    @pytest.fixture
+    def distribution(self):
+        return CompletionDistribution(results_for(self.RATES))
+
+    def test_pass_count_is_strictly_greater(self, distribution):
+        assert distribution.pass_count(50.0) == 4
+        assert distribution.fail_count(50.0) == 3
+        assert distribution.sweep([40, 50, 60, 70]) == {40: 6, 50: 4, 60: 3, 70: 2}
+
+    def test_sweep_matches_linear_scan(self):
+        rng = random.Random(5)
+        rates = [rng.choice([0, 25, 50, 75, 100, rng.uniform(0, 100)]) for _ in range(500)]
+        distribution = CompletionDistribution(results_for(rates))
+
+        for threshold in range(0, 101, 5):
+            assert distribution.pass_count(threshold) == sum(rate > threshold for rate in rates)
+
+    def test_near_threshold(self, distribution):
+        assert distribution.near_threshold(50.0, 5) == [2, 3, 4]
+
+    def test_percentiles(self, distribution):
+        assert distribution.percentile(0) == 10.0
+        assert distribution.percentile(50) == 55.0
+        assert distribution.percentile(100) == 100.0
+        with pytest.raises(ValueError):
+            distribution.percentile(101)
+
+    def test_histogram_and_mean(self, distribution):
+        assert distribution.histogram([0, 50, 75, 100]) == [1, 4, 2]
+        assert distribution.mean(50, 60) == pytest.approx(155 / 3)
+        assert distribution.mean(80, 90) is None
+
+    def test_from_summary(self):
+        summary = {'user_results': results_for([80.0, 20.0])}
+
+        distribution = CompletionDistribution.from_summary(summary)
+
+        assert distribution.passing_user_ids(50) == [1]
+        assert len(distribution) == 2
@@ -2,8 +2,11 @@ import sys
 import os
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
+import json
 import pytest
 import requests
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from unittest.mock import Mock, patch, MagicMock
 from api_client import APIClient
 from user import User
@@ -195,3 +198,200 @@ class TestAPIClientPerformance:
         response_time = end_time - start_time
         assert response_time < 5.0, f"API response time {response_time}s is too slow"
         assert len(todos) > 0, "Should return todos"
+
+
+class TestAPIClientThreadSafety:
+    """Tests for thread-safe sessions and connection pool tuning"""
+    
+    def test_default_mode_shares_one_session(self):
+        """Without thread_safe every thread sees the same session"""
+        api_client = APIClient()
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            sessions = set(executor.map(lambda _: id(api_client.session), range(8)))
+        
+        assert sessions == {id(api_client.session)}
+    
+    def test_sessions_of_finished_threads_are_released(self):
+        """Fresh worker threads on every run do not pile up sessions"""
+        api_client = APIClient(thread_safe=True)
+        for _ in range(20):
+            with ThreadPoolExecutor(max_workers=8) as executor:
+                list(executor.map(lambda _: api_client.session, range(8)))
+        
+        assert len(api_client._sessions) == 1  # the client's own session
+        with patch('requests.Session.close') as close:
+            api_client.close()
+        assert close.call_count == 1
+    
+    def test_thread_safe_mode_uses_per_thread_sessions(self):
+        """thread_safe gives each thread its own session over one shared pool"""
+        api_client = APIClient(thread_safe=True)
+        barrier = threading.Barrier(4)
+        
+        def session_for_thread(_):
+            barrier.wait()
+            return api_client.session
+        
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            sessions = list(executor.map(session_for_thread, range(4)))
+        
+        assert len({id(session) for session in sessions}) == 4
+        adapters = {id(session.get_adapter(APIClient.BASE_URL)) for session in sessions}
+        assert adapters == {id(api_client.session.get_adapter(APIClient.BASE_URL))}
+    
+    def test_pool_sizes_are_configurable(self):
+        """pool_connections/pool_maxsize reach the mounted adapter"""
+        api_client = APIClient(pool_connections=4, pool_maxsize=64)
+        adapter = api_client.session.get_adapter(APIClient.BASE_URL)
+        
+        assert adapter._pool_connections == 4
+        assert adapter._pool_maxsize == 64
+    
+    @patch('requests.Session.head')
+    def test_warm_up_opens_connections(self, mock_head):
+        """Warm-up issues one request per connection, capped at the pool size"""
+        api_client = APIClient(pool_maxsize=8, warm_connections=20)
+        
+        assert mock_head.call_count == 8
+        
+        mock_head.side_effect = requests.ConnectionError("offline")
+        assert api_client.warm_up(3) == 0
+    
+    @patch('requests.Session.get')
+    def test_wide_concurrent_fan_out(self, mock_get):
+        """64 workers can fetch through one thread-safe client"""
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = [{"id": 1, "userId": 1, "title": "Task", "completed": True}]
+        mock_get.return_value = mock_response
+        
+        with APIClient(thread_safe=True, pool_maxsize=64) as api_client:
+            with ThreadPoolExecutor(max_workers=64) as executor:
+                results = list(executor.map(api_client.get_user_todos, range(1, 129)))
+        
+        assert len(results) == 128
+        assert all(len(todos) == 1 for todos in results)
+
+
+class TestAPIClientContentMemo:
+    """Tests for content-hash memoization of decoded responses"""
+    
+    USERS_BODY = json.dumps([{
+        "id": 1, "name": "Test User", "username": "testuser", "email": "test@example.com",
+        "address": {"geo": {"lat": "0.0", "lng": "50.0"}}
+    }]).encode()
+    
+    @staticmethod
+    def body_response(body):
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = body
+        mock_response.json.side_effect = AssertionError("memoized path decodes content itself")
+        return mock_response
+    
+    @patch('requests.Session.get')
+    def test_identical_body_skips_decoding(self, mock_get):
+        """A byte-identical body returns the previously built models"""
+        mock_get.return_value = self.body_response(self.USERS_BODY)
+        api_client = APIClient()
+        
+        first = api_client.get_users()
+        with patch('user.User.from_records') as from_records:
+            second = api_client.get_users()
+            from_records.assert_not_called()
+        
+        assert second == first
+        assert second[0] is first[0]
+        assert api_client.memo_hits == 1
+    
+    @patch('requests.Session.get')
+    def test_memoized_models_are_immutable(self, mock_get):
+        """One caller cannot change the models another caller gets from the memo"""
+        from dataclasses import FrozenInstanceError
+        mock_get.return_value = self.body_response(self.USERS_BODY)
+        api_client = APIClient()
+        
+        with pytest.raises(FrozenInstanceError):
+            api_client.get_users()[0].name = "Changed"
+        
+        assert api_client.get_users()[0].name == "Test User"
+    
+    @patch('requests.Session.get')
+    def test_fingerprint_tracks_body(self, mock_get):
+        """The fingerprint changes exactly when the body changes"""
+        api_client = APIClient()
+        mock_get.return_value = self.body_response(self.USERS_BODY)
+        api_client.get_users()
+        before = api_client.fingerprint("users")
+        
+        mock_get.return_value = self.body_response(self.USERS_BODY.replace(b"Test User", b"Renamed"))
+        users = api_client.get_users()
+        
+        assert before == APIClient.content_digest(self.USERS_BODY)
+        assert api_client.fingerprint("users") != before
+        assert users[0].name == "Renamed"
+        assert api_client.memo_hits == 0
+    
+    @patch('requests.Session.get')
+    def test_memo_disabled(self, mock_get):
+        mock_get.return_value = self.body_response(self.USERS_BODY)
+        mock_get.return_value.json.side_effect = None
+        mock_get.return_value.json.return_value = json.loads(self.USERS_BODY)
+        api_client = APIClient(memo_size=0)
+        
+        api_client.get_users()
+        api_client.get_users()
+        
+        assert api_client.memo_hits == 0
+        assert api_client.fingerprint("users") is None
+
+
+class TestAPIClientConditionalPolling:
+    """Tests for the *_if_changed conditional polling methods"""
+    
+    @staticmethod
+    def poll_response(body, status_code=200, headers=None):
+        mock_response = Mock()
+        mock_response.status_code = status_code
+        mock_response.headers = headers or {}
+        mock_response.raise_for_status.return_value = None
+        mock_response.content = body
+        return mock_response
+    
+    @patch('requests.Session.get')
+    def test_etag_sent_and_304_returns_none(self, mock_get):
+        """The stored ETag is sent back and a 304 means nothing changed"""
+        api_client = APIClient()
+        mock_get.return_value = self.poll_response(TestAPIClientContentMemo.USERS_BODY,
+                                                   headers={'ETag': '"v1"'})
+        users = api_client.get_users_if_changed()
+        
+        mock_get.return_value = self.poll_response(b"", status_code=304)
+        assert api_client.get_users_if_changed() is None
+        
+        assert len(users) == 1
+        assert mock_get.call_args.kwargs['headers'] == {'If-None-Match': '"v1"'}
+    
+    @patch('requests.Session.get')
+    def test_unchanged_body_without_validators_returns_none(self, mock_get):
+        """Servers without ETag support fall back to comparing content hashes"""
+        api_client = APIClient()
+        body = TestAPIClientContentMemo.USERS_BODY
+        mock_get.return_value = self.poll_response(body)
+        
+        assert api_client.get_users_if_changed() is not None
+        assert api_client.get_users_if_changed() is None
+        
+        mock_get.return_value = self.poll_response(body.replace(b"Test User", b"Renamed"))
+        assert api_client.get_users_if_changed()[0].name == "Renamed"
+
+    @patch('requests.Session.get')
+    def test_unchanged_body_detected_without_memo(self, mock_get):
+        """Content hashing for polls does not depend on the decode memo"""
+        api_client = APIClient(memo_size=0)
+        mock_get.return_value = self.poll_response(TestAPIClientContentMemo.USERS_BODY)
+        mock_get.return_value.json.return_value = json.loads(TestAPIClientContentMemo.USERS_BODY)
+
+        assert api_client.get_users_if_changed() is not None
+        assert api_client.get_users_if_changed() is None
@@ -0,0 +1,135 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import gzip
+import json
+import time
+import pytest
+import requests
+from api_client import APIClient
+from cassette import Cassette, CassetteAdapter, CassetteMiss, get_cassette, save_cassettes
+from config import Settings
+from httpcache import CachedResponse
+from tests.helpers import UpstreamHandler, serve_upstream
+
+USERS = [{'id': 1, 'name': 'Ann', 'username': 'ann', 'email': 'a@x.com',
+          'address': {'geo': {'lat': '-10', 'lng': '50'}}}]
+TODOS = [{'id': 1, 'userId': 1, 'title': 'a', 'completed': True},
+         {'id': 2, 'userId': 1, 'title': 'b', 'completed': False}]
+
+
+class _Upstream(UpstreamHandler):
+    def do_GET(self):
+        self.server.hits += 1
+        if self.headers.get('If-None-Match') == '"v1"':
+            self.send_body(304)
+            return
+        body = json.dumps(USERS if self.path == '/users' else TODOS).encode()
+        self.send_body(200, body, {"Content-Type": "application/json; charset=utf-8",
+                                   "X-Powered-By": "test", "ETag": '"v1"'})
+
+
+@pytest.fixture
+def upstream():
+    with serve_upstream(_Upstream, hits=0) as server:
+        yield server
+
+
+def record(upstream, path):
+    cassette = Cassette(path)
+    client = APIClient(base_url=upstream.url, adapter=CassetteAdapter(cassette, 'record'), settings=Settings())
+    client.get_users()
+    client.get_todos()
+    cassette.save()
+    return cassette
+
+
+class TestCassette:
+    """Tests for recording and replaying API traffic"""
+
+    def test_replay_serves_recorded_responses_offline(self, upstream, tmp_path):
+        path = str(tmp_path / "api.json.gz")
+        record(upstream, path)
+        upstream.shutdown()
+
+        client = APIClient(base_url=upstream.url, settings=Settings(),
+                           adapter=CassetteAdapter(Cassette(path).load(), 'replay'))
+        assert [user.name for user in client.get_users()] == ["Ann"]
+        assert [todo.id for todo in client.get_todos()] == [1, 2]
+        assert [todo.id for todo in client.iter_todos()] == [1, 2]
+
+    def test_cassette_is_compact(self, upstream, tmp_path):
+        path = str(tmp_path / "api.json.gz")
+        record(upstream, path)
+        with gzip.open(path, 'rt') as f:
+            data = json.load(f)
+        entry = data['interactions'][f"GET {upstream.url}/users"]
+        assert entry['headers'] == {'Content-Type': 'application/json; charset=utf-8', 'ETag': '"v1"'}
+        assert json.loads(entry['body']) == USERS
+
+    def test_missing_request_fails_like_a_connection_error(self, tmp_path):
+        adapter = CassetteAdapter(Cassette(str(tmp_path / "empty.json.gz")), 'replay')
+        client = APIClient(base_url="http://api.invalid", adapter=adapter, settings=Settings())
+        with pytest.raises(CassetteMiss):
+            client.get_users()
+        assert issubclass(CassetteMiss, requests.RequestException)
+
+    def test_conditional_polls_do_not_overwrite_recorded_bodies(self, upstream, tmp_path):
+        path = str(tmp_path / "api.json.gz")
+        cassette = Cassette(path)
+        client = APIClient(base_url=upstream.url, adapter=CassetteAdapter(cassette, 'record'), settings=Settings())
+        assert client.get_users_if_changed() is not None
+        assert client.get_users_if_changed() is None  # answered 304 upstream
+        cassette.save()
+
+        replay = APIClient(base_url=upstream.url, settings=Settings(),
+                           adapter=CassetteAdapter(Cassette(path).load(), 'replay'))
+        assert replay.get_users()[0].name == "Ann"
+
+    def test_errors_do_not_replace_recorded_successes(self, tmp_path):
+        cassette = Cassette(str(tmp_path / "c.json.gz"))
+        cassette.add('GET', CachedResponse("http://api.invalid/users", 200, "OK", {}, b"[]"))
+        cassette.add('GET', CachedResponse("http://api.invalid/users", 503, "Unavailable", {}, b""))
+        assert cassette.get('GET', "http://api.invalid/users").status == 200
+
+    def test_simulated_latency(self, tmp_path):
+        cassette = Cassette(str(tmp_path / "c.json.gz"))
+        cassette.add('GET', CachedResponse("http://api.invalid/users", 200, "OK", {}, json.dumps(USERS).encode()))
+        client = APIClient(base_url="http://api.invalid", settings=Settings(),
+                           adapter=CassetteAdapter(cassette, 'replay', latency=0.05))
+        started = time.monotonic()
+        client.get_users()
+        assert time.monotonic() - started >= 0.05
+
+    def test_saves_merge_recordings_from_several_processes(self, tmp_path):
+        path = str(tmp_path / "c.json.gz")
+        for name in ("users", "todos"):
+            cassette = Cassette(path)
+            cassette.add('GET', CachedResponse(f"http://api.invalid/{name}", 200, "OK", {}, b"[]"))
+            cassette.save()
+        assert len(Cassette(path).load()) == 2
+
+    def test_settings_switch_every_client_to_replay(self, upstream, tmp_path):
+        path = str(tmp_path / "api.json.gz")
+        record(upstream, path)
+        hits = upstream.hits
+        settings = Settings(cassette_mode='replay', cassette_path=path)
+        for _ in range(2):
+            assert APIClient(base_url=upstream.url, settings=settings).get_users()[0].id == 1
+        assert upstream.hits == hits
+        assert get_cassette(path) is get_cassette(path)
+
+    def test_settings_record_mode_saves_process_cassette(self, upstream, tmp_path):
+        path = str(tmp_path / "api.json.gz")
+        APIClient(base_url=upstream.url, settings=Settings(cassette_mode='record', cassette_path=path)).get_users()
+        save_cassettes()
+        assert Cassette(path).load().get('GET', f"{upstream.url}/users") is not None
+
+    def test_replay_without_cassette_file_is_an_error(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            APIClient(settings=Settings(cassette_mode='replay', cassette_path=str(tmp_path / "none.json.gz")))
+
+    def test_invalid_mode_is_rejected(self):
+        with pytest.raises(ValueError):
+            Settings(cassette_mode='rewind')
@@ -0,0 +1,185 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import pytest
+import requests
+from unittest.mock import Mock
+from concurrency import AIMDLimiter, AdaptiveFetcher, TokenBucket
+from api_client import APIClient
+from validator import FanCodeCityValidator
+from user import User
+from todo import Todo
+from tests.helpers import FakeClock
+
+
+def http_error(status):
+    response = Mock()
+    response.status_code = status
+    return requests.HTTPError(f"{status} error", response=response)
+
+
+class TestTokenBucket:
+    """Tests for the client-side rate limiter"""
+
+    def test_burst_then_refill(self):
+        """Capacity bounds the burst and tokens refill at the configured rate"""
+        clock = FakeClock()
+        bucket = TokenBucket(rate=2.0, capacity=3, clock=clock)
+
+        assert [bucket.try_acquire() for _ in range(4)] == [True, True, True, False]
+
+        clock.now = 0.5
+        assert bucket.try_acquire() is True
+        assert bucket.try_acquire() is False
+
+    def test_acquire_timeout(self):
+        """Blocking acquire gives up once the timeout passes"""
+        bucket = TokenBucket(rate=1.0, capacity=1)
+        assert bucket.acquire() is True
+        assert bucket.acquire(timeout=0.01) is False
+
+
+class TestAIMDLimiter:
+    """Tests for the adaptive concurrency limit"""
+
+    def test_additive_increase(self):
+        """A full window of fast successes raises the limit by one"""
+        limiter = AIMDLimiter(initial_limit=4, clock=FakeClock())
+        for _ in range(4):
+            limiter.on_success(0.1)
+
+        assert limiter.limit == 5
+        assert limiter.history[-1].reason == "increase"
+
+    def test_multiplicative_decrease_on_overload(self):
+        """429/5xx halves the limit and is recorded in the history"""
+        limiter = AIMDLimiter(initial_limit=16, clock=FakeClock())
+        limiter.on_overload()
+
+        assert limiter.limit == 8
+        assert limiter.history[-1][1:] == (16, 8, "overload")
+
+    def test_latency_inflation_decreases(self):
+        """Latency far above the best observed latency backs off"""
+        clock = FakeClock()
+        limiter = AIMDLimiter(initial_limit=10, clock=clock)
+        limiter.on_success(0.1)
+        clock.now = 1.0
+        limiter.on_success(0.5)
+
+        assert limiter.limit == 5
+
+    def test_limit_bounds(self):
+        """The limit never leaves [min_limit, max_limit]"""
+        clock = FakeClock()
+        limiter = AIMDLimiter(initial_limit=2, min_limit=1, max_limit=3, clock=clock)
+        for step in range(5):
+            clock.now = step
+            limiter.on_overload()
+        assert limiter.limit == 1
+
+        for _ in range(50):
+            limiter.on_success(0.01)
+        assert limiter.limit == 3
+
+
+class TestAdaptiveFetcher:
+    """Tests for the adaptive fetch layer"""
+
+    def test_map_preserves_order_and_respects_limit(self):
+        """Results come back in input order and in-flight calls stay under the limit"""
+        limiter = AIMDLimiter(initial_limit=3, max_limit=3)
+        peak = []
+        lock = threading.Lock()
+
+        def fetch(item):
+            with lock:
+                peak.append(limiter.in_flight)
+            return item * 2
+
+        results = AdaptiveFetcher(limiter).map(fetch, range(20))
+
+        assert results == [item * 2 for item in range(20)]
+        assert max(peak) <= 3
+
+    def test_overload_is_retried_and_backs_off(self):
+        """A 429 lowers the limit and the call is retried"""
+        limiter = AIMDLimiter(initial_limit=8, max_limit=8)
+        calls = {'count': 0}
+
+        def fetch(item):
+            calls['count'] += 1
+            if calls['count'] == 1:
+                raise http_error(429)
+            return item
+
+        sleeps = []
+        fetcher = AdaptiveFetcher(limiter, max_retries=2, backoff=0.2, sleep=sleeps.append)
+        assert fetcher.map(fetch, [1]) == [1]
+        assert fetcher.metrics()['limit_changes'][0].reason == "overload"
+        assert len(sleeps) == 1 and 0.1 <= sleeps[0] <= 0.2
+
+    def test_retry_after_is_honoured(self):
+        """A Retry-After header sets the wait; backoff doubles per attempt otherwise"""
+        error = http_error(503)
+        error.response.headers = {'Retry-After': '7'}
+        fetcher = AdaptiveFetcher(backoff=1.0, max_backoff=30.0)
+
+        assert fetcher.retry_delay(error, 1) == 7.0
+        assert 2.0 <= fetcher.retry_delay(http_error(503), 3) <= 4.0
+        error.response.headers = {'Retry-After': '120'}
+        assert fetcher.retry_delay(error, 1) == 30.0
+
+    def test_validator_builds_token_bucket_from_settings(self):
+        from config import Settings
+        settings = Settings(fetch_strategy="adaptive", rate_limit=25.0)
+        validator = FanCodeCityValidator(Mock(spec=APIClient), settings=settings)
+
+        assert validator.fetcher.rate_limiter.rate == 25.0
+        assert FanCodeCityValidator(Mock(spec=APIClient), settings=Settings(fetch_strategy="adaptive")
+                                    ).fetcher.rate_limiter is None
+
+    def test_client_errors_are_not_retried(self):
+        """Non-overload HTTP errors propagate immediately"""
+        def fetch(item):
+            raise http_error(404)
+
+        with pytest.raises(requests.HTTPError):
+            AdaptiveFetcher().map(fetch, [1])
+
+
+class TestValidatorWithFetcher:
+    """The validator produces the same summary through the adaptive fetch layer"""
+
+    def test_validate_all_with_fetcher(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [
+            User(1, "FanCode User 1", "fc1", "fc1@test.com", {}, lat=0.0, lng=50.0),
+            User(2, "FanCode User 2", "fc2", "fc2@test.com", {}, lat=-10.0, lng=75.0),
+        ]
+        api_client.get_user_todos.side_effect = lambda user_id: [
+            Todo(1, user_id, "Task 1", True),
+            Todo(2, user_id, "Task 2", user_id == 1),
+        ]
+
+        validator = FanCodeCityValidator(api_client, fetcher=AdaptiveFetcher(rate_limiter=TokenBucket(rate=100.0)))
+        result = validator.validate_all_fancode_users()
+
+        assert [r['user_id'] for r in result['user_results']] == [1, 2]
+        assert result['passed_users'] == 1
+        assert result['failed_users'] == 1
+
+    def test_concurrent_strategies_need_a_thread_safe_client(self):
+        from config import Settings
+        for strategy in ("adaptive", "pipeline"):
+            settings = Settings(fetch_strategy=strategy, max_workers=16)
+            with pytest.raises(ValueError, match="thread_safe"):
+                FanCodeCityValidator(APIClient(thread_safe=False, settings=settings), settings=settings)
+            with pytest.raises(ValueError, match="pool_maxsize>=16"):
+                FanCodeCityValidator(APIClient(thread_safe=True, pool_maxsize=4, settings=settings), settings=settings)
+
+            api_client = APIClient(settings=settings)
+            assert api_client.thread_safe and api_client.pool_maxsize >= 16
+            FanCodeCityValidator(api_client, settings=settings)
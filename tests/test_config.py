@@ -0,0 +1,87 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import Mock
+from config import Settings, get_settings, reload_settings
+from api_client import APIClient
+from validator import FanCodeCityValidator
+from concurrency import AdaptiveFetcher
+
+
+class TestSettings:
+    """Tests for the typed settings loader"""
+    
+    def test_defaults_match_business_rules(self):
+        """Defaults reproduce the original hard-coded values"""
+        settings = Settings.from_env({})
+        
+        assert settings.api_base_url == "http://jsonplaceholder.typicode.com"
+        assert (settings.lat_min, settings.lat_max) == (-40.0, 5.0)
+        assert (settings.lng_min, settings.lng_max) == (5.0, 100.0)
+        assert settings.completion_threshold == 50.0
+        assert settings.fetch_strategy == "sequential"
+        assert settings.run_timeout is None
+    
+    def test_docker_compose_variables_are_read(self):
+        """The variables set in docker-compose.yml are parsed and typed"""
+        settings = Settings.from_env({
+            'API_BASE_URL': "http://localhost:3000",
+            'COMPLETION_THRESHOLD': "60",
+            'LOG_LEVEL': "DEBUG",
+            'FANCODE_MAX_WORKERS': "32",
+            'FANCODE_RUN_TIMEOUT': "12.5",
+        })
+        
+        assert settings.api_base_url == "http://localhost:3000"
+        assert settings.completion_threshold == 60.0
+        assert settings.log_level == "DEBUG"
+        assert settings.max_workers == 32
+        assert settings.run_timeout == 12.5
+    
+    @pytest.mark.parametrize("env", [
+        {'FANCODE_MAX_WORKERS': "many"},
+        {'FANCODE_FETCH_STRATEGY': "telepathy"},
+        {'FANCODE_LAT_MIN': "10", 'FANCODE_LAT_MAX': "0"},
+        {'FANCODE_POOL_MAXSIZE': "0"},
+    ])
+    def test_invalid_values_rejected(self, env):
+        with pytest.raises(ValueError):
+            Settings.from_env(env)
+    
+    def test_settings_are_cached(self, monkeypatch):
+        """get_settings parses once; reload_settings picks up new env values"""
+        first = get_settings()
+        assert get_settings() is first
+        
+        monkeypatch.setenv('COMPLETION_THRESHOLD', "75")
+        try:
+            assert reload_settings().completion_threshold == 75.0
+        finally:
+            monkeypatch.delenv('COMPLETION_THRESHOLD')
+            reload_settings()
+
+
+class TestSettingsWiring:
+    """APIClient and validator take their defaults from settings"""
+    
+    def test_api_client_uses_settings(self):
+        settings = Settings(api_base_url="http://localhost:3000/", pool_maxsize=48, request_timeout=3.0)
+        api_client = APIClient(settings=settings)
+        
+        assert api_client.base_url == "http://localhost:3000"
+        assert api_client.pool_maxsize == 48
+        assert api_client.timeout == 3.0
+        assert APIClient(settings=settings, timeout=1.0).timeout == 1.0
+    
+    def test_validator_uses_settings(self):
+        settings = Settings(lat_min=-10.0, lat_max=10.0, completion_threshold=70.0,
+                            fetch_strategy="adaptive", max_workers=16)
+        validator = FanCodeCityValidator(Mock(spec=APIClient), settings=settings)
+        
+        assert validator.LAT_MIN == -10.0
+        assert validator.LAT_MAX == 10.0
+        assert validator.COMPLETION_THRESHOLD == 70.0
+        assert isinstance(validator.fetcher, AdaptiveFetcher)
+        assert validator.fetcher.limiter.max_limit == 16
@@ -0,0 +1,134 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+import requests
+from unittest.mock import Mock, patch
+from api_client import APIClient
+from deadline import Deadline, DeadlineExceeded
+from validator import FanCodeCityValidator
+from user import User
+from todo import Todo
+from tests.helpers import FakeClock
+
+
+class TestDeadline:
+    """Tests for deadline budgets"""
+
+    def test_unbounded_deadline(self):
+        deadline = Deadline(None)
+        assert deadline.remaining() is None
+        assert deadline.timeout() is None
+        assert deadline.timeout(cap=3.0) == 3.0
+        assert deadline.expired is False
+
+    def test_timeout_is_remaining_budget(self):
+        clock = FakeClock(100.0)
+        deadline = Deadline(10.0, clock=clock)
+        clock.now += 4.0
+
+        assert deadline.timeout() == 6.0
+        assert deadline.timeout(cap=2.0) == 2.0
+
+        clock.now += 6.0
+        assert deadline.expired is True
+        with pytest.raises(DeadlineExceeded):
+            deadline.timeout()
+
+    def test_stage_never_outlives_parent(self):
+        clock = FakeClock(100.0)
+        deadline = Deadline(10.0, clock=clock)
+
+        assert deadline.stage("users", 3.0).remaining() == 3.0
+        assert deadline.stage("todos", 30.0).remaining() == 10.0
+        assert deadline.stage("aggregate").remaining() == 10.0
+
+
+class TestAPIClientTimeouts:
+    """Every request carries a timeout"""
+
+    @patch('requests.Session.get')
+    def test_default_and_explicit_timeouts(self, mock_get):
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = []
+        mock_get.return_value = mock_response
+
+        api_client = APIClient(timeout=7.5)
+        api_client.get_users()
+        assert mock_get.call_args.kwargs['timeout'] == 7.5
+
+        api_client.get_user_todos(1, timeout=0.25)
+        assert mock_get.call_args.kwargs['timeout'] == 0.25
+
+
+@pytest.mark.reliability
+class TestValidatorDeadlines:
+    """Validation returns partial results instead of hanging past its deadline"""
+
+    @pytest.fixture
+    def mock_api_client(self):
+        mock_client = Mock(spec=APIClient)
+        mock_client.get_users.return_value = [
+            User(1, "FanCode User 1", "fc1", "fc1@test.com", {}, lat=0.0, lng=50.0),
+            User(2, "FanCode User 2", "fc2", "fc2@test.com", {}, lat=-10.0, lng=75.0),
+            User(3, "FanCode User 3", "fc3", "fc3@test.com", {}, lat=-20.0, lng=60.0),
+        ]
+
+        def get_user_todos(user_id, timeout=None):
+            assert timeout is not None and timeout > 0
+            if user_id == 2:
+                raise requests.Timeout("read timed out")
+            return [Todo(1, user_id, "Task", True)]
+
+        mock_client.get_user_todos.side_effect = get_user_todos
+        return mock_client
+
+    def test_partial_summary_lists_skipped_users(self, mock_api_client):
+        result = FanCodeCityValidator(mock_api_client).validate_all_fancode_users(deadline=5.0)
+
+        assert result['partial'] is True
+        assert result['evaluated_user_ids'] == [1, 3]
+        assert result['skipped_user_ids'] == [2]
+        assert result['total_users'] == 3
+        assert result['passed_users'] == 2
+        assert result['overall_result'] is False
+
+    def test_expired_deadline_skips_everything(self, mock_api_client):
+        clock = FakeClock(100.0)
+        deadline = Deadline(1.0, clock=clock)
+        clock.now += 2.0
+
+        result = FanCodeCityValidator(mock_api_client).validate_all_fancode_users(deadline=deadline)
+
+        assert result['partial'] is True
+        assert result['user_results'] == []
+        mock_api_client.get_users.assert_not_called()
+
+    def test_complete_run_is_not_partial(self, mock_api_client):
+        mock_api_client.get_user_todos.side_effect = lambda user_id, timeout=None: [Todo(1, user_id, "Task", True)]
+        validator = FanCodeCityValidator(mock_api_client, stage_timeouts={'users': 2.0, 'todos': 5.0})
+
+        result = validator.validate_all_fancode_users()
+
+        assert result['partial'] is False
+        assert result['skipped_user_ids'] == []
+        assert result['overall_result'] is True
+
+    def test_aggregate_stage_starts_after_lazy_fetching(self, mock_api_client):
+        from config import Settings
+        clock = FakeClock(100.0)
+
+        def iter_todos(timeout=None):
+            clock.now += 2.0  # the streamed fetch takes longer than the aggregate budget
+            yield from [Todo(user_id, user_id, "Task", True) for user_id in (1, 2, 3)]
+
+        mock_api_client.iter_todos.side_effect = iter_todos
+        validator = FanCodeCityValidator(mock_api_client, stage_timeouts={'aggregate': 1.0},
+                                         settings=Settings(fetch_strategy="streaming"))
+
+        result = validator.validate_all_fancode_users(deadline=Deadline(10.0, clock=clock))
+
+        assert result['skipped_user_ids'] == []
+        assert result['evaluated_user_ids'] == [1, 2, 3]
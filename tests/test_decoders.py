@@ -0,0 +1,98 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import pytest
+from decoders import DecodeError, RowError, iter_json_array
+from user import User
+from todo import Todo
+
+
+def make_user_data(user_id=1, lat="-37.3159", lng="81.1496"):
+    return {
+        "id": user_id,
+        "name": f"User {user_id}",
+        "username": f"user{user_id}",
+        "email": f"user{user_id}@example.com",
+        "address": {"city": "Gwenborough", "geo": {"lat": lat, "lng": lng}}
+    }
+
+
+class TestGeneratedDecoders:
+    """Tests for the schema-driven fast-path decoders"""
+
+    def test_from_dict_matches_constructor(self):
+        """Decoded users compare equal to ones built through __init__"""
+        data = make_user_data()
+        expected = User(1, "User 1", "user1", "user1@example.com", data["address"], -37.3159, 81.1496)
+
+        assert User.from_dict(data) == expected
+
+    def test_todo_from_records(self):
+        """Bulk decode builds every todo in order"""
+        records = [{"id": i, "userId": 1, "title": f"Task {i}", "completed": i % 2 == 0} for i in range(5)]
+        result = Todo.from_records(records)
+
+        assert result.errors == []
+        assert [todo.id for todo in result.items] == [0, 1, 2, 3, 4]
+        assert result.items[2] == Todo(2, 1, "Task 2", True)
+
+    def test_malformed_rows_do_not_abort_batch(self):
+        """Bad rows are reported by index while good rows are still decoded"""
+        records = [
+            make_user_data(1),
+            {"id": 2, "name": "No Address", "username": "x", "email": "x@x.com"},
+            make_user_data(3, lat="north"),
+            make_user_data(4),
+        ]
+        result = User.from_records(records)
+
+        assert [user.id for user in result.items] == [1, 4]
+        assert RowError(1, "address", "missing key 'address'") in result.errors
+        assert any(error.row == 2 and error.field == "address.geo.lat" for error in result.errors)
+
+    def test_type_mismatch_reported(self):
+        """Wrong JSON types are rejected with the expected type in the message"""
+        result = Todo.from_records([{"id": 1, "userId": 1, "title": "Task", "completed": "yes"}])
+
+        assert result.items == []
+        assert result.errors == [RowError(0, "completed", "expected bool, got str")]
+
+    def test_from_dict_raises_structured_error(self):
+        """Single-row decode raises DecodeError carrying the field errors"""
+        with pytest.raises(DecodeError) as exc_info:
+            Todo.from_dict({"id": 1, "title": "Task", "completed": True})
+
+        assert exc_info.value.errors == [RowError(None, "userId", "missing key 'userId'")]
+
+    def test_non_object_row(self):
+        """Rows that are not JSON objects are reported rather than crashing"""
+        result = Todo.from_records([["not", "a", "dict"]])
+
+        assert result.errors == [RowError(0, "<row>", "expected object, got list")]
+
+
+class TestIterJsonArray:
+    """Tests for incremental decoding of a streamed JSON array"""
+
+    @pytest.mark.parametrize("chunk_size", [1, 3, 64, 4096])
+    def test_any_chunking_yields_same_items(self, chunk_size):
+        items = [{"id": i, "title": "tâche " * i} for i in range(30)] + [12345, "x", None]
+        body = json.dumps(items, ensure_ascii=False).encode()
+
+        chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+
+        assert list(iter_json_array(chunks)) == items
+
+    @pytest.mark.parametrize("body", [b'{"a": 1}', b'[{"a": 1}, {"a"', b'[1 2]', b'[1,,2]', b'[,1]',
+                                      b'[1,2,]', b'[1]garbage', b'[1] [2]', b'[', b'[1,'])
+    def test_malformed_input_rejected(self, body):
+        with pytest.raises(ValueError):
+            list(iter_json_array([body]))
+
+    @pytest.mark.parametrize("chunk_size", [1, 2, 64])
+    def test_whitespace_and_empty_arrays_accepted(self, chunk_size):
+        for body, expected in ((b' [ 1 , 2 ] \n', [1, 2]), (b'[]', []), (b'[ ]\r\n', [])):
+            chunks = (body[i:i + chunk_size] for i in range(0, len(body), chunk_size))
+            assert list(iter_json_array(chunks)) == expected
@@ -0,0 +1,76 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+from dataclasses import replace
+import pytest
+from digest import DatasetDigest
+from todo import Todo
+from user import User
+
+
+def make_dataset(user_count=500, todos_per_user=4):
+    users = [User(user_id, f"User {user_id}", f"u{user_id}", f"u{user_id}@example.com",
+                  {'city': 'X'}, 10.0, 80.0) for user_id in range(1, user_count + 1)]
+    todos = [Todo(user_id * 10 + n, user_id, f"task {n}", n % 2 == 0)
+             for user_id in range(1, user_count + 1) for n in range(todos_per_user)]
+    return users, todos
+
+
+class TestDatasetDigest:
+    """Tests for the bucketed hash-tree digest"""
+
+    def test_root_ignores_row_order(self):
+        users, todos = make_dataset()
+        assert DatasetDigest(users, todos).root == DatasetDigest(users[::-1], todos[::-1]).root
+
+    def test_identical_datasets_compare_at_the_root(self):
+        users, todos = make_dataset()
+        diff = DatasetDigest(users, todos).diff(DatasetDigest(users, todos))
+        assert diff.identical
+        assert diff.nodes_compared == 1
+
+    def test_diff_reports_changed_rows_only(self):
+        users, todos = make_dataset()
+        before = DatasetDigest(users, todos)
+        todos[100] = Todo(todos[100].id, todos[100].user_id, todos[100].title, not todos[100].completed)
+        users[300] = replace(users[300], email="changed@example.com")
+        users.pop(450)  # the user goes; their todos stay
+        diff = DatasetDigest(users, todos).diff(before)
+
+        assert diff.todo_ids == [todos[100].id]
+        assert diff.user_ids == [301, 451]
+        assert diff.buckets == [(0, 63), (256, 319), (448, 511)]
+
+    def test_diff_descends_only_into_changed_subtrees(self):
+        users, todos = make_dataset(user_count=5000)
+        before = DatasetDigest(users, todos, bucket_size=16)
+        users[4000] = replace(users[4000], name="Renamed")
+        diff = DatasetDigest(users, todos, bucket_size=16).diff(before)
+
+        assert diff.user_ids == [4001]
+        # one path down the tree: a root plus at most fanout comparisons per level
+        assert diff.nodes_compared <= 1 + 16 * before.levels
+
+    def test_serialized_digest_round_trips(self):
+        users, todos = make_dataset()
+        digest = DatasetDigest(users, todos)
+        restored = DatasetDigest.from_dict(json.loads(json.dumps(digest.to_dict())))
+        assert restored.root == digest.root
+        assert restored.diff(digest).identical
+
+    def test_empty_dataset(self):
+        users, todos = make_dataset(user_count=3)
+        empty = DatasetDigest([], [])
+        assert empty.root == '0' * 32
+        assert empty.diff(DatasetDigest(users, todos)).user_ids == [1, 2, 3]
+
+    def test_incompatible_shapes_are_rejected(self):
+        users, todos = make_dataset(user_count=3)
+        with pytest.raises(ValueError):
+            DatasetDigest(users, todos).diff(DatasetDigest(users, todos, bucket_size=8))
+
+    def test_ids_outside_the_tree_are_rejected(self):
+        with pytest.raises(ValueError):
+            DatasetDigest([], [Todo(1, 10 ** 12, "t", False)], bucket_size=1, fanout=2, levels=4)
@@ -9,9 +9,10 @@ from user import User
 from todo import Todo
 from api_client import APIClient
 from validator import FanCodeCityValidator
+from config import get_settings
 
 # Configure logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logging.basicConfig(level=get_settings().log_level, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
 
@@ -19,9 +20,9 @@ class TestFanCodeUserTodoCompletion:
     """Test class for FanCode user todo completion validation"""
     
     @pytest.fixture(scope="class")
-    def api_client(self):
-        """Fixture to provide API client"""
-        return APIClient()
+    def api_client(self, http_cache):
+        """Fixture to provide API client (responses shared across workers through http_cache)"""
+        return APIClient(adapter=http_cache.adapter() if http_cache else None)
     
     @pytest.fixture(scope="class")
     def validator(self, api_client):
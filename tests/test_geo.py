@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import math
+import random
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from geo import Box, MultiPolygon, Polygon, from_geojson
+from user import User
+from utils import filter_fancode_city_records, is_in_fancode_city
+from validator import FanCodeCityValidator
+
+
+def brute_force_contains(ring, lat, lng):
+    """Reference even-odd test over every edge"""
+    inside = False
+    for (lat1, lng1), (lat2, lng2) in zip(ring, ring[1:] + ring[:1]):
+        if (lat1 <= lat < lat2) or (lat2 <= lat < lat1):
+            if lng < lng1 + (lat - lat1) * (lng2 - lng1) / (lat2 - lat1):
+                inside = not inside
+    return inside
+
+
+def star(points=200, seed=0):
+    rng = random.Random(seed)
+    return [(-20 + (10 + rng.uniform(-6, 6)) * math.sin(2 * math.pi * i / points),
+             50 + (20 + rng.uniform(-10, 10)) * math.cos(2 * math.pi * i / points)) for i in range(points)]
+
+
+SQUARE = [(0, 0), (0, 10), (10, 10), (10, 0)]
+HOLE = [(4, 4), (4, 6), (6, 6), (6, 4)]
+
+
+class TestPolygon:
+    """Tests for the banded point-in-polygon test"""
+
+    def test_matches_brute_force_on_detailed_boundary(self):
+        ring = star()
+        polygon = Polygon(ring)
+        rng = random.Random(1)
+        points = [(rng.uniform(-40, 0), rng.uniform(20, 80)) for _ in range(2000)]
+
+        expected = [brute_force_contains(ring, lat, lng) for lat, lng in points]
+
+        assert [polygon.contains(lat, lng) for lat, lng in points] == expected
+        assert polygon.contains_many([p[0] for p in points], [p[1] for p in points]) == expected
+        assert polygon.band_count > 1
+        assert max(len(band) for band in polygon._bands) < polygon.edge_count / 4
+
+    def test_edge_through_cell_centres(self):
+        """An edge along the bbox diagonal passes through every diagonal cell's centre"""
+        ring = [(0, 0), (10, 10), (10, 0)]
+        rng = random.Random(2)
+        points = [(rng.uniform(0, 10), rng.uniform(0, 10)) for _ in range(2000)]
+        for bands in (None, 4, 10, 16):
+            polygon = Polygon(ring, bands=bands)
+            assert polygon.contains(8, 2) and not polygon.contains(2, 8)
+            assert [polygon.contains(lat, lng) for lat, lng in points] == \
+                [brute_force_contains(ring, lat, lng) for lat, lng in points]
+
+    def test_matches_brute_force_on_grid_aligned_boundaries(self):
+        """Integer vertices line edges and vertices up with cell centres and rows"""
+        rng = random.Random(5)
+        for seed in range(50):
+            ring = [(round(lat), round(lng)) for lat, lng in star(rng.randint(3, 40), seed)]
+            ring = [point for index, point in enumerate(ring) if point != ring[index - 1]]
+            polygon = Polygon(ring, bands=rng.randint(1, 30))
+            points = [(rng.uniform(-40, 0), rng.uniform(20, 80)) for _ in range(200)]
+            assert [polygon.contains(lat, lng) for lat, lng in points] == \
+                [brute_force_contains(ring, lat, lng) for lat, lng in points]
+
+    def test_holes_are_excluded(self):
+        polygon = Polygon(SQUARE, holes=[HOLE])
+
+        assert polygon.contains(2, 2)
+        assert not polygon.contains(5, 5)
+        assert not polygon.contains(11, 5)
+
+    def test_multipolygon_and_geojson(self):
+        region = from_geojson({"type": "MultiPolygon", "coordinates": [
+            [[[0, 0], [10, 0], [10, 10], [0, 10], [0, 0]]],
+            [[[20, 20], [30, 20], [30, 30], [20, 30], [20, 20]]],
+        ]})
+
+        assert isinstance(region, MultiPolygon)
+        assert region.contains_many([5, 25, 15], [5, 25, 15]) == [True, True, False]
+        with pytest.raises(ValueError):
+            from_geojson({"type": "Point", "coordinates": [0, 0]})
+
+    def test_box_matches_original_bounds(self):
+        box = Box(-40, 5, 5, 100)
+
+        assert box.contains(-40, 5) and box.contains(5, 100)
+        assert box.contains_many([0, 10], [50, 50]) == [True, False]
+
+
+class TestRegionIntegration:
+    """Validator and utils accept a region instead of the default box"""
+
+    def test_validator_uses_region(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [
+            User(1, "In", "in", "in@test.com", {}, lat=2.0, lng=2.0),
+            User(2, "Hole", "hole", "hole@test.com", {}, lat=5.0, lng=5.0),
+            User(3, "Box", "box", "box@test.com", {}, lat=0.0, lng=50.0),
+        ]
+        validator = FanCodeCityValidator(api_client, settings=Settings(), region=Polygon(SQUARE, holes=[HOLE]))
+
+        assert [user.id for user in validator.get_fancode_users()] == [1]
+        assert validator.is_fancode_city_user(api_client.get_users.return_value[0])
+
+    def test_utils_region(self):
+        region = Polygon(SQUARE)
+        records = [{"address": {"geo": {"lat": "1", "lng": "1"}}}, {"address": {"geo": {"lat": "20", "lng": "1"}}},
+                   {"address": {}}]
+
+        assert is_in_fancode_city(1, 1, region=region)
+        assert filter_fancode_city_records(records, region=region) == records[:1]
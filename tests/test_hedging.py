@@ -0,0 +1,130 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+from api_client import APIClient
+from hedging import HedgeBudget, Hedger, LatencyTracker
+
+
+def warmed_hedger(latency=0.01, **kwargs):
+    """Hedger whose latency window already holds fast samples"""
+    hedger = Hedger(min_samples=5, **kwargs)
+    for _ in range(5):
+        hedger.tracker.record(latency)
+    return hedger
+
+
+class TestHedgingPrimitives:
+    """Tests for latency tracking and the hedging budget"""
+
+    def test_percentile_needs_min_samples(self):
+        tracker = LatencyTracker(min_samples=3)
+        tracker.record(1.0)
+        assert tracker.percentile(95) is None
+
+        for latency in (2.0, 3.0, 4.0, 5.0):
+            tracker.record(latency)
+        assert tracker.percentile(50) == 3.0
+        assert tracker.percentile(100) == 5.0
+
+    def test_budget_caps_extra_load(self):
+        """Ten primaries earn one hedge once the burst is spent"""
+        budget = HedgeBudget(ratio=0.1, burst=1.0)
+        assert budget.try_spend() is True
+        assert budget.try_spend() is False
+
+        for _ in range(10):
+            budget.on_request()
+        assert budget.try_spend() is True
+
+
+class TestHedger:
+    """Tests for hedged calls"""
+
+    def test_fast_call_is_not_hedged(self):
+        hedger = warmed_hedger(latency=1.0)
+        assert hedger.call(lambda: "ok") == "ok"
+        assert hedger.metrics()['hedges_sent'] == 0
+
+    def test_slow_primary_loses_to_hedge(self):
+        """A stuck primary is overtaken by the duplicate, and its late result is discarded"""
+        hedger = warmed_hedger()
+        release = threading.Event()
+        calls = []
+        discarded = []
+
+        def fetch():
+            calls.append(1)
+            if len(calls) == 1:
+                release.wait(5)
+                return "slow"
+            return "fast"
+
+        assert hedger.call(fetch, discard=discarded.append) == "fast"
+        release.set()
+        time.sleep(0.05)
+
+        metrics = hedger.metrics()
+        assert metrics['hedges_sent'] == 1
+        assert metrics['hedges_won'] == 1
+        assert discarded == ["slow"]
+
+    def test_budget_exhausted_waits_for_primary(self):
+        hedger = warmed_hedger()
+        hedger.budget = HedgeBudget(ratio=0.0, burst=0.0)
+
+        def fetch():
+            time.sleep(0.05)
+            return "primary"
+
+        assert hedger.call(fetch) == "primary"
+        assert hedger.metrics()['hedges_denied'] == 1
+
+    def test_first_attempts_are_not_limited_by_the_hedge_pool(self):
+        """64 concurrent callers all get a request in flight, not max_workers of them"""
+        from concurrent.futures import ThreadPoolExecutor
+        hedger = warmed_hedger(latency=1.0, max_workers=4)
+        barrier = threading.Barrier(64, timeout=5)
+
+        def fetch():
+            barrier.wait()  # breaks (and raises) unless all 64 run at once
+            return "ok"
+
+        with ThreadPoolExecutor(max_workers=64) as callers:
+            results = list(callers.map(lambda _: hedger.call(fetch), range(64)))
+
+        assert results == ["ok"] * 64
+        hedger.shutdown()
+
+    def test_error_surfaces_when_both_fail(self):
+        hedger = warmed_hedger()
+
+        def fetch():
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        with pytest.raises(ValueError):
+            hedger.call(fetch)
+
+
+class TestHedgedAPIClient:
+    """APIClient routes GETs through the hedger when one is configured"""
+
+    @patch('requests.Session.get')
+    def test_get_user_todos_hedged(self, mock_get):
+        mock_response = Mock()
+        mock_response.raise_for_status.return_value = None
+        mock_response.json.return_value = [{"id": 1, "userId": 3, "title": "Task", "completed": True}]
+        mock_get.return_value = mock_response
+
+        hedger = Hedger()
+        api_client = APIClient(thread_safe=True, hedger=hedger)
+        todos = api_client.get_user_todos(3)
+
+        assert todos[0].user_id == 3
+        assert hedger.metrics()['requests'] == 1
+        hedger.shutdown()
@@ -0,0 +1,89 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from history import Flip, RunHistory
+from results import ValidationResult
+from user import User
+
+
+def make_result(counts):
+    """counts: {user_id: (completed, total)} at a 50% threshold"""
+    result = ValidationResult(50.0)
+    for user_id, (completed, total) in counts.items():
+        result.append(User(user_id, f"User {user_id}", f"u{user_id}", "", {}, 0.0, 50.0), completed, total)
+    return result
+
+
+@pytest.fixture
+def history():
+    with RunHistory(keyframe_interval=5) as history:
+        yield history
+
+
+class TestRunHistory:
+    """Tests for the delta-encoded run history"""
+
+    def test_deltas_store_only_changes(self, history):
+        base = {user_id: (3, 4) for user_id in range(100)}
+        history.record(make_result(base))
+        for run in range(3):
+            changed = dict(base)
+            changed[run] = (1, 4)
+            history.record(make_result(changed))
+
+        # keyframe of 100 rows, then 1, 2 and 2 changed users (one flips back each run)
+        assert history.storage_rows() == 100 + 1 + 2 + 2
+
+    def test_state_reconstruction_across_keyframes(self, history):
+        runs = []
+        for run in range(12):
+            counts = {user_id: (run % (user_id + 1), 10) for user_id in range(6) if (run + user_id) % 7}
+            runs.append((history.record(make_result(counts)), counts))
+
+        for run_id, counts in runs:
+            state = history.state_at(run_id)
+            assert {user_id: values[:2] for user_id, values in state.items()} == counts
+
+    def test_user_history_carries_values_forward(self, history):
+        history.record(make_result({1: (1, 4), 2: (4, 4)}), recorded_at=1.0)
+        history.record(make_result({1: (1, 4), 2: (4, 4)}), recorded_at=2.0)
+        history.record(make_result({1: (3, 4)}), recorded_at=3.0)
+
+        points = history.user_history(1)
+        assert [(p.completed, p.passed) for p in points] == [(1, False), (1, False), (3, True)]
+        assert [p.total for p in history.user_history(2)] == [4, 4, None]
+        assert len(history.user_history(1, last=2)) == 2
+
+    def test_flipped_users_in_window(self, history):
+        run_ids = [history.record(make_result(counts)) for counts in (
+            {1: (1, 4), 2: (4, 4), 3: (4, 4)},
+            {1: (3, 4), 2: (4, 4), 3: (4, 4)},
+            {1: (3, 4), 2: (1, 4), 3: (4, 4)},
+            {1: (3, 4), 2: (1, 4), 3: (3, 4)},
+        )]
+
+        assert history.flipped_users(last=4) == [Flip(1, run_ids[1], True), Flip(2, run_ids[2], False)]
+        assert history.flipped_users(last=2) == [Flip(2, run_ids[2], False)]
+
+    def test_user_missing_at_a_keyframe_stays_absent(self):
+        with RunHistory(keyframe_interval=3) as history:
+            for run in range(5):
+                counts = {1: (3, 4)}
+                if run < 3:
+                    counts[9] = (4, 4)
+                history.record(make_result(counts))
+
+            assert 9 not in history.state_at()
+            points = history.user_history(9)
+            assert [point.passed for point in points] == [True, True, True, None, None]
+            assert [point.passed for point in history.user_history(9, last=2)] == [None, None]
+            assert history.flipped_users(last=5) == []
+
+    def test_accepts_summary_dicts(self, history):
+        summary = make_result({1: (3, 4)}).to_dict()
+
+        run_id = history.record(summary)
+
+        assert history.state_at(run_id) == {1: (3, 4, 1)}
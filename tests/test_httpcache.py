@@ -0,0 +1,100 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import multiprocessing
+import threading
+import time
+import pytest
+import requests
+from api_client import APIClient
+from config import Settings
+from httpcache import CachedResponse, SharedHTTPCache
+from tests.helpers import UpstreamHandler, serve_upstream
+
+USERS = [{'id': 1, 'name': 'Ann', 'username': 'ann', 'email': 'a@x.com',
+          'address': {'geo': {'lat': '-10', 'lng': '50'}}}]
+TODOS = [{'id': todo_id, 'userId': 1, 'title': 't', 'completed': todo_id % 2 == 0} for todo_id in range(1, 6)]
+
+
+class _Upstream(UpstreamHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.hits[self.path] = self.server.hits.get(self.path, 0) + 1
+        time.sleep(0.05)  # long enough for concurrent clients to pile up on a miss
+        payloads = {'/users': USERS, '/todos': TODOS}
+        status, body = (200, json.dumps(payloads[self.path]).encode()) if self.path in payloads else (404, b'{}')
+        self.send_body(status, body, {"Content-Type": "application/json; charset=utf-8"})
+
+
+@pytest.fixture
+def upstream():
+    with serve_upstream(_Upstream, hits={}, lock=threading.Lock()) as server:
+        yield server
+
+
+def _worker(url, directory, queue):
+    """Runs in another process: one client per worker, as under pytest-xdist"""
+    cache = SharedHTTPCache(directory)
+    users = APIClient(base_url=url, adapter=cache.adapter(), settings=Settings()).get_users()
+    queue.put(users[0].name)
+
+
+class TestSharedHTTPCache:
+    """Tests for the cross-process response cache"""
+
+    def test_second_client_reads_the_cached_response(self, upstream, tmp_path):
+        cache = SharedHTTPCache(str(tmp_path))
+        for _ in range(3):
+            users = APIClient(base_url=upstream.url, adapter=cache.adapter(), settings=Settings()).get_users()
+            assert users[0].lat == -10.0
+        assert upstream.hits == {'/users': 1}
+        assert cache.stats() == {'hits': 2, 'fetches': 1}
+
+    def test_exactly_one_process_fetches(self, upstream, tmp_path):
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        processes = [context.Process(target=_worker, args=(upstream.url, str(tmp_path), queue)) for _ in range(4)]
+        for process in processes:
+            process.start()
+        names = [queue.get(timeout=60) for _ in processes]
+        for process in processes:
+            process.join(timeout=60)
+        assert names == ["Ann"] * 4
+        assert upstream.hits == {'/users': 1}
+
+    def test_streaming_through_the_cache(self, upstream, tmp_path):
+        """Rebuilt responses support iter_content and close(), as iter_todos' closing() needs"""
+        cache = SharedHTTPCache(str(tmp_path))
+        for _ in range(2):
+            client = APIClient(base_url=upstream.url, adapter=cache.adapter(), settings=Settings())
+            assert [todo.id for todo in client.iter_todos(chunk_size=16)] == [1, 2, 3, 4, 5]
+        assert upstream.hits == {'/todos': 1}
+
+    def test_errors_are_not_cached(self, upstream, tmp_path):
+        cache = SharedHTTPCache(str(tmp_path))
+        session = requests.Session()
+        session.mount("http://", cache.adapter())
+        for _ in range(2):
+            assert session.get(f"{upstream.url}/missing").status_code == 404
+        assert upstream.hits == {'/missing': 2}
+
+    def test_conditional_requests_bypass_the_cache(self, upstream, tmp_path):
+        cache = SharedHTTPCache(str(tmp_path))
+        session = requests.Session()
+        session.mount("http://", cache.adapter())
+        session.get(f"{upstream.url}/users")
+        session.get(f"{upstream.url}/users", headers={'If-None-Match': '"abc"'})
+        assert upstream.hits == {'/users': 2}
+
+    def test_entries_expire_after_ttl(self, tmp_path):
+        cache = SharedHTTPCache(str(tmp_path), ttl=60)
+        cache.put("key", CachedResponse("http://x/key", 200, "OK", {}, b"[]"))
+        assert cache.get("key").body == b"[]"
+        cache.ttl = 0
+        time.sleep(0.01)
+        assert cache.get("key") is None
+        loads = []
+        cache.fetch("key", lambda: loads.append(1) or CachedResponse("http://x/key", 200, "OK", {}, b"[1]"))
+        assert loads == [1]
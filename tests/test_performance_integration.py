@@ -7,6 +7,9 @@ import time
 from concurrent.futures import ThreadPoolExecutor, as_completed
 from api_client import APIClient
 from validator import FanCodeCityValidator
+from repository import Repository
+from digest import DatasetDigest
+from shared import SharedDatasetValidator
 
 
 @pytest.mark.performance
@@ -14,8 +17,8 @@ class TestFanCodePerformance:
     """Performance tests for FanCode SDET assignment"""
     
     @pytest.fixture(scope="class")
-    def api_client(self):
-        return APIClient()
+    def api_client(self, http_cache):
+        return APIClient(adapter=http_cache.adapter() if http_cache else None)
     
     @pytest.fixture(scope="class")
     def validator(self, api_client):
@@ -51,9 +54,20 @@ class TestFanCodePerformance:
         # Verify we got results
         assert 'total_users' in result
         assert 'user_results' in result
+
+    def test_shared_dataset_validation(self, shared_dataset):
+        """Validation straight from the shared-memory columns is fast and needs no fetching"""
+        start_time = time.time()
+        result = SharedDatasetValidator(shared_dataset).validate_all_fancode_users()
+        validation_time = time.time() - start_time
+
+        assert validation_time < 1.0, f"Shared validation took {validation_time:.2f}s, should be < 1s"
+        assert result['total_users'] > 0
     
-    def test_concurrent_api_calls(self, api_client):
+    def test_concurrent_api_calls(self):
         """Test performance with concurrent API calls"""
+        api_client = APIClient(thread_safe=True, pool_maxsize=5)
+        
         def fetch_user_todos(user_id):
             return api_client.get_user_todos(user_id)
         
@@ -211,6 +225,9 @@ class TestFanCodeReliability:
         user_ids_1 = [user.id for user in users_1]
         user_ids_2 = [user.id for user in users_2]
         assert user_ids_1 == user_ids_2
+
+        # And so should every field of every row
+        assert DatasetDigest(users_1, todos_1).diff(DatasetDigest(users_2, todos_2)).identical
     
     def test_validation_deterministic(self):
         """Test that validation produces deterministic results"""
@@ -235,8 +252,8 @@ class TestFanCodeEndToEnd:
     
     def test_complete_fancode_workflow(self):
         """Test complete FanCode validation workflow"""
-        # Step 1: Initialize components
-        api_client = APIClient()
+        # Step 1: Initialize components (repository memoizes repeated reads)
+        api_client = Repository(APIClient())
         validator = FanCodeCityValidator(api_client)
         
         start_time = time.time()
@@ -0,0 +1,85 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import time
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from pipeline import Pipeline
+from validator import FanCodeCityValidator
+from user import User
+
+
+class TestPipeline:
+    """Tests for the bounded-queue stage pipeline"""
+
+    def test_all_items_flow_through_every_stage(self):
+        pipeline = (Pipeline(queue_size=4)
+                    .stage("double", lambda x: x * 2, workers=3)
+                    .stage("increment", lambda x: x + 1))
+
+        results = sorted(pipeline.run(range(50)))
+
+        assert results == [x * 2 + 1 for x in range(50)]
+        assert [m['processed'] for m in pipeline.metrics()] == [50, 50, 50]
+        assert [m['stage'] for m in pipeline.metrics()] == ["double", "increment", "aggregate"]
+
+    def test_queues_stay_bounded_with_slow_consumer(self):
+        """A slow final stage back-pressures the producers instead of buffering everything"""
+        pipeline = Pipeline(queue_size=2).stage("fast", lambda x: x, workers=4)
+
+        consumed = 0
+        for _ in pipeline.run(range(20)):
+            time.sleep(0.005)
+            consumed += 1
+
+        assert consumed == 20
+        assert all(m['max_queue_depth'] <= 2 for m in pipeline.metrics())
+        assert pipeline.metrics()[-1]['throughput'] > 0
+
+    def test_stage_error_propagates(self):
+        def explode(x):
+            if x == 3:
+                raise ValueError("bad item")
+            return x
+
+        pipeline = Pipeline(queue_size=2).stage("explode", explode, workers=2)
+
+        with pytest.raises(ValueError):
+            list(pipeline.run(range(10)))
+
+    def test_pipeline_without_stages_rejected(self):
+        with pytest.raises(ValueError):
+            list(Pipeline().run([1]))
+
+
+class TestValidatorPipelineStrategy:
+    """The validator's pipeline strategy matches the sequential results"""
+
+    def test_pipeline_strategy_summary(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [
+            User(user_id, f"User {user_id}", f"u{user_id}", f"u{user_id}@test.com", {}, lat=0.0, lng=50.0)
+            for user_id in range(1, 7)
+        ]
+
+        def payload(user_id, timeout=None):
+            time.sleep(0.001 * (7 - user_id))  # later users finish first
+            todos = [{"id": i, "userId": user_id, "title": "Task", "completed": i < user_id}
+                     for i in range(4)]
+            return json.dumps(todos).encode()
+
+        api_client.fetch_user_todos_payload.side_effect = payload
+        api_client.parse_todos.side_effect = APIClient.parse_todos
+
+        validator = FanCodeCityValidator(api_client, settings=Settings(fetch_strategy="pipeline", max_workers=3))
+        result = validator.validate_all_fancode_users()
+
+        assert [r['user_id'] for r in result['user_results']] == [1, 2, 3, 4, 5, 6]
+        assert result['passed_users'] == 4  # users 3..6 complete more than 2 of 4
+        stages = {m['stage']: m for m in validator.last_pipeline.metrics()}
+        assert stages['fetch']['processed'] == 6
+        assert stages['parse']['processed'] == 6
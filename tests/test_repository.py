@@ -0,0 +1,121 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from repository import Repository, TTLCache
+from validator import FanCodeCityValidator
+from user import User
+from todo import Todo
+from tests.helpers import FakeClock
+
+
+class TestTTLCache:
+    """Tests for the TTL/LRU cache"""
+    
+    def test_lru_eviction(self):
+        cache = TTLCache(maxsize=2, ttl=None)
+        cache.set('a', 1)
+        cache.set('b', 2)
+        cache.get('a')
+        cache.set('c', 3)
+        
+        assert cache.get('a') == 1
+        assert cache.get('b', None) is None
+        assert cache.stats()['evictions'] == 1
+    
+    def test_ttl_expiry(self):
+        clock = FakeClock()
+        cache = TTLCache(ttl=10.0, clock=clock)
+        cache.set('users', [1])
+        
+        clock.now = 10.0
+        assert cache.get('users') == [1]
+        clock.now = 10.5
+        assert cache.get('users', None) is None
+        assert cache.stats() == {'hits': 1, 'misses': 1, 'evictions': 0, 'size': 0}
+
+
+class TestRepository:
+    """Tests for the caching repository over APIClient"""
+    
+    @pytest.fixture
+    def mock_api_client(self):
+        mock_client = Mock(spec=APIClient)
+        mock_client.get_users.return_value = [
+            User(1, "FanCode User", "fc", "fc@test.com", {}, lat=0.0, lng=50.0),
+            User(2, "Outside User", "out", "out@test.com", {}, lat=50.0, lng=150.0),
+        ]
+        mock_client.get_todos.return_value = [
+            Todo(1, 1, "Task 1", True),
+            Todo(2, 1, "Task 2", True),
+            Todo(3, 2, "Task 3", False),
+        ]
+        mock_client.get_user_todos.side_effect = lambda user_id, timeout=None: [Todo(9, user_id, "Task", True)]
+        return mock_client
+    
+    def test_repeated_reads_hit_cache(self, mock_api_client):
+        repository = Repository(mock_api_client, ttl=60)
+        
+        first = repository.get_users()
+        second = repository.get_users()
+        
+        assert first == second
+        assert first is not second  # callers get their own list
+        assert mock_api_client.get_users.call_count == 1
+        assert repository.stats()['hits'] == 1
+    
+    def test_bulk_todos_prime_per_user_entries(self, mock_api_client):
+        repository = Repository(mock_api_client, ttl=60)
+        repository.get_todos()
+        
+        assert [todo.id for todo in repository.get_user_todos(1)] == [1, 2]
+        mock_api_client.get_user_todos.assert_not_called()
+    
+    def test_invalidation(self, mock_api_client):
+        repository = Repository(mock_api_client, ttl=60)
+        repository.get_users()
+        repository.get_user_todos(1)
+        repository.get_user_todos(2)
+        
+        repository.invalidate(user_id=1)
+        repository.get_user_todos(1)
+        repository.get_user_todos(2)
+        assert mock_api_client.get_user_todos.call_count == 3
+        
+        repository.invalidate('users')
+        repository.get_users()
+        assert mock_api_client.get_users.call_count == 2
+        
+        repository.invalidate()
+        assert repository.stats()['size'] == 0
+    
+    def test_validator_runs_on_repository(self, mock_api_client):
+        """Repeated validation runs reuse cached users and todos"""
+        validator = FanCodeCityValidator(Repository(mock_api_client, ttl=60))
+        
+        results = [validator.validate_all_fancode_users() for _ in range(3)]
+        
+        assert all(result['passed_users'] == 1 for result in results)
+        assert mock_api_client.get_users.call_count == 1
+        assert mock_api_client.get_user_todos.call_count == 1
+    
+    @pytest.mark.parametrize("strategy", ["pipeline", "streaming"])
+    def test_concurrent_and_streaming_strategies_use_the_cache(self, mock_api_client, strategy):
+        """Neither raw payloads nor the /todos stream bypass the repository"""
+        from config import Settings
+        validator = FanCodeCityValidator(Repository(mock_api_client, ttl=60),
+                                         settings=Settings(fetch_strategy=strategy))
+        
+        results = [validator.validate_all_fancode_users() for _ in range(2)]
+        
+        assert results[0] == results[1]
+        mock_api_client.fetch_user_todos_payload.assert_not_called()
+        mock_api_client.iter_todos.assert_not_called()
+        assert mock_api_client.get_user_todos.call_count + mock_api_client.get_todos.call_count == 1
+    
+    def test_unknown_attributes_delegate_to_client(self, mock_api_client):
+        mock_api_client.base_url = "http://example.test"
+        assert Repository(mock_api_client).base_url == "http://example.test"
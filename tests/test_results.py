@@ -0,0 +1,106 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import tracemalloc
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from results import SinkRow, ValidationResult
+from rules import min_todos
+from todo import Todo
+from validator import FanCodeCityValidator
+from tests.helpers import make_user
+
+
+class TestValidationResult:
+    """Tests for the array-backed result type"""
+
+    def test_rows_match_validator_dicts(self):
+        validator = FanCodeCityValidator(Mock(spec=APIClient), settings=Settings())
+        result = ValidationResult(50.0)
+        for user_id, (completed, total) in enumerate([(3, 4), (2, 4), (0, 0)], 1):
+            result.append(make_user(user_id), completed, total)
+
+        assert [row.to_dict() for row in result] == [
+            validator.build_user_result(make_user(1), 3, 4),
+            validator.build_user_result(make_user(2), 2, 4),
+            validator.build_user_result(make_user(3), 0, 0),
+        ]
+        assert result.passed_count == 1
+        assert result[-1].completion_percentage == 0.0
+        with pytest.raises(IndexError):
+            result[3]
+
+    def test_rows_reference_users(self):
+        user = make_user(1)
+        result = ValidationResult(50.0)
+        result.append(user, 1, 1)
+
+        assert result[0].user is user
+        assert result[0].passed is True
+
+    def test_sink_rows_match_stored_rows(self):
+        """Rows handed to a sink carry the same fields without building a result per row"""
+        written = []
+        sink = Mock()
+        sink.write.side_effect = written.append
+        stored, streamed = ValidationResult(50.0), ValidationResult(50.0, sink=sink)
+        for user_id, (completed, total) in enumerate([(3, 4), (2, 4), (0, 0)], 1):
+            stored.append(make_user(user_id), completed, total)
+            streamed.append(make_user(user_id), completed, total)
+
+        assert all(type(row) is SinkRow for row in written)
+        assert [row.to_dict() for row in written] == [row.to_dict() for row in stored]
+        assert streamed.passed_count == stored.passed_count == 1
+
+    def test_reorder(self):
+        result = ValidationResult(50.0)
+        for user_id in (3, 1, 2):
+            result.append(make_user(user_id), user_id, 3)
+        result.skipped_user_ids = [5, 4]
+
+        result.reorder({1: 0, 2: 1, 3: 2, 4: 3, 5: 4})
+
+        assert list(result.user_ids) == [1, 2, 3]
+        assert list(result.completed) == [1, 2, 3]
+        assert list(result.passed) == [0, 1, 1]
+        assert result.skipped_user_ids == [4, 5]
+        assert result.to_dict()['partial'] is True
+
+    def test_smaller_than_dict_rows(self):
+        users = [make_user(user_id) for user_id in range(2000)]
+        validator = FanCodeCityValidator(Mock(spec=APIClient), settings=Settings())
+
+        tracemalloc.start()
+        try:
+            result = ValidationResult(50.0)
+            for user in users:
+                result.append(user, 3, 4)
+            compact = tracemalloc.get_traced_memory()[0]
+            rows = [validator.build_user_result(user, 3, 4) for user in users]
+            dicts = tracemalloc.get_traced_memory()[0] - compact
+        finally:
+            tracemalloc.stop()
+
+        assert len(rows) == len(result)
+        assert compact * 5 < dicts
+
+
+class TestValidatorCompactResult:
+    """validate_fancode_users returns the compact form of validate_all_fancode_users"""
+
+    def test_to_dict_matches_summary(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [make_user(1), make_user(2)]
+        api_client.get_user_todos.side_effect = lambda user_id: [
+            Todo(user_id * 10 + i, user_id, "Task", i < user_id) for i in range(3)]
+        validator = FanCodeCityValidator(api_client, settings=Settings(), rules=[min_todos(3)])
+
+        result = validator.validate_fancode_users()
+
+        assert isinstance(result, ValidationResult)
+        assert result.to_dict() == validator.validate_all_fancode_users()
+        assert result.to_dict()['rules']['min_todos_3']['result'] is True
+        assert result.overall_result is False
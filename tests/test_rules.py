@@ -0,0 +1,74 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from rules import Rule, RuleSet, city_threshold, completion_above, min_todos, no_zero_completions
+from todo import Todo
+from validator import FanCodeCityValidator
+from tests.helpers import make_user
+
+
+class TestRuleSet:
+    """Tests for the fused rule evaluator"""
+
+    ROWS = [
+        (make_user(1), 3, 4),
+        (make_user(2), 0, 2),
+        (make_user(3, lat=-30.0), 1, 1),
+        (make_user(4, lat=-30.0), 1, 3),
+    ]
+
+    def test_breakdown_per_rule(self):
+        rules = RuleSet([
+            completion_above(50),
+            min_todos(2),
+            no_zero_completions(),
+            city_threshold("south", -40, -20, 5, 100, 30),
+        ])
+
+        breakdown = rules.evaluate(self.ROWS)
+
+        assert breakdown['completion_above_50']['failed_user_ids'] == [2, 4]
+        assert breakdown['min_todos_2']['failed_user_ids'] == [3]
+        assert breakdown['no_zero_completions']['failed_user_ids'] == [2]
+        south = breakdown['south_completion_above_30']
+        assert (south['applicable'], south['passed'], south['result']) == (2, 2, True)
+
+    def test_generated_source_is_single_loop(self):
+        rules = RuleSet([completion_above(50), min_todos(2), no_zero_completions()])
+
+        assert rules.source.count("for ") == 2  # the row loop plus the failed-list initialiser
+
+    def test_custom_rule_and_duplicate_names(self):
+        rules = RuleSet([Rule("few_open", "total - completed <= {limit}", params={'limit': 1})])
+        assert rules.evaluate(self.ROWS)['few_open']['failed_user_ids'] == [2, 4]
+
+        with pytest.raises(ValueError):
+            RuleSet([min_todos(1), min_todos(1)])
+
+    def test_rule_without_matches_passes(self):
+        breakdown = RuleSet([city_threshold("north", 60, 80, 0, 10, 90)]).evaluate(self.ROWS)
+
+        assert breakdown['north_completion_above_90']['applicable'] == 0
+        assert breakdown['north_completion_above_90']['result'] is True
+
+
+class TestValidatorRules:
+    """Rules are evaluated alongside the completion check and reported in the summary"""
+
+    def test_summary_contains_rule_breakdown(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [make_user(1), make_user(2)]
+        api_client.get_user_todos.side_effect = lambda user_id: [
+            Todo(user_id * 10 + i, user_id, "Task", True) for i in range(user_id)]
+
+        validator = FanCodeCityValidator(api_client, settings=Settings(), rules=[min_todos(2)])
+        summary = validator.validate_all_fancode_users()
+
+        assert summary['passed_users'] == 2
+        assert summary['rules']['min_todos_2']['failed_user_ids'] == [1]
+        assert summary['overall_result'] is False
@@ -0,0 +1,96 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from sampling import wilson_interval
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+
+
+@pytest.fixture
+def api_client():
+    """100 FanCode users; every tenth user fails"""
+    api_client = Mock(spec=APIClient)
+    api_client.get_users.return_value = [
+        User(user_id, f"User {user_id}", f"u{user_id}", f"u{user_id}@test.com", {},
+             lat=-30.0 if user_id % 2 else 0.0, lng=50.0)
+        for user_id in range(1, 101)
+    ]
+    api_client.get_user_todos.side_effect = lambda user_id: [
+        Todo(user_id * 10 + i, user_id, "Task", user_id % 10 != 0) for i in range(2)]
+    return api_client
+
+
+class TestWilsonInterval:
+    """Tests for the Wilson score interval"""
+
+    def test_interval_contains_observed_rate(self):
+        lower, upper = wilson_interval(45, 50)
+
+        assert lower < 0.9 < upper
+        assert 0.0 <= lower and upper <= 1.0
+
+    def test_full_population_is_exact(self):
+        assert wilson_interval(90, 100, population=100) == pytest.approx((0.9, 0.9))
+
+    def test_no_samples_is_uninformative(self):
+        assert wilson_interval(0, 0) == (0.0, 1.0)
+
+
+class TestApproximateValidation:
+    """Tests for FanCodeCityValidator.estimate_fancode_users"""
+
+    def test_sample_fetches_only_sampled_users(self, api_client):
+        validator = FanCodeCityValidator(api_client, settings=Settings())
+
+        estimator = validator.estimate_fancode_users(20, seed=1)
+        estimate = estimator.estimate()
+
+        assert api_client.get_user_todos.call_count == 20
+        assert estimate.sampled == 20
+        assert estimate.population == 100
+        assert estimate.lower <= estimate.pass_rate <= estimate.upper
+
+    def test_sample_fetches_per_user_under_streaming(self, api_client):
+        validator = FanCodeCityValidator(api_client, settings=Settings(fetch_strategy="streaming"))
+
+        estimator = validator.estimate_fancode_users(20, seed=1)
+
+        api_client.iter_todos.assert_not_called()
+        assert api_client.get_user_todos.call_count == 20
+        assert estimator.estimate().sampled == 20
+
+    def test_refinement_narrows_to_exact(self, api_client):
+        validator = FanCodeCityValidator(api_client, settings=Settings())
+        estimator = validator.estimate_fancode_users(10, seed=2)
+        first = estimator.estimate()
+
+        final = estimator.refine(90)
+
+        assert final.upper - final.lower < first.upper - first.lower
+        assert final.exact
+        assert final.pass_rate == pytest.approx(0.9)
+        assert sorted(final.failed_user_ids) == list(range(10, 101, 10))
+        assert final.as_dict()['max_failing_users'] == 10
+
+    def test_refine_until_target_width(self, api_client):
+        validator = FanCodeCityValidator(api_client, settings=Settings())
+        estimator = validator.estimate_fancode_users(10, seed=3)
+
+        estimate = estimator.refine_until(0.2, step=10)
+
+        assert estimate.upper - estimate.lower <= 0.2
+        assert estimate.sampled < 100
+
+    def test_stratified_sample_is_proportional(self, api_client):
+        validator = FanCodeCityValidator(api_client, settings=Settings())
+
+        estimator = validator.estimate_fancode_users(20, seed=4, stratify=lambda user: user.lat < -10)
+
+        odd = sum(result['user_id'] % 2 for result in estimator.user_results)
+        assert 8 <= odd <= 12
@@ -0,0 +1,117 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import json
+import urllib.error
+import urllib.request
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from service import ValidationService
+from todo import Todo
+from user import User
+
+
+def make_api_client():
+    api_client = Mock(spec=APIClient)
+    api_client.get_users.return_value = [
+        User(1, "User 1", "u1", "u1@test.com", {}, lat=0.0, lng=50.0),
+        User(2, "User 2", "u2", "u2@test.com", {}, lat=-10.0, lng=20.0),
+        User(3, "User 3", "u3", "u3@test.com", {}, lat=50.0, lng=50.0),
+    ]
+    api_client.get_user_todos.side_effect = lambda user_id, timeout=None: [
+        Todo(user_id * 10 + i, user_id, "Task", i < user_id * 2) for i in range(4)]
+    return api_client
+
+
+class TestValidationService:
+    """Tests for the cached result service"""
+
+    @pytest.fixture
+    def service(self):
+        api_client = make_api_client()
+        service = ValidationService(api_client, refresh_interval=3600, settings=Settings())
+        host, port = service.serve(host="127.0.0.1", port=0)
+        service.url = f"http://{host}:{port}"
+        service.upstream = api_client
+        yield service
+        service.stop()
+
+    @staticmethod
+    def fetch(url, method='GET'):
+        request = urllib.request.Request(url, method=method)
+        try:
+            with urllib.request.urlopen(request, timeout=5) as response:
+                return response.status, json.loads(response.read())
+        except urllib.error.HTTPError as e:
+            return e.code, json.loads(e.read())
+
+    def test_summary_and_lookups(self, service):
+        status, summary = self.fetch(f"{service.url}/summary")
+        assert status == 200
+        assert summary['total_users'] == 2
+        assert summary['passed_users'] == 1
+
+        status, rows = self.fetch(f"{service.url}/users/2")
+        assert status == 200
+        assert [(row['city'], row['passed']) for row in rows] == [('fancode', True)]
+
+        assert self.fetch(f"{service.url}/cities/fancode")[1] == summary
+        assert self.fetch(f"{service.url}/cities")[1] == ['fancode']
+
+    def test_unknown_paths_return_404(self, service):
+        assert self.fetch(f"{service.url}/users/3")[0] == 404
+        assert self.fetch(f"{service.url}/cities/atlantis")[0] == 404
+
+    def test_reads_do_not_hit_upstream(self, service):
+        """Polling serves the snapshot; only refreshes fetch"""
+        for _ in range(20):
+            self.fetch(f"{service.url}/summary")
+
+        assert service.upstream.get_users.call_count == 1
+
+    def test_on_demand_refresh(self, service):
+        status, _ = self.fetch(f"{service.url}/refresh", method='POST')
+
+        assert status == 200
+        assert service.upstream.get_users.call_count == 2
+        assert self.fetch(f"{service.url}/health")[1]['refreshes'] == 2
+
+    def test_lookup_before_first_refresh(self):
+        service = ValidationService(make_api_client(), settings=Settings())
+
+        assert service.lookup('GET', '/summary')[0] == 503
+        assert service.lookup('GET', '/health')[0] == 200
+
+    def test_starts_while_upstream_is_down(self):
+        import requests
+        api_client = make_api_client()
+        api_client.get_users.side_effect = requests.ConnectionError("upstream down")
+        service = ValidationService(api_client, refresh_interval=3600, settings=Settings())
+        host, port = service.serve(host="127.0.0.1", port=0)
+        try:
+            assert self.fetch(f"http://{host}:{port}/summary")[0] == 503
+            assert self.fetch(f"http://{host}:{port}/health")[1]['last_error'] == "upstream down"
+
+            api_client.get_users.side_effect = None
+            assert self.fetch(f"http://{host}:{port}/refresh", method='POST')[0] == 200
+            assert self.fetch(f"http://{host}:{port}/summary")[0] == 200
+        finally:
+            service.stop()
+
+    def test_user_in_several_cities_keeps_every_row(self):
+        from repository import Repository
+        from validator import FanCodeCityValidator
+        repository = Repository(make_api_client(), settings=Settings())
+        cities = {'fancode': FanCodeCityValidator(repository, settings=Settings()),
+                  'everywhere': FanCodeCityValidator(repository, settings=Settings(
+                      lat_min=-90.0, lat_max=90.0, lng_min=-180.0, lng_max=180.0))}
+        service = ValidationService(cities=cities, settings=Settings())
+        service.refresh()
+
+        status, body = service.lookup('GET', '/users/2')
+
+        assert status == 200
+        assert [row['city'] for row in json.loads(body)] == ['fancode', 'everywhere']
@@ -0,0 +1,102 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import multiprocessing
+import pytest
+from config import Settings
+from shared import SharedDataset, SharedDatasetValidator
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+from unittest.mock import Mock
+
+
+USERS = [
+    User(1, "Ann", "ann", "ann@example.com", {'city': 'Gwenborough'}, -10.0, 50.0),
+    User(2, "Bob", "bob", "bob@example.com", {}, 20.0, 50.0),          # outside the city
+    User(3, "Chloé", "chloe", "c@example.com", {'geo': {'lat': '1'}}, 0.0, 10.0),
+]
+TODOS = [
+    Todo(11, 1, "a", True), Todo(12, 1, "b", True), Todo(13, 1, "c", False),
+    Todo(21, 2, "d", True),
+    Todo(31, 3, "é", False), Todo(32, 3, "f", False),
+]
+
+
+def _child_sum(name, queue):
+    """Runs in another process: attach by name and read a column"""
+    dataset = SharedDataset.attach(name)
+    queue.put((sum(dataset.column('completed')), dataset.user(2).name))
+    dataset.close()
+
+
+@pytest.fixture
+def dataset():
+    with SharedDataset.create(USERS, TODOS[::-1]) as dataset:
+        yield dataset
+
+
+class TestSharedDataset:
+    """Tests for the shared-memory columnar dataset"""
+
+    def test_round_trips_models(self, dataset):
+        assert dataset.get_users() == USERS
+        assert dataset.get_todos() == TODOS
+        assert dataset.get_user_todos(3) == TODOS[4:]
+        assert dataset.get_user_todos(99) == []
+
+    def test_counts_are_precomputed(self, dataset):
+        assert [dataset.counts(index) for index in range(3)] == [(2, 3), (1, 1), (0, 2)]
+
+    def test_attach_shares_the_same_memory(self, dataset):
+        other = SharedDataset.attach(dataset.name)
+        try:
+            assert other.get_users() == USERS
+            dataset.column('completed')[0] = 3
+            assert other.counts(0) == (3, 3)
+        finally:
+            other.close()
+
+    def test_other_process_attaches_by_name(self, dataset):
+        context = multiprocessing.get_context('spawn')
+        queue = context.Queue()
+        process = context.Process(target=_child_sum, args=(dataset.name, queue))
+        process.start()
+        assert queue.get(timeout=30) == (3, "Chloé")
+        process.join(timeout=30)
+        assert process.exitcode == 0
+
+    def test_close_unlinks_owned_segment(self):
+        dataset = SharedDataset.create(USERS, TODOS)
+        name = dataset.name
+        dataset.close()
+        dataset.close()
+        with pytest.raises(FileNotFoundError):
+            SharedDataset.attach(name)
+
+
+class TestSharedDatasetValidator:
+    """Tests for validation over the shared columns"""
+
+    def test_matches_api_backed_validator(self, dataset):
+        api_client = Mock()
+        api_client.get_users.return_value = USERS
+        api_client.get_user_todos.side_effect = lambda user_id: [t for t in TODOS if t.user_id == user_id]
+        expected = FanCodeCityValidator(api_client, settings=Settings()).validate_all_fancode_users()
+
+        assert SharedDatasetValidator(dataset, settings=Settings()).validate_all_fancode_users() == expected
+
+    def test_rules_run_on_shared_rows(self, dataset):
+        from rules import min_todos
+        summary = SharedDatasetValidator(dataset, settings=Settings(),
+                                         rules=[min_todos(3)]).validate_all_fancode_users()
+        assert summary['rules']['min_todos_3']['failed_user_ids'] == [3]
+
+    def test_expired_deadline_skips_remaining_users(self, dataset):
+        summary = SharedDatasetValidator(dataset, settings=Settings()).validate_all_fancode_users(deadline=0)
+
+        assert summary['partial'] is True
+        assert summary['user_results'] == []
+        assert summary['skipped_user_ids']
+        assert summary['overall_result'] is False
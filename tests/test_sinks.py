@@ -0,0 +1,115 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import csv
+import gzip
+import json
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from results import ValidationResult
+from sinks import COLUMNS, ColumnarSink, CSVSink, NDJSONSink, open_text, read_columnar
+from todo import Todo
+from validator import FanCodeCityValidator
+from tests.helpers import make_user
+
+
+def fill(result, count):
+    for user_id in range(1, count + 1):
+        result.append(make_user(user_id), user_id % 4, 3)
+
+
+class TestSinks:
+    """Tests for the streaming result writers"""
+
+    def test_ndjson_rows_match_summary_shape(self, tmp_path):
+        path = str(tmp_path / "results.ndjson.gz")
+        with NDJSONSink(path) as sink:
+            fill(ValidationResult(50.0, sink=sink), 5)
+        kept = ValidationResult(50.0)
+        fill(kept, 5)
+
+        with gzip.open(path, 'rt') as f:
+            rows = [json.loads(line) for line in f]
+        assert rows == kept.to_dict()['user_results']
+
+    def test_csv_columns(self, tmp_path):
+        path = str(tmp_path / "results.csv")
+        with CSVSink(path) as sink:
+            fill(ValidationResult(50.0, sink=sink), 3)
+
+        with open(path, newline='') as f:
+            rows = list(csv.reader(f))
+        assert tuple(rows[0]) == COLUMNS
+        assert [row[0] for row in rows[1:]] == ["1", "2", "3"]
+        assert rows[3][-1] == "True"
+
+    @pytest.mark.parametrize("compression", [None, "bz2", "xz"])
+    def test_columnar_row_groups(self, tmp_path, compression):
+        path = str(tmp_path / "results.columns")
+        with ColumnarSink(path, compression=compression, row_group_size=4) as sink:
+            fill(ValidationResult(50.0, sink=sink), 10)
+
+        groups = list(read_columnar(path, compression))
+        assert [len(group['user_id']) for group in groups] == [4, 4, 2]
+        assert sum(groups[0]['passed']) == 2
+
+    def test_sinks_must_implement_write(self, tmp_path):
+        from sinks import ResultSink
+        with pytest.raises(TypeError):
+            ResultSink(str(tmp_path / "x"))
+
+    def test_unknown_compression_rejected(self, tmp_path):
+        with pytest.raises(ValueError):
+            open_text(str(tmp_path / "x"), compression="zip")
+
+
+class TestValidatorSink:
+    """validate_all_fancode_users streams rows instead of returning them"""
+
+    def test_summary_without_rows(self, tmp_path):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [make_user(1), make_user(2)]
+        api_client.get_user_todos.side_effect = lambda user_id: [
+            Todo(user_id * 10 + i, user_id, "Task", i < user_id) for i in range(3)]
+        validator = FanCodeCityValidator(api_client, settings=Settings())
+        path = str(tmp_path / "results.ndjson")
+
+        with NDJSONSink(path) as sink:
+            summary = validator.validate_all_fancode_users(sink=sink)
+
+        assert 'user_results' not in summary
+        assert summary['evaluated_user_ids'] == [1, 2]
+        assert summary['passed_users'] == 1
+        with open(path) as f:
+            assert [json.loads(line)['user_id'] for line in f] == [1, 2]
+
+    def test_rows_are_not_kept(self, tmp_path):
+        with NDJSONSink(str(tmp_path / "results.ndjson")) as sink:
+            result = ValidationResult(50.0, sink=sink)
+            fill(result, 4)
+
+        assert not result.users and not len(result.completed)
+        assert list(result.user_ids) == [1, 2, 3, 4]
+        with pytest.raises(ValueError):
+            list(result)
+
+    def test_summary_counts_and_rules_with_sink(self, tmp_path):
+        from rules import min_todos
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = [make_user(1), make_user(2), make_user(3)]
+        api_client.get_user_todos.side_effect = lambda user_id: [
+            Todo(user_id * 10 + i, user_id, "Task", i < user_id) for i in range(user_id + 1)]
+        validator = FanCodeCityValidator(api_client, settings=Settings(), rules=[min_todos(3)])
+        expected = validator.validate_all_fancode_users()
+
+        with NDJSONSink(str(tmp_path / "results.ndjson")) as sink:
+            summary = validator.validate_all_fancode_users(sink=sink)
+
+        assert summary['total_users'] == 3
+        assert summary['failed_users'] == expected['failed_users']
+        assert summary['overall_result'] == expected['overall_result']
+        assert summary['rules'] == expected['rules']
+        assert summary['rules']['min_todos_3']['failed_user_ids'] == [1]
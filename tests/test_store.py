@@ -0,0 +1,120 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from store import SQLiteStore, SQLiteValidator, SyncStats
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+
+
+USERS = [
+    User(1, "User 1", "u1", "u1@test.com", {"city": "A"}, lat=0.0, lng=50.0),
+    User(2, "User 2", "u2", "u2@test.com", {"city": "B"}, lat=-10.0, lng=20.0),
+    User(3, "User 3", "u3", "u3@test.com", {"city": "C"}, lat=50.0, lng=50.0),
+    User(4, "User 4", "u4", "u4@test.com", {"city": "D"}, lat=1.0, lng=10.0),
+]
+TODOS = [Todo(user_id * 10 + i, user_id, "Task", i < user_id) for user_id in (1, 2, 3) for i in range(4)]
+
+
+@pytest.fixture
+def store():
+    with SQLiteStore(":memory:") as store:
+        yield store
+
+
+class TestSQLiteStore:
+    """Tests for the SQLite sync layer"""
+
+    def test_indexes_exist(self, store):
+        names = {row[0] for row in store.connection.execute("SELECT name FROM sqlite_master WHERE type='index'")}
+
+        assert {"idx_todos_user_completed", "idx_users_lat_lng"} <= names
+
+    def test_incremental_sync_writes_only_changes(self, store):
+        assert store.load(USERS, TODOS) == SyncStats(4, 0, 12, 0)
+        assert store.load(USERS, TODOS) == SyncStats(0, 0, 0, 0)
+
+        todos = [Todo(t.id, t.user_id, t.title, True) if t.id == 11 else t for t in TODOS[:-1]]
+        assert store.load(USERS[:3], todos) == SyncStats(0, 1, 1, 1)
+        assert store.counts() == {"users": 3, "todos": 11}
+
+    def test_batched_sync_matches_single_batch(self, store):
+        with SQLiteStore(":memory:", settings=Settings(batch_size=5)) as batched:
+            assert batched.load(USERS, TODOS) == SyncStats(4, 0, 12, 0)
+            todos = [Todo(t.id, t.user_id, t.title, True) if t.id == 11 else t for t in TODOS[:-1]]
+            assert batched.load(USERS[:3], todos) == SyncStats(0, 1, 1, 1)
+            assert batched.counts() == {"users": 3, "todos": 11}
+
+    def test_sync_from_api_client(self, store):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = USERS
+        api_client.get_todos.return_value = TODOS
+
+        store.sync(api_client)
+
+        assert store.counts() == {"users": 4, "todos": 12}
+
+
+class TestSQLiteValidator:
+    """The SQL backend reproduces the list-based validator's summary"""
+
+    def test_matches_list_validator(self, store):
+        store.load(USERS, TODOS)
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = USERS
+        api_client.get_user_todos.side_effect = lambda user_id: [t for t in TODOS if t.user_id == user_id]
+
+        expected = FanCodeCityValidator(api_client, settings=Settings()).validate_all_fancode_users()
+        actual = SQLiteValidator(store, settings=Settings()).validate_all_fancode_users()
+
+        assert actual == expected
+        assert actual['evaluated_user_ids'] == [1, 2, 4]
+        assert actual['passed_users'] == 0  # 1/4 and 2/4 do not exceed 50%; user 4 has no todos
+
+    def test_syncs_before_validating(self, store):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users.return_value = USERS[:1]
+        api_client.get_todos.return_value = [Todo(1, 1, "Task", True)]
+
+        summary = SQLiteValidator(store, api_client, settings=Settings()).validate_all_fancode_users()
+
+        assert summary['passed_users'] == 1
+        assert summary['overall_result'] is True
+
+    def test_honours_region_rules_and_sink(self, store, tmp_path):
+        from geo import Polygon
+        from rules import min_todos
+        from sinks import NDJSONSink
+        store.load(USERS, TODOS)
+        triangle = Polygon([(-20.0, 0.0), (20.0, 0.0), (-20.0, 100.0)])  # excludes user 1 at (0, 50)
+        path = str(tmp_path / "rows.ndjson")
+
+        with NDJSONSink(path) as sink:
+            summary = SQLiteValidator(store, settings=Settings(), region=triangle,
+                                      rules=[min_todos(3)]).validate_all_fancode_users(sink=sink)
+
+        assert summary['evaluated_user_ids'] == [2, 4]
+        assert summary['rules']['min_todos_3']['failed_user_ids'] == [4]
+        assert 'user_results' not in summary
+        with open(path) as f:
+            assert len(f.readlines()) == 2
+
+    def test_validate_fancode_users_without_api_client(self, store):
+        store.load(USERS, TODOS)
+
+        result = SQLiteValidator(store, settings=Settings()).validate_fancode_users()
+
+        assert [user.address for user, _, _ in result.counts()] == [{"city": "A"}, {"city": "B"}, {"city": "D"}]
+
+    def test_expired_deadline_gives_partial_result(self, store):
+        store.load(USERS, TODOS)
+
+        summary = SQLiteValidator(store, settings=Settings()).validate_all_fancode_users(deadline=0)
+
+        assert summary['partial'] is True
+        assert summary['overall_result'] is False
@@ -0,0 +1,92 @@
+import sys
+import os
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+import pytest
+from unittest.mock import Mock
+from api_client import APIClient
+from config import Settings
+from todo import Todo
+from validator import FanCodeCityValidator
+from watch import Watcher
+from tests.helpers import make_user
+
+
+def make_todos(user_id, completed, total, start_id):
+    return [Todo(start_id + i, user_id, "Task", i < completed) for i in range(total)]
+
+
+class TestWatcher:
+    """Tests for incremental watch-mode revalidation"""
+
+    @pytest.fixture
+    def api_client(self):
+        api_client = Mock(spec=APIClient)
+        api_client.get_users_if_changed.return_value = [make_user(1), make_user(2), make_user(3, lat=50.0)]
+        api_client.get_todos_if_changed.return_value = (
+            make_todos(1, 3, 4, 100) + make_todos(2, 1, 4, 200) + make_todos(3, 4, 4, 300))
+        return api_client
+
+    @pytest.fixture
+    def watcher(self, api_client):
+        return Watcher(api_client, FanCodeCityValidator(api_client, settings=Settings()))
+
+    def test_first_poll_adds_fancode_users(self, watcher):
+        events = watcher.poll()
+
+        assert [(e.kind, e.user_id, e.new_status) for e in events] == [('added', 1, 'PASS'), ('added', 2, 'FAIL')]
+        summary = watcher.summary()
+        assert summary['total_users'] == 2
+        assert summary['passed_users'] == 1
+
+    def test_unchanged_poll_does_no_work(self, watcher, api_client):
+        watcher.poll()
+        api_client.get_users_if_changed.return_value = None
+        api_client.get_todos_if_changed.return_value = None
+
+        assert watcher.poll() == []
+        assert watcher.last_recomputed == 0
+
+    def test_todo_change_flips_only_that_user(self, watcher, api_client):
+        watcher.poll()
+        todos = make_todos(1, 1, 4, 100) + make_todos(2, 1, 4, 200) + make_todos(3, 4, 4, 300)
+        api_client.get_users_if_changed.return_value = None
+        api_client.get_todos_if_changed.return_value = todos
+
+        events = watcher.poll()
+
+        assert [str(e) for e in events] == ["user 1 flipped from PASS to FAIL"]
+        assert watcher.last_recomputed == 1
+        assert watcher.summary()['passed_users'] == 0
+
+    def test_user_moving_out_of_city_is_removed(self, watcher, api_client):
+        watcher.poll()
+        api_client.get_users_if_changed.return_value = [make_user(1), make_user(2, lat=50.0), make_user(3, lat=50.0)]
+        api_client.get_todos_if_changed.return_value = None
+
+        events = watcher.poll()
+
+        assert [(e.kind, e.user_id, e.old_status) for e in events] == [('removed', 2, 'FAIL')]
+        assert [r['user_id'] for r in watcher.summary()['user_results']] == [1]
+
+    def test_user_change_survives_a_failed_todos_poll(self, watcher, api_client):
+        watcher.poll()
+        api_client.get_users_if_changed.return_value = [make_user(1), make_user(2, lat=50.0), make_user(3, lat=50.0)]
+        api_client.get_todos_if_changed.side_effect = ConnectionError("todos down")
+        with pytest.raises(ConnectionError):
+            watcher.poll()
+
+        # The client will not return these users again; the watcher must still apply them
+        api_client.get_users_if_changed.return_value = None
+        api_client.get_todos_if_changed.side_effect = None
+        api_client.get_todos_if_changed.return_value = None
+        events = watcher.poll()
+
+        assert [(e.kind, e.user_id) for e in events] == [('removed', 2)]
+
+    def test_run_stops_after_max_polls(self, watcher):
+        seen = []
+        watcher.run(0, on_events=seen.extend, max_polls=3)
+
+        assert watcher.polls == 3
+        assert len(seen) == 2
@@ -1,7 +1,8 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, List
+from decoders import Field, DecodeResult, compile_decoder
 
-@dataclass
+@dataclass(frozen=True)
 class Todo:
     """Data class to represent a todo task"""
     id: int
@@ -12,9 +13,19 @@ class Todo:
     @classmethod
     def from_dict(cls, data: Dict) -> 'Todo':
         """Create Todo object from API response"""
-        return cls(
-            id=data['id'],
-            user_id=data['userId'],
-            title=data['title'],
-            completed=data['completed']
-        )
+        return _DECODER.decode_one(data)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> DecodeResult:
+        """Create Todo objects in bulk, collecting malformed rows as errors"""
+        return _DECODER.decode_many(records)
+
+
+TODO_SCHEMA = (
+    Field('id', 'id', int),
+    Field('user_id', 'userId', int),
+    Field('title', 'title', str),
+    Field('completed', 'completed', bool),
+)
+
+_DECODER = compile_decoder(Todo, TODO_SCHEMA)
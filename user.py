@@ -1,7 +1,8 @@
 from dataclasses import dataclass
-from typing import Dict
+from typing import Dict, List
+from decoders import Field, DecodeResult, compile_decoder
 
-@dataclass
+@dataclass(frozen=True)
 class User:
     """Data class to represent a user"""
     id: int
@@ -15,12 +16,22 @@ class User:
     @classmethod
     def from_dict(cls, data: Dict) -> 'User':
         """Create User object from API response"""
-        return cls(
-            id=data['id'],
-            name=data['name'],
-            username=data['username'],
-            email=data['email'],
-            address=data['address'],
-            lat=float(data['address']['geo']['lat']),
-            lng=float(data['address']['geo']['lng'])
-        )
+        return _DECODER.decode_one(data)
+
+    @classmethod
+    def from_records(cls, records: List[Dict]) -> DecodeResult:
+        """Create User objects in bulk, collecting malformed rows as errors"""
+        return _DECODER.decode_many(records)
+
+
+USER_SCHEMA = (
+    Field('id', 'id', int),
+    Field('name', 'name', str),
+    Field('username', 'username', str),
+    Field('email', 'email', str),
+    Field('address', 'address', dict),
+    Field('lat', 'address.geo.lat', float, coerce=True),
+    Field('lng', 'address.geo.lng', float, coerce=True),
+)
+
+_DECODER = compile_decoder(User, USER_SCHEMA)
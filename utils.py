@@ -1,6 +1,10 @@
 # Utility functions for FanCode SDET Assignment
 
 import re
+from accessors import compile_path
+
+_USER_LAT = compile_path('address.geo.lat', coerce=float)
+_USER_LNG = compile_path('address.geo.lng', coerce=float)
 
 def is_email_valid(email: str) -> bool:
     """Simple email validation."""
@@ -9,7 +13,10 @@ def is_email_valid(email: str) -> bool:
     return bool(re.match(pattern, email))
 
 def safe_get(dct, keys):
-    """Safely get a nested value from a dict."""
+    """Safely get a nested value from a dict.
+
+    Walks ``keys`` on every call; hot paths should use accessors.compile_path.
+    """
     for key in keys:
         if isinstance(dct, dict) and key in dct:
             dct = dct[key]
@@ -17,10 +24,26 @@ def safe_get(dct, keys):
             return None
     return dct
 
-def is_in_fancode_city(lat, lng, lat_min=-40, lat_max=5, lng_min=5, lng_max=100):
-    """Check if coordinates are within FanCode City bounds."""
+def is_in_fancode_city(lat, lng, lat_min=-40, lat_max=5, lng_min=5, lng_max=100, region=None):
+    """Check if coordinates are within FanCode City bounds (or ``region``, e.g. a geo.Polygon)."""
+    if region is not None:
+        return region.contains(lat, lng)
     return lat_min <= lat <= lat_max and lng_min <= lng <= lng_max
 
+def filter_fancode_city_records(records, lat_min=-40, lat_max=5, lng_min=5, lng_max=100, region=None):
+    """Filter raw user payloads to those whose address.geo lies within FanCode City (or ``region``)."""
+    lats = _USER_LAT.column(records)
+    lngs = _USER_LNG.column(records)
+    if region is not None:
+        located = [(record, lat, lng) for record, lat, lng in zip(records, lats, lngs)
+                   if lat is not None and lng is not None]
+        inside = region.contains_many([lat for _, lat, _ in located], [lng for _, _, lng in located])
+        return [record for (record, _, _), is_inside in zip(located, inside) if is_inside]
+    return [
+        record for record, lat, lng in zip(records, lats, lngs)
+        if lat is not None and lng is not None and lat_min <= lat <= lat_max and lng_min <= lng <= lng_max
+    ]
+
 def calculate_todo_completion(todos):
     """Calculate completion percentage for a list of todos."""
     if not todos:
@@ -1,26 +1,82 @@
 import logging
-from typing import List, Tuple, Dict
+from typing import Callable, Hashable, Iterable, Iterator, List, Optional, Sequence, Tuple, Dict, Union
+import requests
 from user import User
 from todo import Todo
 from api_client import APIClient
+from concurrency import AdaptiveFetcher, AIMDLimiter, TokenBucket
+from config import Settings, get_settings
+from aggregation import CompletionAggregator
+from deadline import Deadline, DeadlineExceeded
+from geo import Box, MultiPolygon, Polygon
+from pipeline import Pipeline
+from repository import Repository
+from results import ValidationResult, build_summary
+from rules import Rule, RuleSet
+from sinks import ResultSink
+from sampling import PassRateEstimator
 
 logger = logging.getLogger(__name__)
 
 class FanCodeCityValidator:
     """Validator class for FanCode city users and their todo completion rates"""
 
-    # FanCode city coordinates constraints
+    # FanCode city coordinates constraints (defaults; instances take them from settings)
     LAT_MIN = -40
     LAT_MAX = 5
     LNG_MIN = 5
     LNG_MAX = 100
     COMPLETION_THRESHOLD = 50.0  # 50% completion threshold
 
-    def __init__(self, api_client: APIClient):
+    def __init__(self, api_client: APIClient, fetcher: Optional[AdaptiveFetcher] = None,
+                 stage_timeouts: Optional[Dict[str, float]] = None,
+                 settings: Optional[Settings] = None,
+                 rules: Union[RuleSet, Sequence[Rule], None] = None,
+                 region: Union[Box, Polygon, MultiPolygon, None] = None):
+        settings = settings or get_settings()
+        self.settings = settings
         self.api_client = api_client
+        self.LAT_MIN = settings.lat_min
+        self.LAT_MAX = settings.lat_max
+        self.LNG_MIN = settings.lng_min
+        self.LNG_MAX = settings.lng_max
+        self.COMPLETION_THRESHOLD = settings.completion_threshold
+        # City boundary; None keeps the LAT/LNG box above
+        self.region = region
+        # Optional concurrent fetch layer; todos are fetched one user at a time without it
+        if fetcher is None and settings.fetch_strategy == 'adaptive':
+            rate_limiter = TokenBucket(settings.rate_limit) if settings.rate_limit is not None else None
+            fetcher = AdaptiveFetcher(AIMDLimiter(max_limit=settings.max_workers), rate_limiter)
+        self.fetcher = fetcher
+        if fetcher is not None:
+            self.check_concurrent_client(api_client, fetcher.limiter.max_limit)
+        elif settings.fetch_strategy == 'pipeline':
+            self.check_concurrent_client(api_client, settings.max_workers)
+        # Pipeline used by the most recent 'pipeline' strategy run, kept for its metrics
+        self.last_pipeline: Optional[Pipeline] = None
+        # Per-stage caps in seconds for 'users', 'todos' and 'aggregate'
+        self.stage_timeouts = dict(stage_timeouts or {})
+        # Extra rules evaluated in the same scan as the completion check
+        self.rules = rules if rules is None or isinstance(rules, RuleSet) else RuleSet(rules)
+
+    @staticmethod
+    def check_concurrent_client(api_client: APIClient, workers: int):
+        """
+        Raise ValueError unless ``api_client`` can serve ``workers`` threads:
+        per-thread sessions (thread_safe) and pool_maxsize >= workers.
+        APIClient(settings=...) sets both itself for a concurrent fetch_strategy.
+        """
+        if getattr(api_client, 'thread_safe', True) is False:
+            raise ValueError("concurrent fetching needs APIClient(thread_safe=True)")
+        pool_maxsize = getattr(api_client, 'pool_maxsize', None)
+        if isinstance(pool_maxsize, int) and pool_maxsize < workers:
+            raise ValueError(f"concurrent fetching with {workers} workers needs APIClient(pool_maxsize>={workers}), "
+                             f"got {pool_maxsize}")
 
     def is_fancode_city_user(self, user: User) -> bool:
         """Check if user belongs to FanCode city based on coordinates"""
+        if self.region is not None:
+            return self.region.contains(user.lat, user.lng)
         return (self.LAT_MIN <= user.lat <= self.LAT_MAX and 
                 self.LNG_MIN <= user.lng <= self.LNG_MAX)
 
@@ -33,20 +89,40 @@ class FanCodeCityValidator:
         total_todos = len(todos)
         return (completed_todos / total_todos) * 100
 
-    def get_fancode_users(self) -> List[User]:
+    @staticmethod
+    def _timeout_kwargs(deadline: Optional[Deadline]) -> Dict:
+        """Request kwargs carrying the remaining budget; empty when no deadline is set"""
+        if deadline is None:
+            return {}
+        return {'timeout': deadline.timeout()}
+
+    def _stage(self, deadline: Optional[Deadline], name: str) -> Optional[Deadline]:
+        if deadline is None:
+            return None
+        return deadline.stage(name, self.stage_timeouts.get(name))
+
+    def get_fancode_users(self, deadline: Optional[Deadline] = None) -> List[User]:
         """Get all users belonging to FanCode city"""
-        all_users = self.api_client.get_users()
-        fancode_users = [user for user in all_users if self.is_fancode_city_user(user)]
+        all_users = self.api_client.get_users(**self._timeout_kwargs(deadline))
+        if self.region is not None:
+            inside = self.region.contains_many([user.lat for user in all_users], [user.lng for user in all_users])
+            fancode_users = [user for user, is_inside in zip(all_users, inside) if is_inside]
+        else:
+            fancode_users = [user for user in all_users if self.is_fancode_city_user(user)]
 
         logger.info(f"Found {len(fancode_users)} users in FanCode city out of {len(all_users)} total users")
         return fancode_users
 
     def validate_user_completion_rate(self, user: User) -> Tuple[bool, float, int, int]:
         """
-        Validate if user has more than 50% todos completed
+        Validate if user has more than COMPLETION_THRESHOLD% todos completed
         Returns: (is_valid, completion_percentage, completed_count, total_count)
         """
         user_todos = self.api_client.get_user_todos(user.id)
+        return self.evaluate_user_todos(user, user_todos)
+
+    def evaluate_user_todos(self, user: User, user_todos: List[Todo]) -> Tuple[bool, float, int, int]:
+        """Apply the completion rule to todos that were already fetched for a user"""
         completion_percentage = self.calculate_completion_percentage(user_todos)
         completed_count = sum(1 for todo in user_todos if todo.completed)
         total_count = len(user_todos)
@@ -58,52 +134,209 @@ class FanCodeCityValidator:
 
         return is_valid, completion_percentage, completed_count, total_count
 
-    def validate_all_fancode_users(self) -> Dict:
-        """Validate all FanCode city users' todo completion rates"""
-        fancode_users = self.get_fancode_users()
+    def build_user_result(self, user: User, completed_count: int, total_count: int) -> Dict:
+        """Per-user result row from that user's todo counts"""
+        completion_percentage = (completed_count / total_count) * 100 if total_count else 0.0
+        return {
+            'user_id': user.id,
+            'user_name': user.name,
+            'username': user.username,
+            'coordinates': {'lat': user.lat, 'lng': user.lng},
+            'total_todos': total_count,
+            'completed_todos': completed_count,
+            'completion_percentage': completion_percentage,
+            'passed': completion_percentage > self.COMPLETION_THRESHOLD
+        }
+
+    def _fetch_todos_within(self, user_id: int, deadline: Deadline) -> Optional[List[Todo]]:
+        """Fetch one user's todos with the remaining budget; None if it ran out"""
+        try:
+            return self.api_client.get_user_todos(user_id, **self._timeout_kwargs(deadline))
+        except (DeadlineExceeded, requests.Timeout) as e:
+            logger.warning(f"Skipping user {user_id}: {e}")
+            return None
+
+    def fetch_user_todos(self, users: List[User],
+                         deadline: Optional[Deadline] = None) -> Iterable[Optional[List[Todo]]]:
+        """
+        Fetch todos for each user, in order, through the fetch layer if one is set.
+        With a deadline, users whose fetch does not fit in the budget yield None.
+        """
+        if deadline is None:
+            fetch = self.api_client.get_user_todos
+        else:
+            fetch = lambda user_id: self._fetch_todos_within(user_id, deadline)
+        if self.fetcher is not None:
+            return self.fetcher.map(fetch, [user.id for user in users])
+        if deadline is not None:
+            return [fetch(user.id) for user in users]
+        return (fetch(user.id) for user in users)
+
+    def _pipelined_user_todos(self, users: List[User],
+                              deadline: Optional[Deadline]) -> Iterator[Tuple[User, Optional[List[Todo]]]]:
+        """Fetch (I/O) and parse (CPU) stages joined by bounded queues; yields in completion order"""
+        # A Repository caches parsed todos, not payloads: fetch those and leave nothing to parse
+        cached = isinstance(self.api_client, Repository)
+
+        def fetch(user: User):
+            try:
+                if cached:
+                    return user, self.api_client.get_user_todos(user.id, **self._timeout_kwargs(deadline))
+                return user, self.api_client.fetch_user_todos_payload(user.id, **self._timeout_kwargs(deadline))
+            except (DeadlineExceeded, requests.Timeout) as e:
+                if deadline is None:
+                    raise
+                logger.warning(f"Skipping user {user.id}: {e}")
+                return user, None
+
+        def parse(fetched):
+            user, payload = fetched
+            if payload is None or cached:
+                return fetched
+            return user, self.api_client.parse_todos(payload, f"todos for user {user.id}")
+
+        pipeline = (Pipeline(queue_size=self.settings.queue_size)
+                    .stage("fetch", fetch, workers=self.settings.max_workers)
+                    .stage("parse", parse))
+        self.last_pipeline = pipeline
+        return pipeline.run(users)
+
+    def iter_user_todos(self, users: List[User],
+                        deadline: Optional[Deadline] = None) -> Iterator[Tuple[User, Optional[List[Todo]]]]:
+        """(user, todos) pairs using the configured fetch strategy; todos is None for skipped users"""
+        if self.fetcher is None and self.settings.fetch_strategy == 'pipeline':
+            return self._pipelined_user_todos(users, deadline)
+        return zip(users, self.fetch_user_todos(users, deadline))
+
+    def _streamed_user_counts(self, users: List[User],
+                              deadline: Optional[Deadline]) -> Iterator[Tuple[User, Optional[Tuple[int, int]]]]:
+        """
+        Count every user's todos in one streamed pass over /todos. Memory for
+        the counts is bounded; ``users`` itself is not, so the user list must
+        still fit in memory.
+        """
+        by_id = {user.id: user for user in users}
+        aggregator = CompletionAggregator(self.settings.spill_threshold)
+        try:
+            for index, todo in enumerate(self.api_client.iter_todos(**self._timeout_kwargs(deadline))):
+                if todo.user_id in by_id:
+                    aggregator.add(todo.user_id, todo.completed)
+                if deadline is not None and not index & 4095 and deadline.expired:
+                    raise DeadlineExceeded(f"deadline '{deadline.name}' expired")
+        except (DeadlineExceeded, requests.Timeout) as e:
+            aggregator.discard()
+            if deadline is None:
+                raise
+            logger.warning(f"Skipping {len(users)} users: {e}")
+            for user in users:
+                yield user, None
+            return
+
+        for user_id, completed_count, total_count in aggregator.results():
+            yield by_id.pop(user_id), (completed_count, total_count)
+        for user in by_id.values():  # no todos at all
+            yield user, (0, 0)
+
+    def iter_user_counts(self, users: List[User], deadline: Optional[Deadline] = None,
+                         per_user: bool = False) -> Iterator[Tuple[User, Optional[Tuple[int, int]]]]:
+        """
+        (user, (completed, total)) pairs; counts is None for skipped users.
+        per_user: fetch each user's todos even under the 'streaming' strategy,
+        which otherwise reads all of /todos (right for a few sampled users)
+        """
+        if self.fetcher is None and self.settings.fetch_strategy == 'streaming' and not per_user:
+            return self._streamed_user_counts(users, deadline)
+        return ((user, None if user_todos is None else self.evaluate_user_todos(user, user_todos)[2:])
+                for user, user_todos in self.iter_user_todos(users, deadline))
+
+    def estimate_fancode_users(self, sample_size: int, confidence: float = 0.95, seed: Optional[int] = None,
+                               stratify: Optional[Callable[[User], Hashable]] = None) -> PassRateEstimator:
+        """
+        Approximate mode: validate a random sample of FanCode users and
+        estimate the pass fraction with confidence bounds. Only sampled users'
+        todos are fetched, one user at a time (or through the concurrent
+        strategies) even when fetch_strategy is 'streaming'; call ``refine()``
+        on the result to sample more.
+        """
+        estimator = PassRateEstimator(self, self.get_fancode_users(), confidence, seed, stratify)
+        estimator.refine(sample_size)
+        return estimator
+
+    def validate_fancode_users(self, deadline: Union[Deadline, float, None] = None,
+                               sink: Optional[ResultSink] = None) -> ValidationResult:
+        """
+        Validate all FanCode city users' todo completion rates into a compact
+        ValidationResult; validate_all_fancode_users returns its to_dict().
+        With a sink, each row is written out as soon as it is evaluated and
+        not kept: the result holds only user ids and pass flags. The FanCode
+        users from /users are still held for the run, since they drive the
+        todo fetches and the final ordering.
+
+        deadline: budget in seconds (or a Deadline) for the whole run. When it
+        expires, the result is partial: users that could not be evaluated are
+        listed in 'skipped_user_ids' and the overall result is False.
+        """
+        if deadline is None:
+            deadline = self.settings.run_timeout
+        run_deadline = None
+        if deadline is not None or self.stage_timeouts:
+            run_deadline = Deadline.coerce(deadline)
+
+        result = ValidationResult(self.COMPLETION_THRESHOLD, sink=sink, ruleset=self.rules)
+        try:
+            fancode_users = self.get_fancode_users(self._stage(run_deadline, 'users'))
+        except (DeadlineExceeded, requests.Timeout) as e:
+            if run_deadline is None:
+                raise
+            logger.warning(f"Deadline hit while fetching users: {e}")
+            result.partial = True
+            return result
 
         if not fancode_users:
             logger.warning("No users found in FanCode city")
-            return {
-                'total_users': 0,
-                'passed_users': 0,
-                'failed_users': 0,
-                'overall_result': False,
-                'user_results': []
-            }
-
-        user_results = []
-        passed_count = 0
-
-        for user in fancode_users:
-            is_valid, completion_percentage, completed_count, total_count = self.validate_user_completion_rate(user)
-
-            user_result = {
-                'user_id': user.id,
-                'user_name': user.name,
-                'username': user.username,
-                'coordinates': {'lat': user.lat, 'lng': user.lng},
-                'total_todos': total_count,
-                'completed_todos': completed_count,
-                'completion_percentage': completion_percentage,
-                'passed': is_valid
-            }
-
-            user_results.append(user_result)
-
-            if is_valid:
-                passed_count += 1
-
-        overall_result = passed_count == len(fancode_users)
-
-        result_summary = {
-            'total_users': len(fancode_users),
-            'passed_users': passed_count,
-            'failed_users': len(fancode_users) - passed_count,
-            'overall_result': overall_result,
-            'user_results': user_results
-        }
+            return result
+
+        user_counts = self.iter_user_counts(fancode_users, self._stage(run_deadline, 'todos'))
+        aggregate_deadline = None
+        aggregating = False
+
+        for user, counts in user_counts:
+            if not aggregating:
+                # Most strategies fetch lazily, so the aggregate stage starts with the first row
+                aggregate_deadline = self._stage(run_deadline, 'aggregate')
+                aggregating = True
+            if counts is None or (aggregate_deadline is not None and aggregate_deadline.expired):
+                result.skipped_user_ids.append(user.id)
+                continue
+            result.append(user, *counts)
+
+        # Concurrent strategies may finish out of order; report in user order
+        result.reorder({user.id: index for index, user in enumerate(fancode_users)})
+
+        result.evaluate_rules()
 
-        logger.info(f"Validation Summary: {passed_count}/{len(fancode_users)} users passed the 50% completion criteria")
+        logger.info(f"Validation Summary: {result.passed_count}/{len(fancode_users)} users passed the "
+                    f"{self.COMPLETION_THRESHOLD:g}% completion criteria")
+        if result.skipped_user_ids:
+            logger.warning(f"Partial result: {len(result.skipped_user_ids)} users skipped by the deadline")
+
+        return result
+
+    def validate_all_fancode_users(self, deadline: Union[Deadline, float, None] = None,
+                                   sink: Optional[ResultSink] = None) -> Dict:
+        """
+        Validate all FanCode city users' todo completion rates.
+
+        deadline: budget in seconds (or a Deadline) for the whole run. When it
+        expires, the summary is partial: users that could not be evaluated are
+        listed in 'skipped_user_ids' and the overall result is False.
+        sink: stream per-user rows to a sinks.ResultSink (in evaluation order)
+        instead of returning them; the summary then has no 'user_results'.
+        """
+        return self.validate_fancode_users(deadline, sink).to_dict(include_rows=sink is None)
 
-        return result_summary
+    @staticmethod
+    def build_summary(user_results: List[Dict], skipped_user_ids: List[int], passed_count: int,
+                      partial: bool = False) -> Dict:
+        """Assemble the result summary; any skipped user makes the result partial"""
+        return build_summary(user_results, skipped_user_ids, passed_count, partial)
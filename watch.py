@@ -0,0 +1,171 @@
+"""
+Watch mode: poll cheaply and revalidate only users whose data changed.
+
+Each poll issues conditional requests for /users and /todos. An unchanged
+dataset (304, or a body with the same content hash) costs no decoding and no
+recomputation. When something did change, the new rows are diffed against
+the previous state by id, per-user todo counts are adjusted incrementally,
+and only the affected users are re-evaluated. Status changes come out as
+``ChangeEvent``s such as "user 3 flipped from PASS to FAIL".
+"""
+
+import logging
+import threading
+from typing import Callable, Dict, List, NamedTuple, Optional, Set
+
+from api_client import APIClient
+from todo import Todo
+from user import User
+from validator import FanCodeCityValidator
+
+logger = logging.getLogger(__name__)
+
+
+def _status(result: Optional[Dict]) -> Optional[str]:
+    if result is None:
+        return None
+    return 'PASS' if result['passed'] else 'FAIL'
+
+
+class ChangeEvent(NamedTuple):
+    """A change in one FanCode user's validation result"""
+    kind: str  # 'added', 'removed', 'flipped' or 'updated'
+    user_id: int
+    old_status: Optional[str]
+    new_status: Optional[str]
+    result: Optional[Dict]
+
+    def __str__(self) -> str:
+        if self.kind == 'flipped':
+            return f"user {self.user_id} flipped from {self.old_status} to {self.new_status}"
+        if self.kind == 'added':
+            return f"user {self.user_id} added ({self.new_status})"
+        if self.kind == 'removed':
+            return f"user {self.user_id} removed (was {self.old_status})"
+        return f"user {self.user_id} updated ({self.new_status})"
+
+
+class Watcher:
+    """Keeps validation results current with work proportional to what changed"""
+
+    def __init__(self, api_client: APIClient, validator: Optional[FanCodeCityValidator] = None):
+        self.api_client = api_client
+        self.validator = validator or FanCodeCityValidator(api_client)
+        self._users: Dict[int, User] = {}
+        self._todos: Dict[int, Todo] = {}
+        self._counts: Dict[int, List[int]] = {}  # user_id -> [completed, total]
+        self._results: Dict[int, Dict] = {}  # FanCode city users only
+        # Users whose data was applied but not yet re-evaluated (e.g. a later fetch in the poll failed)
+        self._pending: Set[int] = set()
+        self.polls = 0
+        self.last_recomputed = 0
+
+    def _apply_users(self, users: List[User]) -> Set[int]:
+        new = {user.id: user for user in users}
+        old = self._users
+        self._users = new
+        return {user_id for user_id in new.keys() | old.keys() if new.get(user_id) != old.get(user_id)}
+
+    def _apply_todos(self, todos: List[Todo]) -> Set[int]:
+        new = {todo.id: todo for todo in todos}
+        old = self._todos
+        self._todos = new
+        affected = set()
+        for todo_id in new.keys() | old.keys():
+            before, after = old.get(todo_id), new.get(todo_id)
+            if before == after:
+                continue
+            if before is not None:
+                counts = self._counts[before.user_id]
+                counts[0] -= before.completed
+                counts[1] -= 1
+                affected.add(before.user_id)
+            if after is not None:
+                counts = self._counts.setdefault(after.user_id, [0, 0])
+                counts[0] += after.completed
+                counts[1] += 1
+                affected.add(after.user_id)
+        return affected
+
+    def _reevaluate(self, affected: Set[int]) -> List[ChangeEvent]:
+        events = []
+        for user_id in sorted(affected):
+            user = self._users.get(user_id)
+            before = self._results.get(user_id)
+            after = None
+            if user is not None and self.validator.is_fancode_city_user(user):
+                completed, total = self._counts.get(user_id, (0, 0))
+                after = self.validator.build_user_result(user, completed, total)
+                self._results[user_id] = after
+            else:
+                self._results.pop(user_id, None)
+
+            if before is None and after is None:
+                continue
+            if before is None:
+                kind = 'added'
+            elif after is None:
+                kind = 'removed'
+            elif before['passed'] != after['passed']:
+                kind = 'flipped'
+            elif before != after:
+                kind = 'updated'
+            else:
+                continue
+            events.append(ChangeEvent(kind, user_id, _status(before), _status(after), after))
+        self.last_recomputed = len(affected)
+        return events
+
+    def poll(self) -> List[ChangeEvent]:
+        """Fetch what changed since the last poll and return the resulting events"""
+        # Apply each payload as soon as it arrives: the client has already recorded its
+        # validators, so a payload dropped here would never be served again
+        users = self.api_client.get_users_if_changed()
+        if users is not None:
+            self._pending |= self._apply_users(users)
+        todos = self.api_client.get_todos_if_changed()
+        if todos is not None:
+            self._pending |= self._apply_todos(todos)
+        self.polls += 1
+
+        affected, self._pending = self._pending, set()
+        events = self._reevaluate(affected)
+        for event in events:
+            logger.info(f"Change: {event}")
+        return events
+
+    def summary(self) -> Dict:
+        """Current result summary, in the same shape as validate_all_fancode_users"""
+        user_results = [self._results[user_id] for user_id in self._users if user_id in self._results]
+        passed_count = sum(1 for result in user_results if result['passed'])
+        return self.validator.build_summary(user_results, [], passed_count)
+
+    def run(self, interval: float, on_events: Optional[Callable[[List[ChangeEvent]], None]] = None,
+            stop: Optional[threading.Event] = None, max_polls: Optional[int] = None):
+        """Poll every ``interval`` seconds until ``stop`` is set or ``max_polls`` is reached"""
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            try:
+                events = self.poll()
+            except Exception as e:
+                logger.error(f"Watch poll failed: {e}")
+            else:
+                if events and on_events is not None:
+                    on_events(events)
+            if max_polls is not None and self.polls >= max_polls:
+                break
+            stop.wait(interval)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Watch FanCode city users for validation changes")
+    parser.add_argument("--interval", type=float, default=30.0, help="seconds between polls")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+    try:
+        Watcher(APIClient()).run(args.interval)
+    except KeyboardInterrupt:
+        pass